@@ -0,0 +1,8 @@
+import os
+from app import create_app
+from utils.asgiApp import AsgiApp
+
+# ASGI entry point: uvicorn asgi:app --workers N
+# The read-heavy blueprints run on the event loop with asyncpg (see utils/asgiApp.py)
+flask_app = create_app(os.getenv('APP_ENV', 'production'))
+app = AsgiApp(flask_app)
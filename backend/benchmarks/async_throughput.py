@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Sync vs async throughput benchmark
+Starts the app twice against the same PostgreSQL database, under gunicorn
+(wsgi:app, gthread workers) and under uvicorn (asgi:app, the read blueprints
+on asyncpg), with the same number of worker processes, and drives each with
+N concurrent keep-alive clients cycling through read endpoints of the async
+blueprints. Reports requests/s, latency percentiles and errors for both.
+
+Needs DATABASE_URL pointing at a seeded PostgreSQL database (see
+benchmarks/seed_data.py); asyncpg and uvicorn must be installed.
+
+Usage: python benchmarks/async_throughput.py [--clients 200] [--duration 20]
+                                             [--workers 2] [--path /api/...]
+"""
+
+import argparse
+import asyncio
+import os
+import secrets
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import Counter
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PATHS = [
+    '/api/purchase/recent',
+    '/api/inventory/notifications',
+    '/api/department-request/top-purchases',
+    '/api/purchase/top10approvedproducts',
+    '/api/maintenance/?fields=maintenance_id,status',
+    '/api/damages/?fields=damaged_item_id,quantity,return_status',
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def start_server(kind, port, workers):
+    env = dict(os.environ, EMAIL_OUTBOX_WORKER='False', SCHEDULER_ENABLED='False', LOG_LEVEL='WARNING',
+               WEB_CONCURRENCY=str(workers), GUNICORN_BIND=f'127.0.0.1:{port}')
+    env.setdefault('SECRET_KEY', secrets.token_hex(16))
+    if kind == 'sync':
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']
+    else:
+        command = [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', str(port),
+                   '--workers', str(workers), '--log-level', 'warning', '--no-access-log']
+    process = subprocess.Popen(command, cwd=BACKEND, env=env, stdout=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"❌ The {kind} server exited with status {process.returncode}")
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/readyz', timeout=2) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    raise SystemExit(f"❌ The {kind} server did not become ready")
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    headers = {name.lower(): value.strip() for name, _, value in (line.partition(':') for line in lines[1:] if line)}
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status
+
+
+async def client(port, paths, offset, stop_at, latencies, errors):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    index = offset
+    try:
+        while time.monotonic() < stop_at:
+            path = paths[index % len(paths)]
+            index += 1
+            started = time.perf_counter()
+            writer.write(f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: keep-alive\r\n\r\n'.encode())
+            await writer.drain()
+            status = await read_response(reader)
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors.append(status)
+    except (OSError, asyncio.IncompleteReadError) as e:
+        errors.append(type(e).__name__)
+    finally:
+        writer.close()
+
+
+async def drive(port, paths, clients, duration):
+    latencies, errors = [], []
+    stop_at = time.monotonic() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(client(port, paths, offset, stop_at, latencies, errors) for offset in range(clients)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--path', action='append', dest='paths', help='endpoint to request (repeatable)')
+    args = parser.parse_args()
+    paths = args.paths or DEFAULT_PATHS
+
+    if not os.getenv('DATABASE_URL', '').startswith('postgresql'):
+        raise SystemExit("❌ Set DATABASE_URL to a seeded PostgreSQL database")
+
+    print(f"⚡ {args.clients} clients, {args.duration:.0f}s, {args.workers} worker process(es), {len(paths)} endpoints")
+    print(f"   {'server':<22} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for kind, port, label in (('sync', 8701, 'gunicorn (sync)'), ('async', 8702, 'uvicorn (async)')):
+        process = start_server(kind, port, args.workers)
+        try:
+            # Warm the pools and caches before measuring
+            asyncio.run(drive(port, paths, min(args.clients, 20), 2))
+            latencies, errors, elapsed = asyncio.run(drive(port, paths, args.clients, args.duration))
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+        if not latencies:
+            print(f"   {label:<22} no successful requests; errors: {errors[:5]}")
+            continue
+        print(f"   {label:<22} {len(latencies) / elapsed:>9.1f} {percentile(latencies, 50) * 1000:>8.1f} "
+              f"{percentile(latencies, 95) * 1000:>8.1f} {percentile(latencies, 99) * 1000:>8.1f} {len(errors):>7}")
+        if errors:
+            print(f"   {'':<22} most common errors: {Counter(errors).most_common(3)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Batch request benchmark
+Loads the dashboard's reads in-process twice: as separate GET requests, and as
+one POST /api/batch. Reports time (best of N) and database connection
+checkouts for both, and checks that every batched body matches its direct
+response.
+
+Uses DATABASE_URL as is (seed it first with benchmarks/seed_data.py), or a
+throwaway SQLite database seeded with the given number of purchases.
+
+Usage: python benchmarks/batch_requests.py [purchases] [repeats]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Default to a throwaway SQLite database so the benchmark never touches real data
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'batch_requests.db')
+os.environ.setdefault('EMAIL_OUTBOX_WORKER', 'False')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+from app import create_app
+from extensions import db
+from models.users import User
+from models.products import Product
+from benchmarks.seed_data import BENCH_ADMIN_EMAIL, seed
+
+app = create_app()
+
+DASHBOARD_READS = [
+    '/api/inventory/',
+    '/api/inventory/notifications',
+    '/api/purchase/recent',
+    '/api/purchase/top10approvedproducts',
+    '/api/department-request/top-purchases',
+    '/api/damages/',
+    '/api/maintenance/',
+    '/api/products/?fields=product_id,name',
+]
+
+checkouts = [0]
+
+
+@event.listens_for(Pool, 'checkout')
+def _count_checkout(*args):
+    checkouts[0] += 1
+
+
+def best_of(repeats, run):
+    best, result, used = None, None, 0
+    for _ in range(repeats):
+        checkouts[0] = 0
+        started = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - started
+        best, used = (elapsed, checkouts[0]) if best is None or elapsed < best else (best, used)
+    return best, used, result
+
+
+if __name__ == '__main__':
+    purchases = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with app.app_context():
+        db.create_all()
+        if not Product.query.count():
+            print(f"🌱 Seeding {purchases} purchases...")
+            seed(dict(departments=20, suppliers=200, products=purchases // 4, purchases=purchases,
+                      maintenance=purchases // 10, department_requests=purchases // 2))
+        admin_id = User.query.filter_by(email=BENCH_ADMIN_EMAIL).first().get_id()
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = admin_id
+        session['_fresh'] = True
+
+    separate_time, separate_checkouts, direct = best_of(
+        repeats, lambda: [client.get(path).get_json() for path in DASHBOARD_READS])
+    batch_time, batch_checkouts, batch = best_of(
+        repeats, lambda: client.post('/api/batch', json={'requests': DASHBOARD_READS}).get_json())
+
+    mismatched = [item['path'] for item, body in zip(batch['responses'], direct)
+                  if json.dumps(item['body'], sort_keys=True) != json.dumps(body, sort_keys=True)]
+
+    print(f"📦 {len(DASHBOARD_READS)} dashboard reads, best of {repeats}")
+    print(f"   separate requests: {separate_time * 1000:8.1f} ms, {separate_checkouts} connection checkouts")
+    print(f"   one batch:         {batch_time * 1000:8.1f} ms, {batch_checkouts} connection checkouts")
+    if mismatched:
+        print(f"❌ Batched bodies differ from direct responses: {', '.join(mismatched)}")
+        sys.exit(1)
+    print("✅ Batched bodies match the direct responses")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Response compression benchmark
+Calls the largest list endpoints in-process with Accept-Encoding set to
+identity, gzip and br, and reports server wall time (best of N), bytes on
+the wire and the transfer time those bytes take on a 10 and 100 Mbit/s link.
+
+Uses DATABASE_URL as is (seed it first with benchmarks/seed_data.py), or a
+throwaway SQLite database seeded with the given number of purchases.
+
+Usage: python benchmarks/compression.py [purchases] [repeats]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Default to a throwaway SQLite database so the benchmark never touches real data
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'compression.db')
+os.environ.setdefault('EMAIL_OUTBOX_WORKER', 'False')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from app import create_app
+from extensions import db
+from models.users import User
+from models.products import Product
+from benchmarks.seed_data import BENCH_ADMIN_EMAIL, seed
+
+app = create_app()
+
+ENDPOINTS = ['/api/inventory/', '/api/purchase/', '/api/product-suppliers/']
+ENCODINGS = ['identity', 'gzip', 'br']
+LINKS = [('10 Mbit/s', 10e6 / 8), ('100 Mbit/s', 100e6 / 8)]
+
+
+def timed_get(client, path, encoding, repeats):
+    best, response = None, None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        response = client.get(path, headers={'Accept-Encoding': encoding})
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, response
+
+
+if __name__ == '__main__':
+    purchases = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    with app.app_context():
+        db.create_all()
+        if not Product.query.count():
+            print(f"🌱 Seeding {purchases} purchases...")
+            seed(dict(departments=20, suppliers=200, products=purchases // 4, purchases=purchases,
+                      maintenance=0, department_requests=0))
+        admin_id = User.query.filter_by(email=BENCH_ADMIN_EMAIL).first().get_id()
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = admin_id
+        session['_fresh'] = True
+
+    header = ''.join(f"{label:>12}" for label, _ in LINKS)
+    print(f"📦 Best of {repeats}; transfer = bytes / link speed")
+    print(f"   {'endpoint':<26} {'encoding':<9} {'server ms':>10} {'bytes':>11}{header}")
+    for path in ENDPOINTS:
+        for encoding in ENCODINGS:
+            elapsed, response = timed_get(client, path, encoding, repeats)
+            size = len(response.get_data())
+            transfers = ''.join(f"{size / speed * 1000:>10.1f}ms" for _, speed in LINKS)
+            print(f"   {path:<26} {response.headers.get('Content-Encoding', 'identity'):<9} "
+                  f"{elapsed * 1000:>10.1f} {size:>11,}{transfers}")
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Concurrent writes check
+Races parallel writers against the same rows through the real endpoints and
+checks that no update is lost:
+
+  stock      N threads take 1 unit each of one product's inventory through
+             POST /api/department-request/create. Every 201 must be matched
+             by exactly one unit gone from inventory and one request row.
+  price      N clients read the same product-supplier price, then all PUT a
+             different price with If-Match set to the version they read.
+             Exactly one may win; the rest get 409 and the stored price is
+             the winner's.
+  increments N threads each apply a read-modify-write to one product's name
+             without If-Match; all must succeed (retried on conflict) and
+             the version must have moved by exactly N.
+  delivery   N threads evaluate N purchase requests for one product that has
+             no inventory row yet, so all of them try to create it. All must
+             succeed and the one row must hold every delivered unit.
+
+Uses DATABASE_URL as is, or a throwaway SQLite database (where writers
+serialize on the file lock, so PostgreSQL shows the races far better).
+Writes are made on the database; run it against a scratch copy only.
+
+Usage: python benchmarks/concurrent_writes.py [threads] [requests-per-thread]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'concurrent_writes.db')
+os.environ.setdefault('EMAIL_OUTBOX_WORKER', 'False')
+os.environ['SCHEDULER_ENABLED'] = 'False'
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ['REFERENCE_CACHE_TTL'] = '0'
+# Enough attempts that a burst of N writers on one row all get through
+os.environ.setdefault('CONFLICT_RETRY_ATTEMPTS', '50')
+
+from app import create_app
+from extensions import db
+from models.department import DepartmentFacility
+from models.departmentrequest import DepartmentRequest
+from models.inventory import Inventory
+from models.products import Product, ProductType
+from models.productsupplier import ProductSupplier
+from models.purchase import PurchaseRequest
+from models.supplier import Supplier
+from utils.optimisticLock import conflict_stats
+
+app = create_app('development')
+
+
+def make_fixtures(stock):
+    tag = uuid.uuid4().hex[:8]
+    product = Product(name=f'Concurrency check {tag}', category='Check', product_type=ProductType.item)
+    supplier = Supplier(supplier_name=f'Concurrency supplier {tag}')
+    department = DepartmentFacility.query.first() or DepartmentFacility(department_name=f'Check {tag}')
+    db.session.add_all([product, supplier, department])
+    db.session.flush()
+    inventory = Inventory(product_id=product.product_id, quantity=stock, running_amount=Decimal('0'))
+    price = ProductSupplier(product_id=product.product_id, supplier_id=supplier.supplier_id, unit_price=Decimal('100.00'))
+    db.session.add_all([inventory, price])
+    db.session.commit()
+    return product.product_id, department.department_id, inventory.inventory_id, price.product_supplier_id
+
+
+def parallel(threads, work):
+    """Run work(index) on `threads` threads started together; returns the results"""
+    barrier = threading.Barrier(threads)
+
+    def run(index):
+        barrier.wait()
+        return work(index)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(run, range(threads)))
+
+
+def check_stock(threads, per_thread, product_id, department_id, inventory_id, stock):
+    def work(index):
+        client = app.test_client()
+        return [client.post('/api/department-request/create', json={
+            'department_id': department_id, 'product_id': product_id, 'quantity': 1,
+        }).status_code for _ in range(per_thread)]
+
+    statuses = [status for batch in parallel(threads, work) for status in batch]
+    created = statuses.count(201)
+    with app.app_context():
+        remaining = db.session.get(Inventory, inventory_id).quantity
+        rows = DepartmentRequest.query.filter_by(product_id=product_id).count()
+    ok = remaining == stock - created and rows == created
+    print(f"   stock       {len(statuses)} requests: {created} created, {statuses.count(409)} conflicts, "
+          f"{len(statuses) - created - statuses.count(409)} other; inventory {stock} -> {remaining}, "
+          f"{rows} request rows {'✅' if ok else '❌'}")
+    return ok
+
+
+def check_price(threads, product_supplier_id):
+    with app.app_context():
+        current = db.session.get(ProductSupplier, product_supplier_id)
+        read_version, product_id, supplier_id = current.version, current.product_id, current.supplier_id
+
+    def work(index):
+        price = 200 + index
+        response = app.test_client().put(
+            f'/api/product-suppliers/update/{product_supplier_id}',
+            json={'product_id': product_id, 'supplier_id': supplier_id, 'unit_price': price, 'status': 'active'},
+            headers={'If-Match': f'"{read_version}"'})
+        return response.status_code, price
+
+    results = parallel(threads, work)
+    winners = [price for status, price in results if status == 200]
+    conflicts = sum(1 for status, _ in results if status == 409)
+    with app.app_context():
+        stored = db.session.get(ProductSupplier, product_supplier_id)
+        stored_price, stored_version = stored.unit_price, stored.version
+    ok = len(winners) == 1 and conflicts == threads - 1 and stored_price == winners[0] \
+        and stored_version == read_version + 1
+    print(f"   price       {threads} editors of version {read_version}: {len(winners)} saved, {conflicts} got 409; "
+          f"stored {stored_price} at version {stored_version} {'✅' if ok else '❌'}")
+    return ok
+
+
+def check_increments(threads, product_id):
+    with app.app_context():
+        before = db.session.get(Product, product_id).version
+
+    def work(index):
+        return app.test_client().put(f'/api/products/update/{product_id}',
+                                     json={'model': f'rev-{index}'}).status_code
+
+    statuses = parallel(threads, work)
+    with app.app_context():
+        after = db.session.get(Product, product_id).version
+    ok = statuses.count(200) == threads and after - before == threads
+    print(f"   increments  {threads} blind writers: {statuses.count(200)} saved; version {before} -> {after} "
+          f"{'✅' if ok else '❌'}")
+    return ok
+
+
+def check_first_delivery(threads, quantity=3):
+    with app.app_context():
+        tag = uuid.uuid4().hex[:8]
+        product = Product(name=f'Delivery check {tag}', category='Check', product_type=ProductType.item)
+        supplier = Supplier(supplier_name=f'Delivery supplier {tag}')
+        db.session.add_all([product, supplier])
+        db.session.flush()
+        requests = [PurchaseRequest(product_id=product.product_id, supplier_id=supplier.supplier_id,
+                                    unit_price=Decimal('10.00'), quantity=quantity,
+                                    total_amount=Decimal('10.00') * quantity) for _ in range(threads)]
+        db.session.add_all(requests)
+        db.session.commit()
+        product_id, request_ids = product.product_id, [request.request_id for request in requests]
+
+    def work(index):
+        return app.test_client().post(f'/api/evaluate/create/{request_ids[index]}', json={
+            'undamaged_quantity': quantity, 'damaged_quantity': 0}).status_code
+
+    statuses = parallel(threads, work)
+    with app.app_context():
+        rows = Inventory.query.filter_by(product_id=product_id).all()
+        stored = rows[0].quantity if rows else 0
+    ok = statuses.count(200) == threads and len(rows) == 1 and stored == threads * quantity
+    print(f"   delivery    {threads} first deliveries: {statuses.count(200)} evaluated, "
+          f"{len(statuses) - statuses.count(200)} other; {len(rows)} inventory row(s) holding {stored} "
+          f"{'✅' if ok else '❌'}")
+    return ok
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    stock = threads * per_thread // 2
+
+    with app.app_context():
+        db.create_all()
+        product_id, department_id, inventory_id, product_supplier_id = make_fixtures(stock)
+
+    print(f"⚔️  {threads} concurrent writers on {app.config['SQLALCHEMY_DATABASE_URI'].split(':')[0]}")
+    results = [
+        check_stock(threads, per_thread, product_id, department_id, inventory_id, stock),
+        check_price(threads, product_supplier_id),
+        check_increments(threads, product_id),
+        check_first_delivery(threads),
+    ]
+    print(f"   retries {conflict_stats.retried}, gave up {conflict_stats.exhausted}, "
+          f"If-Match rejections {conflict_stats.rejected}")
+    if not all(results):
+        sys.exit(1)
+    print("✅ No lost updates")
+
+
+if __name__ == '__main__':
+    main()
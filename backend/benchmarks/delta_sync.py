@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Delta sync check
+Mirrors every /api/sync feed into local dictionaries the way a client would,
+then makes random inserts, updates and deletes, syncs again with the saved
+cursors and checks that each mirror equals the table's full list endpoint
+(on the columns the feed serves; joined names come from the other mirrors).
+Reports the bytes downloaded by the delta round against a full re-download.
+
+Uses DATABASE_URL as is (seed it first with benchmarks/seed_data.py), or a
+throwaway SQLite database seeded with the given number of purchases. Writes
+are made on the database; run it against a scratch copy only.
+
+Usage: python benchmarks/delta_sync.py [purchases] [changes]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Default to a throwaway SQLite database so the check never touches real data
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'delta_sync.db')
+os.environ.setdefault('EMAIL_OUTBOX_WORKER', 'False')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ['REFERENCE_CACHE_TTL'] = '0'
+# Changes made just now must show up in the next round
+os.environ['SYNC_LAG_SECONDS'] = '0'
+
+from app import create_app
+from extensions import db
+from models.products import Product, ProductType
+from models.supplier import Supplier
+from models.productsupplier import ProductSupplier
+from models.maintenance import Maintenance
+from models.department import DepartmentFacility
+from services.syncServices import SYNC_FEEDS
+from benchmarks.seed_data import seed
+
+app = create_app()
+
+# Feed name -> (full list endpoint, key, unwrap the list from the endpoint's body)
+LISTS = {
+    'products': ('/api/products/', 'product_id', lambda body: body),
+    'suppliers': ('/api/supplier/', 'supplier_id', lambda body: body['suppliers']),
+    'product-suppliers': ('/api/product-suppliers/', 'product_supplier_id', lambda body: body),
+    'inventory': ('/api/inventory/', 'inventory_id', lambda body: body['inventory']),
+    'maintenance': ('/api/maintenance/', 'maintenance_id', lambda body: body['maintenances']),
+    'departments': ('/api/department/', 'department_id', lambda body: body),
+}
+
+
+def sync(client, name, mirror, cursor):
+    """Apply every page since cursor to mirror; returns (cursor, bytes downloaded)"""
+    key, downloaded = LISTS[name][1], 0
+    while True:
+        response = client.get(f'/api/sync/{name}', query_string={'since': cursor} if cursor else None,
+                              headers={'Accept-Encoding': 'identity'})
+        assert response.status_code == 200, response.get_data(as_text=True)
+        downloaded += len(response.get_data())
+        body = response.get_json()
+        for row in body['changes']:
+            mirror[row[key]] = row
+        for row_id in body['deleted']:
+            mirror.pop(row_id, None)
+        cursor = body['cursor']
+        if not body['has_more']:
+            return cursor, downloaded
+
+
+def make_changes(count, rng):
+    """Random inserts, updates and deletes through the ORM, like the services make them"""
+    products = Product.query.all()
+    for step in range(count):
+        action = rng.choice(['insert', 'update', 'delete', 'price', 'maintenance', 'department'])
+        if action == 'insert':
+            product = Product(name=f'Delta product {uuid.uuid4().hex}', category='Sync',
+                              product_type=ProductType.item, brand='Delta', model='D1')
+            db.session.add(product)
+            products.append(product)
+        elif action == 'update':
+            rng.choice(products).brand = f'Brand {step}'
+        elif action == 'delete':
+            product = Product(name=f'Short-lived {uuid.uuid4().hex}', category='Sync', product_type=ProductType.item)
+            db.session.add(product)
+            db.session.flush()
+            db.session.delete(product)
+        elif action == 'price':
+            link = ProductSupplier.query.order_by(db.func.random()).first()
+            if rng.random() < 0.5:
+                link.unit_price = link.unit_price + 1
+            else:
+                db.session.delete(link)
+        elif action == 'maintenance':
+            record = Maintenance.query.order_by(db.func.random()).first()
+            if record:
+                record.notes = f'Checked {step}'
+        else:
+            department = DepartmentFacility.query.order_by(db.func.random()).first()
+            department.department_name = f'{department.department_name.split(" #")[0]} #{step}'
+        db.session.commit()
+    Supplier.query.order_by(db.func.random()).first().address = 'Moved'
+    db.session.commit()
+
+
+if __name__ == '__main__':
+    purchases = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    changes = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    with app.app_context():
+        db.create_all()
+        if not Product.query.count():
+            print(f"🌱 Seeding {purchases} purchases...")
+            seed(dict(departments=20, suppliers=200, products=purchases // 4, purchases=purchases,
+                      maintenance=purchases // 10, department_requests=0))
+
+    client = app.test_client()
+    mirrors, cursors, initial = {}, {}, 0
+    for name in LISTS:
+        mirrors[name] = {}
+        cursors[name], downloaded = sync(client, name, mirrors[name], None)
+        initial += downloaded
+
+    with app.app_context():
+        make_changes(changes, random.Random(7))
+
+    delta, full, failed = 0, 0, []
+    for name, (path, key, unwrap) in LISTS.items():
+        cursors[name], downloaded = sync(client, name, mirrors[name], cursors[name])
+        delta += downloaded
+        response = client.get(path, headers={'Accept-Encoding': 'identity'})
+        full += len(response.get_data())
+        columns = SYNC_FEEDS[name].rows.keys
+        expected = {row[key]: {column: row[column] for column in columns} for row in unwrap(response.get_json())}
+        if mirrors[name] != expected:
+            failed.append(name)
+
+    print(f"🔄 {len(SYNC_FEEDS)} feeds, {changes} changes")
+    print(f"   initial sync: {initial:>12,} bytes")
+    print(f"   delta sync:   {delta:>12,} bytes")
+    print(f"   full reload:  {full:>12,} bytes")
+    if failed:
+        print(f"❌ Mirror differs from the list endpoint: {', '.join(failed)}")
+        sys.exit(1)
+    print("✅ Every mirror matches its list endpoint")
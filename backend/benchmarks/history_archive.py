@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+History archive benchmark
+Seeds five years of synthetic purchase and department request history, times
+the hot list and report endpoints (median of N) with everything still in the
+hot tables, runs the archive job, and times them again: the default (recent)
+view and the ?archive=include audit view. Also checks that archiving lost
+nothing: the audit view lists the same rows and reports the same totals as
+the unarchived tables did, and nothing open left the hot tables.
+
+Uses DATABASE_URL as is, or a throwaway SQLite database; the inventory and
+archive tables are reset and reseeded, so run it against a scratch database.
+
+Usage: python benchmarks/history_archive.py [purchases] [repeats]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Default to a throwaway SQLite database so the benchmark never touches real data
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'history_archive.db')
+os.environ.setdefault('SESSION_FILE_DIR', tempfile.mkdtemp())
+os.environ.setdefault('EMAIL_OUTBOX_WORKER', 'False')
+os.environ['SCHEDULER_ENABLED'] = 'False'
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ['DASHBOARD_CACHE_TTL'] = '0'
+
+from sqlalchemy import func, select, text
+from app import create_app
+from extensions import db
+from models.users import User
+from models.purchase import PurchaseRequest, PurchaseRequestArchive, PurchaseRequestStatusEnum
+from models.damage import DamagedItem, ReturnStatusEnum
+from models.departmentrequest import DepartmentRequest, DepartmentRequestArchive
+from services.jobServices import archive_history
+from utils.archive import archive_cutoff
+from benchmarks.seed_data import ARCHIVE_TABLES, BENCH_ADMIN_EMAIL, TABLES, seed
+
+app = create_app('development')
+
+FIVE_YEARS = 5 * 365 + 1
+
+# (label, path, key of the row id in list responses or None for reports)
+CASES = [
+    ('purchase requests', '/api/purchase/', 'request_id'),
+    ('evaluations', '/api/evaluate/', 'evaluation_id'),
+    ('damaged items', '/api/damages/', 'damaged_item_id'),
+    ('department requests', '/api/department-request/', 'department_request_id'),
+    ('top products', '/api/purchase/top10approvedproducts', None),
+    ('top per department', '/api/department-request/top-purchases', None),
+    ('recent purchases', '/api/purchase/recent', None),
+    ('dashboard summary', '/api/dashboard/summary', None),
+]
+
+
+def timed_get(client, path, repeats):
+    times, response = [], None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        response = client.get(path, headers={'Accept-Encoding': 'identity'})
+        times.append(time.perf_counter() - started)
+    assert response.status_code == 200, (path, response.status_code, response.get_data(as_text=True)[:200])
+    return statistics.median(times), response.get_json()
+
+
+def ids(payload, key):
+    rows = payload['damaged_items'] if isinstance(payload, dict) and 'damaged_items' in payload else payload
+    return sorted(row[key] for row in rows)
+
+
+def totals(payload):
+    return [row['total_purchases'] for row in payload]
+
+
+def run(client, repeats, suffix=''):
+    results = {}
+    for label, path, key in CASES:
+        joiner = '&' if '?' in path else '?'
+        results[label] = timed_get(client, f'{path}{joiner}{suffix}' if suffix else path, repeats)
+    return results
+
+
+def hot_counts():
+    return {
+        'purchase_requests': db.session.scalar(select(func.count()).select_from(PurchaseRequest)),
+        'department_requests': db.session.scalar(select(func.count()).select_from(DepartmentRequest)),
+    }
+
+
+def main():
+    purchases = int(sys.argv[1]) if len(sys.argv) > 1 else 60000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with app.app_context():
+        db.create_all()
+        print(f"🌱 Seeding {purchases:,} purchases over five years...")
+        seed(dict(departments=20, suppliers=200, products=2000, purchases=purchases,
+                  maintenance=0, department_requests=purchases // 2),
+             reset_tables=True, days=FIVE_YEARS, open_days=60)
+        admin_id = User.query.filter_by(email=BENCH_ADMIN_EMAIL).first().get_id()
+        before_counts = hot_counts()
+        open_before = (
+            db.session.scalar(select(func.count()).select_from(PurchaseRequest)
+                              .where(PurchaseRequest.status == PurchaseRequestStatusEnum.pending)),
+            db.session.scalar(select(func.count()).select_from(DamagedItem)
+                              .where(DamagedItem.return_status == ReturnStatusEnum.pending)),
+        )
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = admin_id
+        session['_fresh'] = True
+
+    unarchived = run(client, repeats)
+
+    with app.app_context():
+        started = time.perf_counter()
+        archive_history(datetime.utcnow())
+        elapsed = time.perf_counter() - started
+        if db.engine.dialect.name == 'postgresql':
+            # Reclaim the moved rows and refresh statistics, as autovacuum soon would
+            with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                connection.execute(text(f"VACUUM ANALYZE {', '.join(TABLES + ARCHIVE_TABLES)}"))
+        cutoff = archive_cutoff()
+        after_counts = hot_counts()
+        archived = {
+            'purchase_requests': db.session.scalar(select(func.count()).select_from(PurchaseRequestArchive)),
+            'department_requests': db.session.scalar(select(func.count()).select_from(DepartmentRequestArchive)),
+        }
+        open_after = (
+            db.session.scalar(select(func.count()).select_from(PurchaseRequest)
+                              .where(PurchaseRequest.status == PurchaseRequestStatusEnum.pending)),
+            db.session.scalar(select(func.count()).select_from(DamagedItem)
+                              .where(DamagedItem.return_status == ReturnStatusEnum.pending)),
+        )
+    for table, count in after_counts.items():
+        print(f"   {table:<20} {before_counts[table]:>9,} hot -> {count:>8,} hot + {archived[table]:>9,} archived")
+    print(f"📦 Archived everything before {cutoff:%Y-%m-%d} in {elapsed:.1f}s")
+
+    recent = run(client, repeats)
+    audit = run(client, repeats, 'archive=include')
+
+    print(f"⏱  Median of {repeats} (ms)")
+    print(f"   {'endpoint':<22} {'unarchived':>11} {'recent':>9} {'speedup':>8} {'audit':>9} {'rows':>17}")
+    failures = []
+    for label, path, key in CASES:
+        (before_time, before), (recent_time, recent_rows), (audit_time, audit_rows) = \
+            unarchived[label], recent[label], audit[label]
+        if key:
+            counts = f"{len(ids(recent_rows, key)):,} / {len(ids(audit_rows, key)):,}"
+            if ids(audit_rows, key) != ids(before, key):
+                failures.append(f"{label}: the audit view lists other rows than the unarchived table")
+        else:
+            counts = ''
+        print(f"   {label:<22} {before_time * 1000:>11.1f} {recent_time * 1000:>9.1f} "
+              f"{before_time / recent_time:>7.1f}x {audit_time * 1000:>9.1f} {counts:>17}")
+
+    # Compared by totals: which of several tied products makes the cut may differ
+    for label in ('top products', 'top per department'):
+        if totals(audit[label][1]) != totals(unarchived[label][1]):
+            failures.append(f"{label}: the audit view reports other totals than the unarchived table")
+    if open_after != open_before:
+        failures.append(f"open purchase requests / damaged items went from {open_before} to {open_after}")
+    for table, count in after_counts.items():
+        if count + archived[table] != before_counts[table]:
+            failures.append(f"{table}: {before_counts[table]} rows became {count} hot + {archived[table]} archived")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ The audit view matches the unarchived history")
+
+
+if __name__ == '__main__':
+    main()
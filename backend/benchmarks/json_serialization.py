@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+JSON serialization benchmark
+Builds N in-memory purchase requests (no database needed) and times turning
+them into a response body two ways: the old to_dict() with str()/isoformat()/
+.value on every field plus Flask's default provider, and the current to_dict()
+handing native values to the msgspec provider.
+
+Usage: python benchmarks/json_serialization.py [rows] [repeats]
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('EMAIL_OUTBOX_WORKER', 'False')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from flask.json.provider import DefaultJSONProvider
+from app import create_app
+from models.products import Product, ProductType
+from models.supplier import Supplier
+from models.purchase import PurchaseRequest, PurchaseRequestStatusEnum
+from utils.jsonProvider import MsgspecJSONProvider
+
+app = create_app()
+
+
+def legacy_to_dict(purchase):
+    """PurchaseRequest.to_dict() as it was before the msgspec provider"""
+    return {
+        'request_id': purchase.request_id,
+        'product_id': purchase.product_id,
+        'product_name': purchase.product.name if purchase.product else None,
+        'brand': purchase.product.brand if purchase.product else None,
+        'model': purchase.product.model if purchase.product else None,
+        'supplier_id': purchase.supplier_id,
+        'supplier_name': purchase.supplier.supplier_name if purchase.supplier else None,
+        'unit_price': str(purchase.unit_price) if purchase.unit_price else '0.00',
+        'quantity': purchase.quantity,
+        'status': purchase.status.value,
+        'request_date': purchase.request_date.isoformat() if purchase.request_date else None,
+        'total_amount': str(purchase.total_amount) if purchase.total_amount else '0.00'
+    }
+
+
+def build_rows(count):
+    supplier = Supplier(supplier_id=1, supplier_name='Supplier 1 Trading')
+    products = [Product(product_id=i, name=f'Product {i}', brand='Brand', model='M-1',
+                        product_type=ProductType.item) for i in range(1, 101)]
+    start = datetime(2024, 1, 1)
+    return [
+        PurchaseRequest(request_id=i, product_id=products[i % 100].product_id, product=products[i % 100],
+                        supplier_id=1, supplier=supplier, unit_price=Decimal('125.50'), quantity=4,
+                        status=PurchaseRequestStatusEnum.approved, request_date=start + timedelta(minutes=i),
+                        total_amount=Decimal('502.00'))
+        for i in range(count)
+    ]
+
+
+def best_of(repeats, fn):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    rows = build_rows(count)
+    default_provider = DefaultJSONProvider(app)
+    msgspec_provider = MsgspecJSONProvider(app)
+
+    print(f"📊 Serializing {count} purchase requests (best of {repeats})")
+    with app.app_context():
+        cases = [
+            ('to_dict (old)', lambda: [legacy_to_dict(row) for row in rows]),
+            ('to_dict (native values)', lambda: [row.to_dict() for row in rows]),
+        ]
+        old_dicts = cases[0][1]()
+        new_dicts = cases[1][1]()
+        cases += [
+            ('encode: Flask default', lambda: default_provider.response(old_dicts).get_data()),
+            ('encode: msgspec', lambda: msgspec_provider.response(new_dicts).get_data()),
+            ('total before', lambda: default_provider.response([legacy_to_dict(row) for row in rows]).get_data()),
+            ('total after', lambda: msgspec_provider.response([row.to_dict() for row in rows]).get_data()),
+        ]
+        for label, fn in cases:
+            print(f"   {label:<26} {best_of(repeats, fn) * 1000:8.1f} ms")
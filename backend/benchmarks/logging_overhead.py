@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Logging overhead micro-benchmark
+Measures the time a request thread spends on logging for one login, comparing
+the old block of print() calls against the queued structured logger.
+
+The sink can be made artificially slow (sink_delay_us) to mimic a terminal or
+log collector that is not keeping up.
+
+Usage: python benchmarks/logging_overhead.py [requests] [sink_delay_us]
+"""
+
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import logger as app_logger
+
+SESSION = {'_id': 'a' * 64, '_user_id': '42:3', '_fresh': True, 'permanent': True}
+COOKIES = {'flordegrace_session': 'b' * 64, 'flordegrace_remember_token': '42|' + 'c' * 128}
+
+
+class SlowSink(io.TextIOBase):
+    """A stdout stand-in whose every write blocks for delay seconds"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.writes = 0
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self.writes += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def print_request(out):
+    # What authRoutes.login used to do on every successful login
+    print(f"🔍 LOGIN DEBUG:", file=out, flush=True)
+    print(f"  - User logged in: user42@example.com", file=out, flush=True)
+    print(f"  - Session ID: {SESSION.get('_id')}", file=out, flush=True)
+    print(f"  - User ID in session: {SESSION.get('_user_id')}", file=out, flush=True)
+    print(f"  - Current user authenticated: True", file=out, flush=True)
+    print(f"  - Session keys: {list(SESSION.keys())}", file=out, flush=True)
+    print(f"  - Request cookies: {dict(COOKIES)}", file=out, flush=True)
+
+
+def run(label, fn, requests):
+    start = time.perf_counter()
+    for _ in range(requests):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<28} {elapsed / requests * 1e6:8.1f} µs/request")
+    return elapsed
+
+
+if __name__ == '__main__':
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    delay_us = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    stdout = sys.stdout
+
+    print(f"📊 {requests} simulated logins, sink delay {delay_us:g} µs per write")
+
+    sink = SlowSink(delay_us / 1e6)
+    run('print() x7 (before)', lambda: print_request(sink), requests)
+
+    # Point the queue listener at the slow sink instead of the real stdout
+    sink = SlowSink(delay_us / 1e6)
+    sys.stdout = sink
+    os.environ['LOG_LEVEL'] = 'INFO'
+    app_logger.init_logging()
+    sys.stdout = stdout
+    log = app_logger.get_logger('auth')
+
+    def log_request():
+        log.info("User logged in", extra={'user_id': 42})
+        log.debug("Profile update requested", extra={'user_id': 42, 'fields': ['email']})
+
+    run('queued logger (after)', log_request, requests)
+
+    start = time.perf_counter()
+    app_logger.shutdown_logging()
+    print(f"   listener drained {sink.writes} records in {time.perf_counter() - start:.2f}s off the request path")
+
+    os.environ['LOG_LEVEL'] = 'WARNING'
+    app_logger.init_logging()
+    run('below level (filtered)', log_request, requests)
+    app_logger.shutdown_logging()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Login load test
+Fires N concurrent logins through the Flask test client and reports latency
+percentiles, so the bcrypt pool and limiter settings can be checked locally.
+Fails when fewer than MIN_SUCCESS of the logins succeed, when a stranger's
+bad passwords lock an account out for its owner on another address, or when
+guesses spread over many addresses are not limited per account.
+
+Usage: python benchmarks/login_load.py [concurrency] [rounds]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Default to a throwaway SQLite database so the test never touches real data
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'login_load.db')
+
+from app import create_app
+from extensions import db
+from models.users import User
+from utils.passwordHasher import password_hasher
+
+app = create_app()
+
+PASSWORD = 'LoadTest123'
+# A shift-change burst should log everyone in, not turn most away with 503s
+MIN_SUCCESS = 0.99
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def seed_users(count):
+    with app.app_context():
+        db.create_all()
+        hashed_password = password_hasher.generate_password_hash(PASSWORD)
+        for i in range(count):
+            email = f'loadtest{i}@localhost.test'
+            if not User.query.filter_by(email=email).first():
+                db.session.add(User(email=email, password=hashed_password,
+                                    first_name='Load', last_name=f'Test{i}'))
+        db.session.commit()
+
+
+def run(concurrency, rounds):
+    seed_users(concurrency)
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency)
+
+    def worker(i):
+        client = app.test_client()
+        barrier.wait()
+        for _ in range(rounds):
+            start = time.perf_counter()
+            response = client.post(
+                '/api/auth/login',
+                json={'email': f'loadtest{i}@localhost.test', 'password': PASSWORD},
+                environ_base={'REMOTE_ADDR': f'10.0.{i // 250}.{i % 250}'}
+            )
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    print(f"👥 Concurrency: {concurrency}, rounds: {rounds}, pool workers: {password_hasher.workers}")
+    print(f"📊 Status codes: {statuses}")
+    print(f"⏱️  p50 {percentile(latencies, 50):.1f} ms | p95 {percentile(latencies, 95):.1f} ms | "
+          f"p99 {percentile(latencies, 99):.1f} ms | max {max(latencies):.1f} ms")
+    print(f"🚀 Throughput: {len(latencies) / wall:.1f} logins/s")
+    return statuses.get(200, 0) / len(latencies)
+
+
+def lockout_check():
+    """Bad passwords from one address must not lock the account's owner out"""
+    client = app.test_client()
+    for _ in range(10):
+        client.post('/api/auth/login', json={'email': 'loadtest0@localhost.test', 'password': 'wrong'},
+                    environ_base={'REMOTE_ADDR': '192.0.2.66'})
+    owner = client.post('/api/auth/login', json={'email': 'loadtest0@localhost.test', 'password': PASSWORD},
+                        environ_base={'REMOTE_ADDR': '10.9.9.9'})
+    return owner.status_code
+
+
+def spread_guess_check(addresses=40):
+    """Bad passwords for one account from many addresses must still be limited"""
+    client = app.test_client()
+    statuses = [
+        client.post('/api/auth/login', json={'email': 'loadtest1@localhost.test', 'password': 'wrong'},
+                    environ_base={'REMOTE_ADDR': f'198.51.100.{i}'}).status_code
+        for i in range(addresses)
+    ]
+    return statuses.count(429)
+
+
+if __name__ == '__main__':
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    success = run(concurrency, rounds)
+    owner_status = lockout_check()
+    spread_limited = spread_guess_check()
+    password_hasher.shutdown()
+
+    failures = []
+    if success < MIN_SUCCESS:
+        failures.append(f"only {success:.0%} of logins succeeded (want {MIN_SUCCESS:.0%})")
+    if owner_status != 200:
+        failures.append(f"the account owner got {owner_status} after a stranger's bad passwords")
+    if not spread_limited:
+        failures.append("guesses at one account from 40 addresses were never limited")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"✅ {success:.0%} of logins succeeded; bad passwords elsewhere do not lock the owner out; "
+          f"{spread_limited} of 40 spread guesses limited")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Query budget check
+Seeds a throwaway database, then calls every parameterless GET endpoint under
+/api with the N+1 detector in raise mode. Any endpoint that lazy loads the same
+relationship N_PLUS_ONE_THRESHOLD times or runs more than QUERY_BUDGET
+statements is reported and the script exits non-zero. tests/test_query_budget.py
+asserts the same budgets under pytest.
+
+Usage: python benchmarks/query_budget.py [rows]
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Default to a throwaway SQLite database so the check never touches real data
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'query_budget.db')
+os.environ['N_PLUS_ONE_DETECT'] = 'True'
+os.environ['N_PLUS_ONE_MODE'] = 'raise'
+os.environ.setdefault('QUERY_BUDGET', '20')
+os.environ.setdefault('EMAIL_OUTBOX_WORKER', 'False')
+os.environ.setdefault('BCRYPT_POOL_WORKERS', '0')
+
+from app import create_app
+from extensions import db
+from models.users import User
+from models.products import Product
+from benchmarks.seed_data import BENCH_ADMIN_EMAIL, seed
+from utils.queryDetector import QueryBudgetExceeded
+
+app = create_app()
+
+
+def list_endpoints():
+    for rule in app.url_map.iter_rules():
+        if rule.rule.startswith('/api/') and 'GET' in rule.methods and not rule.arguments:
+            yield rule.rule
+
+
+def run(rows):
+    with app.app_context():
+        db.create_all()
+        if not Product.query.count():
+            # Enough related rows that an N+1 shows up as repeated lazy loads
+            seed(dict(departments=3, suppliers=5, products=rows, purchases=rows * 2,
+                      maintenance=rows, department_requests=rows))
+        admin_id = User.query.filter_by(email=BENCH_ADMIN_EMAIL).first().get_id()
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = admin_id
+        session['_fresh'] = True
+
+    failures = 0
+    for endpoint in sorted(list_endpoints()):
+        try:
+            response = client.get(endpoint)
+            print(f"✅ {endpoint} ({response.status_code})")
+        except QueryBudgetExceeded as e:
+            failures += 1
+            print(f"❌ {str(e).splitlines()[0]}")
+    return failures
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+    app.config['TESTING'] = True
+    failures = run(rows)
+    print(f"\n{'❌' if failures else '✅'} {failures} endpoint(s) over budget")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Read model benchmark
+Seeds a throwaway database, then times each migrated list read two ways: the
+old ORM query + to_dict() per row, and the column projection the service now
+uses. Both are encoded with the app's JSON provider, and the peak memory of
+each path is taken with tracemalloc. Figures are scaled to 10k rows.
+
+Usage: python benchmarks/read_models.py [rows] [repeats]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Default to a throwaway SQLite database so the benchmark never touches real data
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'read_models.db')
+os.environ.setdefault('EMAIL_OUTBOX_WORKER', 'False')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from sqlalchemy.orm import joinedload
+from app import create_app
+from extensions import db
+from models.products import Product
+from models.supplier import Supplier
+from models.department import DepartmentFacility
+from models.departmentrequest import DepartmentRequest
+from models.maintenance import Maintenance
+from services.productsServices import PRODUCT_ROWS
+from services.supplierServices import SUPPLIER_ROWS
+from services.departmentServices import DEPARTMENT_ROWS
+from services.departmentrequestServices import DEPARTMENT_REQUEST_ROWS
+from services.maintenanceServices import MAINTENANCE_ROWS
+from benchmarks.seed_data import seed
+
+app = create_app()
+
+CASES = [
+    ('products', PRODUCT_ROWS,
+     lambda: Product.query.order_by(Product.product_id.asc())),
+    ('suppliers', SUPPLIER_ROWS,
+     lambda: Supplier.query.order_by(Supplier.supplier_id.asc())),
+    ('departments', DEPARTMENT_ROWS,
+     lambda: DepartmentFacility.query.order_by(DepartmentFacility.department_id)),
+    ('department requests', DEPARTMENT_REQUEST_ROWS,
+     lambda: DepartmentRequest.query.options(joinedload(DepartmentRequest.product),
+                                             joinedload(DepartmentRequest.department))),
+    ('maintenance', MAINTENANCE_ROWS,
+     lambda: Maintenance.query.options(joinedload(Maintenance.product)).order_by(Maintenance.maintenance_id.asc())),
+]
+
+
+def orm_read(query):
+    body = app.json.response([row.to_dict() for row in query().all()]).get_data()
+    db.session.remove()
+    return body
+
+
+def projection_read(projection):
+    body = app.json.response(projection.all()).get_data()
+    db.session.remove()
+    return body
+
+
+def measure(repeats, fn):
+    """Best wall time over repeats, then peak traced memory of one more run"""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    with app.app_context():
+        db.create_all()
+        if not Product.query.count():
+            print(f"🌱 Seeding {rows} rows per table...")
+            seed(dict(departments=rows, suppliers=rows, products=rows, purchases=rows,
+                      maintenance=rows, department_requests=rows))
+
+        print(f"📊 List reads per 10k rows (best of {repeats}; peak memory via tracemalloc)")
+        print(f"   {'endpoint':<20} {'ORM ms':>9} {'proj ms':>9} {'ORM MB':>9} {'proj MB':>9}")
+        for label, projection, query in CASES:
+            count = len(projection.all())
+            db.session.remove()
+            if not count:
+                continue
+            scale = 10000 / count
+            orm_time, orm_peak = measure(repeats, lambda: orm_read(query))
+            proj_time, proj_peak = measure(repeats, lambda: projection_read(projection))
+            print(f"   {label:<20} {orm_time * 1000 * scale:9.1f} {proj_time * 1000 * scale:9.1f} "
+                  f"{orm_peak * scale / 2**20:9.1f} {proj_peak * scale / 2**20:9.1f}")
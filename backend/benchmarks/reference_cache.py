@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Reference cache benchmark
+Calls the product, supplier, department and price list endpoints in-process,
+once with every tag bumped before each request (each call reads the database
+and encodes the JSON, as before the cache) and once warm, and reports
+requests per second for both.
+
+Uses DATABASE_URL as is (seed it first with benchmarks/seed_data.py), or a
+throwaway SQLite database seeded with the given number of products.
+
+Usage: python benchmarks/reference_cache.py [products] [requests]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Default to a throwaway SQLite database so the benchmark never touches real data
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'reference_cache.db')
+os.environ.setdefault('EMAIL_OUTBOX_WORKER', 'False')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from app import create_app
+from extensions import db
+from models.users import User
+from models.products import Product
+from benchmarks.seed_data import BENCH_ADMIN_EMAIL, seed
+from utils.cache import reference_cache
+
+app = create_app()
+
+ENDPOINTS = {
+    '/api/products/': ('products',),
+    '/api/supplier/': ('suppliers',),
+    '/api/department/': ('department_facility',),
+    '/api/product-suppliers/': ('product_suppliers',),
+}
+
+
+def run(client, path, requests, tags=None):
+    started = time.perf_counter()
+    for _ in range(requests):
+        if tags:
+            reference_cache.invalidate_tags(*tags)
+        client.get(path, headers={'Accept-Encoding': 'identity'})
+    return requests / (time.perf_counter() - started)
+
+
+if __name__ == '__main__':
+    products = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with app.app_context():
+        db.create_all()
+        if not Product.query.count():
+            print(f"🌱 Seeding {products} products...")
+            seed(dict(departments=30, suppliers=100, products=products, purchases=0,
+                      maintenance=0, department_requests=0))
+        admin_id = User.query.filter_by(email=BENCH_ADMIN_EMAIL).first().get_id()
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = admin_id
+        session['_fresh'] = True
+
+    print(f"🗃️  {requests} requests per endpoint")
+    print(f"   {'endpoint':<26} {'uncached':>12} {'cached':>12} {'speedup':>8}")
+    for path, tags in ENDPOINTS.items():
+        cold = run(client, path, requests, tags)
+        warm = run(client, path, requests)
+        print(f"   {path:<26} {cold:>8.0f} r/s {warm:>8.0f} r/s {warm / cold:>7.1f}x")
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Endpoint benchmark runner
+Drives every GET endpoint (and, with --writes, the POST create endpoints)
+against a seeded database and records p50/p95/p99 latency, throughput and SQL
+queries per request into a JSON results file. Pass --compare with an earlier
+results file to print the change per endpoint.
+
+Requests go through the Flask test client by default, or to a running server
+with --base-url (start it with METRICS_MULTIPROC_DIR set if it has several
+workers so the query counts cover all of them). Seed data first with
+benchmarks/seed_data.py.
+
+Usage: python benchmarks/run_endpoints.py [--requests N] [--concurrency N]
+                                          [--writes] [--base-url URL]
+                                          [--output results.json] [--compare old.json]
+"""
+
+import argparse
+import http.cookiejar
+import itertools
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('EMAIL_OUTBOX_WORKER', 'False')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from sqlalchemy import text
+from app import create_app
+from extensions import db
+from benchmarks.seed_data import BENCH_ADMIN_EMAIL, BENCH_ADMIN_PASSWORD, TABLES
+
+app = create_app()
+
+# Routes with an id in the path, and where to find real ids for them
+ID_SOURCES = {
+    '/api/department/<int:id>': 'SELECT department_id FROM department_facility',
+    '/api/products/<int:product_id>': 'SELECT product_id FROM products',
+    '/api/supplier/<int:supplier_id>': 'SELECT supplier_id FROM suppliers',
+    '/api/admin/users/<int:user_id>': 'SELECT id FROM users',
+}
+
+METRIC_LINE = re.compile(r'^fgs_db_queries_per_request_(sum|count)\{(.*)\} (\S+)$')
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class TestClientTransport:
+    """Calls the app in-process; each thread gets its own logged-in client"""
+
+    def __init__(self):
+        self._local = threading.local()
+        with app.app_context():
+            admin = db.session.execute(
+                text("SELECT id, auth_version FROM users WHERE email = :email"), {'email': BENCH_ADMIN_EMAIL}
+            ).first()
+        if admin is None:
+            raise SystemExit("❌ Benchmark admin not found; run benchmarks/seed_data.py first")
+        # Flask-Login's user id, as User.get_id() builds it
+        self.admin_id = f'{admin.id}:{admin.auth_version}'
+
+    def _client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = app.test_client()
+            with client.session_transaction() as session:
+                session['_user_id'] = self.admin_id
+                session['_fresh'] = True
+        return client
+
+    def request(self, method, path, body=None):
+        response = self._client().open(path, method=method, json=body)
+        return response.status_code, response.get_data()
+
+
+class HttpTransport:
+    """Calls a running server, sharing one login session across threads"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookies))
+        status, _ = self.request('POST', '/api/auth/login',
+                                 {'email': BENCH_ADMIN_EMAIL, 'password': BENCH_ADMIN_PASSWORD})
+        if status != 200:
+            raise SystemExit(f"❌ Could not log in as {BENCH_ADMIN_EMAIL} (HTTP {status})")
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={'Content-Type': 'application/json'} if data else {})
+        try:
+            with self.opener.open(req, timeout=60) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+
+def scrape_query_counts(transport):
+    """Per-(rule, method) totals of fgs_db_queries_per_request from /metrics"""
+    status, body = transport.request('GET', '/metrics')
+    totals = {}
+    if status != 200:
+        return totals
+    for line in body.decode().splitlines():
+        match = METRIC_LINE.match(line)
+        if not match:
+            continue
+        labels = dict(re.findall(r'(\w+)="([^"]*)"', match.group(2)))
+        key = (labels.get('endpoint'), labels.get('method'))
+        totals.setdefault(key, {'sum': 0.0, 'count': 0.0})[match.group(1)] = float(match.group(3))
+    return totals
+
+
+def write_scenarios():
+    """POST endpoints with a body factory each; factories get a unique sequence number"""
+    run_id = datetime.now().strftime('%H%M%S')
+    with app.app_context():
+        def ids(sql):
+            return [row[0] for row in db.session.execute(text(sql))]
+
+        product_ids = ids("SELECT product_id FROM products ORDER BY product_id LIMIT 1000")
+        asset_ids = ids("SELECT product_id FROM products WHERE product_type = 'asset' LIMIT 1000")
+        department_ids = ids("SELECT department_id FROM department_facility")
+        stocked_ids = ids("SELECT product_id FROM inventory WHERE quantity > 100 LIMIT 1000")
+        offers = db.session.execute(text(
+            "SELECT product_id, supplier_id, unit_price FROM product_suppliers LIMIT 1000")).all()
+        pending = db.session.execute(text(
+            "SELECT request_id, quantity FROM purchase_requests WHERE status = 'pending' LIMIT 5000")).all()
+        supplier_ids = ids("SELECT supplier_id FROM suppliers")
+
+    pending_iter = iter(pending)
+
+    def evaluate(n):
+        request_id, quantity = next(pending_iter)
+        return f'/api/evaluate/create/{request_id}', {'undamaged_quantity': quantity, 'damaged_quantity': 0}
+
+    def purchase(n):
+        product_id, supplier_id, price = offers[n % len(offers)]
+        return '/api/purchase/create', {'product_id': product_id, 'supplier_id': supplier_id,
+                                        'unit_price': float(price), 'quantity': 5}
+
+    def product_supplier(n):
+        # A supplier from the far end of the list is unlikely to carry the product already
+        return '/api/product-suppliers/create', {'product_id': product_ids[n % len(product_ids)],
+                                                 'supplier_id': supplier_ids[-1 - n % len(supplier_ids)],
+                                                 'unit_price': 99.5}
+
+    return {
+        'POST /api/department/create': lambda n: ('/api/department/create', {'department_name': f'Bench {run_id}-{n}'}),
+        'POST /api/supplier/create': lambda n: ('/api/supplier/create', {
+            'supplier_name': f'Bench Supplier {run_id}-{n}', 'address': 'Manila', 'contact_number': '09171234567'}),
+        'POST /api/products/create': lambda n: ('/api/products/create', {
+            'name': f'Bench Product {run_id}-{n}', 'category': 'Bench', 'product_type': 'item',
+            'brand': 'Bench', 'model': 'B-1'}),
+        'POST /api/product-suppliers/create': product_supplier,
+        'POST /api/purchase/create': purchase,
+        'POST /api/evaluate/create/<int:request_id>': evaluate,
+        'POST /api/maintenance/create': lambda n: ('/api/maintenance/create', {
+            'product_id': asset_ids[n % len(asset_ids)], 'engineer_name': 'Bench Engineer'}),
+        'POST /api/department-request/create': lambda n: ('/api/department-request/create', {
+            'department_id': department_ids[n % len(department_ids)],
+            'product_id': stocked_ids[n % len(stocked_ids)], 'quantity': 1}),
+    }
+
+
+def read_scenarios():
+    """Every GET route under /api, with path ids filled from real rows"""
+    scenarios = {}
+    with app.app_context():
+        for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+            if not rule.rule.startswith('/api/') or 'GET' not in rule.methods:
+                continue
+            if not rule.arguments:
+                scenarios[f'GET {rule.rule}'] = (lambda path: lambda n: (path, None))(rule.rule)
+            elif rule.rule in ID_SOURCES:
+                values = [row[0] for row in db.session.execute(text(ID_SOURCES[rule.rule] + ' LIMIT 1000'))]
+                if values:
+                    scenarios[f'GET {rule.rule}'] = (
+                        lambda path, v: lambda n: (re.sub(r'<[^>]+>', str(v[n % len(v)]), path), None)
+                    )(rule.rule, values)
+    return scenarios
+
+
+def run_scenario(transport, factory, method, requests, concurrency):
+    counter = itertools.count()
+    lock = threading.Lock()
+    latencies, statuses = [], {}
+
+    def worker():
+        while True:
+            n = next(counter)
+            if n >= requests:
+                return
+            try:
+                path, body = factory(n)
+            except StopIteration:
+                return
+            started = time.perf_counter()
+            status, _ = transport.request(method, path, body)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    return latencies, statuses, wall
+
+
+def summarize(latencies, statuses, wall, queries):
+    if not latencies:
+        return None
+    return {
+        'requests': len(latencies),
+        'errors': sum(count for status, count in statuses.items() if status >= 500),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+        'throughput_rps': round(len(latencies) / wall, 1) if wall else None,
+        'queries_per_request': queries,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)['endpoints']
+    print(f"\n📊 Compared with {baseline_path}")
+    print(f"   {'endpoint':<52} {'p95 ms':>16} {'queries/req':>16}")
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        p95 = f"{before['p95_ms']:.1f} → {current['p95_ms']:.1f}"
+        qpr_before, qpr_after = before.get('queries_per_request'), current.get('queries_per_request')
+        qpr = f"{qpr_before} → {qpr_after}" if qpr_before is not None and qpr_after is not None else '-'
+        flag = '🔺' if current['p95_ms'] > before['p95_ms'] * 1.2 else '  '
+        print(f"{flag} {name:<52} {p95:>16} {qpr:>16}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every endpoint against a seeded database')
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--writes', action='store_true', help='also benchmark the POST create endpoints')
+    parser.add_argument('--base-url', help='benchmark a running server instead of the test client')
+    parser.add_argument('--only', help='regex; only run endpoints whose name matches')
+    parser.add_argument('--output', default=f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json")
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    transport = HttpTransport(args.base_url) if args.base_url else TestClientTransport()
+    scenarios = read_scenarios()
+    if args.writes:
+        scenarios.update(write_scenarios())
+    if args.only:
+        scenarios = {name: factory for name, factory in scenarios.items() if re.search(args.only, name)}
+
+    with app.app_context():
+        row_counts = {table: db.session.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar() for table in TABLES}
+        database = db.engine.dialect.name
+
+    print(f"🚀 {len(scenarios)} endpoints, {args.requests} requests each, concurrency {args.concurrency}")
+    results = {}
+    for name, factory in scenarios.items():
+        method, rule = name.split(' ', 1)
+        before = scrape_query_counts(transport).get((rule, method), {'sum': 0.0, 'count': 0.0})
+        latencies, statuses, wall = run_scenario(transport, factory, method, args.requests, args.concurrency)
+        after = scrape_query_counts(transport).get((rule, method), {'sum': 0.0, 'count': 0.0})
+
+        counted = after['count'] - before['count']
+        queries = round((after['sum'] - before['sum']) / counted, 1) if counted else None
+        summary = summarize(latencies, statuses, wall, queries)
+        if summary is None:
+            print(f"⏭️  {name}: no requests made")
+            continue
+        results[name] = summary
+        flag = '❌' if summary['errors'] else '✅'
+        print(f"{flag} {name:<52} p50 {summary['p50_ms']:>8.1f}  p95 {summary['p95_ms']:>8.1f}  "
+              f"p99 {summary['p99_ms']:>8.1f} ms  {summary['throughput_rps']:>7.1f} req/s  "
+              f"{queries if queries is not None else '-':>5} q/req")
+
+    output = {
+        'meta': {
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'transport': args.base_url or 'test-client',
+            'database': database,
+            'requests_per_endpoint': args.requests,
+            'concurrency': args.concurrency,
+            'row_counts': row_counts,
+        },
+        'endpoints': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
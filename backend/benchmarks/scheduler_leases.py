@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Scheduler lease check
+Runs several schedulers at once against the same database, the way several
+worker processes would, all driven by one manual clock through a simulated
+day in one-minute steps. Every scheduler ticks concurrently at each step, so
+they race for the same leases. Checks that each fleet job ran exactly once
+per slot, that a failing job is recorded and stays on schedule, and that a
+lease left behind by a crashed process blocks the job until it expires.
+Also checks that create_app leaves the app's scheduler and outbox sender
+stopped even when enabled, and that start_background_workers and
+stop_background_workers start and stop them. Prints the first scheduler's
+/metrics samples at the end.
+
+Uses DATABASE_URL as is, or a throwaway SQLite database. Only touches
+scheduler_leases rows named check_*.
+
+Usage: python benchmarks/scheduler_leases.py [schedulers]
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'scheduler.db')
+# Enabled, to check that building the app alone starts neither
+os.environ['EMAIL_OUTBOX_WORKER'] = 'True'
+os.environ['SCHEDULER_ENABLED'] = 'True'
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from app import create_app, start_background_workers, stop_background_workers
+from extensions import db
+from models.joblease import JobLease
+from utils.emailOutbox import outbox_worker
+from utils.metrics import metrics
+from utils.scheduler import Cron, Interval, ManualClock, Scheduler, scheduler as app_scheduler
+
+
+class Counter:
+    def __init__(self):
+        self.runs = []
+        self._lock = threading.Lock()
+
+    def __call__(self, now):
+        with self._lock:
+            self.runs.append(now)
+        time.sleep(0.001)
+
+
+def fail(now):
+    raise RuntimeError("check failure")
+
+
+def start_stop_check(app):
+    """create_app (as flask db upgrade and scripts run it) must not start the
+    background threads; only the server entry points do"""
+    failures = []
+    if app_scheduler.running or outbox_worker.running:
+        failures.append(f"create_app started the scheduler ({app_scheduler.running}) "
+                        f"or outbox sender ({outbox_worker.running})")
+    start_background_workers(app)
+    if not (app_scheduler.running and outbox_worker.running):
+        failures.append("start_background_workers left the scheduler or outbox sender stopped")
+    stop_background_workers()
+    if app_scheduler.running or outbox_worker.running:
+        failures.append("stop_background_workers left the scheduler or outbox sender running")
+    return failures
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    app = create_app('development')
+    lifecycle_failures = start_stop_check(app)
+    with app.app_context():
+        db.create_all()
+        JobLease.query.filter(JobLease.job_name.like('check_%')).delete(synchronize_session=False)
+        db.session.commit()
+
+    clock = ManualClock(datetime(2026, 1, 5, 0, 0))
+    every_five, hourly = Counter(), Counter()
+    schedulers = []
+    for _ in range(count):
+        scheduler = Scheduler(clock)
+        scheduler.app = app
+        scheduler.add('check_every_5m', every_five, Interval(minutes=5))
+        scheduler.add('check_hourly', hourly, Cron('0 * * * *', 'Asia/Manila'))
+        scheduler.add('check_failing', fail, Interval(minutes=30))
+        schedulers.append(scheduler)
+    metrics.register(schedulers[0].collect_metrics)
+    # The failing job's tracebacks are expected
+    logging.getLogger('fgs.scheduler').setLevel(logging.CRITICAL)
+
+    print(f"⏱  {count} schedulers, one simulated day in 1-minute steps")
+    started = time.perf_counter()
+    # The first tick registers the leases; the first runs are one period later
+    for scheduler in schedulers:
+        scheduler.tick()
+    with ThreadPoolExecutor(max_workers=count) as tickers:
+        for _ in range(24 * 60):
+            clock.advance(minutes=1)
+            futures = [future for tick in [tickers.submit(s.tick) for s in schedulers] for future in tick.result()]
+            wait(futures)
+    elapsed = time.perf_counter() - started
+
+    failures = list(lifecycle_failures)
+    if len(every_five.runs) != 24 * 60 // 5 or len(set(every_five.runs)) != len(every_five.runs):
+        failures.append(f"check_every_5m ran {len(every_five.runs)} times ({len(set(every_five.runs))} distinct), expected 288")
+    if len(hourly.runs) != 24 or any(run.minute != 0 for run in hourly.runs):
+        failures.append(f"check_hourly ran {len(hourly.runs)} times, expected 24 on the hour")
+    failed_runs = sum(s.runs.get(('check_failing', 'failed'), 0) for s in schedulers)
+    if failed_runs != 24 * 2:
+        failures.append(f"check_failing ran {failed_runs} times, expected 48")
+    with app.app_context():
+        failing = db.session.get(JobLease, 'check_failing')
+        if failing.last_status != 'failed' or 'check failure' not in (failing.last_error or ''):
+            failures.append(f"check_failing recorded as {failing.last_status!r}: {failing.last_error!r}")
+
+        # A crashed process: its lease is still live, so nobody may run the job
+        lease = db.session.get(JobLease, 'check_every_5m')
+        lease.owner, lease.leased_until = 'crashed', clock.now() + timedelta(minutes=15)
+        lease.next_run_at = clock.now()
+        db.session.commit()
+    before = len(every_five.runs)
+    for minute in range(20):
+        clock.advance(minutes=1)
+        wait([future for s in schedulers for future in s.tick()])
+        ran = len(every_five.runs) - before
+        if minute < 14 and ran:
+            failures.append(f"check_every_5m ran {minute + 1} minutes into a crashed process's lease")
+            break
+    if len(every_five.runs) - before == 0:
+        failures.append("check_every_5m never ran after the crashed process's lease expired")
+
+    print(f"   {len(every_five.runs)} + {len(hourly.runs)} + {failed_runs} runs in {elapsed:.1f}s, "
+          f"split across schedulers as {[sum(s.runs.values()) for s in schedulers]}")
+    print("   metrics of the first scheduler:")
+    for line in metrics.render().splitlines():
+        if line.startswith(('fgs_scheduler_runs_total', 'fgs_scheduler_run_seconds_count')):
+            print(f"     {line}")
+
+    for scheduler in schedulers:
+        scheduler.stop()
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Every job ran once per slot across all schedulers")
+
+
+if __name__ == '__main__':
+    main()
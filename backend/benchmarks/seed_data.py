@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator
+Fills the database (DATABASE_URL) with realistic, referentially consistent
+inventory data: departments, suppliers, products, supplier price lists,
+purchase requests, their evaluations and damaged items, the inventory those
+evaluations produce, maintenance records and department requests.
+
+On PostgreSQL rows are streamed with COPY; other databases fall back to
+batched INSERTs, which is fine for the small scale.
+
+Usage: python benchmarks/seed_data.py [--scale small|medium|large] [--reset]
+                                      [--days N] [--open-days N]
+                                      [--products N] [--suppliers N] ...
+"""
+
+import argparse
+import csv
+import io
+import itertools
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+SCALES = {
+    'small': dict(departments=20, suppliers=200, products=2000, purchases=20000,
+                  maintenance=1000, department_requests=5000),
+    'medium': dict(departments=60, suppliers=1000, products=20000, purchases=200000,
+                   maintenance=10000, department_requests=50000),
+    'large': dict(departments=150, suppliers=5000, products=200000, purchases=2000000,
+                  maintenance=50000, department_requests=500000),
+}
+
+# Tables in dependency order; --reset truncates them in reverse
+TABLES = [
+    'department_facility', 'suppliers', 'products', 'product_suppliers', 'purchase_requests',
+    'evaluation', 'damaged_items', 'inventory', 'maintenance', 'department_requests',
+]
+# Filled by the archive job, not here; emptied by --reset too
+ARCHIVE_TABLES = [
+    'purchase_requests_archive', 'evaluation_archive', 'damaged_items_archive', 'department_requests_archive',
+]
+
+BENCH_ADMIN_EMAIL = 'bench.admin@localhost.test'
+BENCH_ADMIN_PASSWORD = os.getenv('BENCH_ADMIN_PASSWORD', 'BenchAdmin123')
+
+CATEGORIES = ['Office Supplies', 'IT Equipment', 'Furniture', 'Cleaning', 'Electrical',
+              'Plumbing', 'Medical', 'Laboratory', 'Kitchen', 'Safety']
+BRANDS = ['Acer', 'Brother', 'Canon', 'Dell', 'Epson', 'HP', 'Lenovo', 'Panasonic',
+          'Samsung', 'Uratex', 'Omega', 'Maxima', 'Joy', 'Zonrox', 'Firefly']
+ITEMS = ['Printer', 'Laptop', 'Monitor', 'Chair', 'Desk', 'Cabinet', 'Projector', 'Bond Paper',
+         'Ink Cartridge', 'Stapler', 'Bleach', 'Mop', 'Extension Cord', 'LED Bulb', 'Faucet',
+         'Thermometer', 'Microscope', 'Rice Cooker', 'Fire Extinguisher', 'Hard Hat']
+DEPARTMENTS = ['Registrar', 'Accounting', 'Library', 'Clinic', 'Guidance', 'IT Office',
+               'Science Lab', 'Canteen', 'Gymnasium', 'Admissions', 'Maintenance Office']
+STREETS = ['Rizal St.', 'Mabini Ave.', 'Bonifacio Rd.', 'Luna St.', 'Quezon Blvd.', 'Del Pilar St.']
+CITIES = ['Manila', 'Quezon City', 'Makati', 'Pasig', 'Cebu City', 'Davao City', 'Iloilo City']
+ENGINEERS = ['R. Santos', 'M. Reyes', 'J. Cruz', 'A. Garcia', 'L. Mendoza', 'P. Villanueva']
+
+
+class TableWriter:
+    """Streams rows into one table with COPY, or batched INSERTs off PostgreSQL"""
+
+    def __init__(self, db, table, columns, batch_size=50000, parents=()):
+        self.db = db
+        self.table = table
+        self.columns = columns
+        self.batch_size = batch_size
+        # Writers filled in the same loop whose rows this table references
+        self.parents = parents
+        self.copy = db.engine.dialect.name == 'postgresql'
+        self.rows = []
+        self.count = 0
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        for parent in self.parents:
+            parent.flush()
+        if self.copy:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(('' if value is None else value for value in row) for row in self.rows)
+            buffer.seek(0)
+            connection = self.db.session.connection().connection
+            with connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {self.table} ({', '.join(self.columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+                )
+        else:
+            placeholders = ', '.join(f':{column}' for column in self.columns)
+            self.db.session.execute(
+                text(f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES ({placeholders})"),
+                [dict(zip(self.columns, row)) for row in self.rows]
+            )
+        self.count += len(self.rows)
+        self.rows = []
+
+
+def timestamp(value):
+    # SQLAlchemy's SQLite storage format: SQLite compares datetimes as text, so
+    # a value without the microseconds sorts before the same time bound as a parameter
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+def reset(db):
+    print("🗑️  Truncating inventory tables...")
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(text(f"TRUNCATE {', '.join(reversed(TABLES + ARCHIVE_TABLES))} RESTART IDENTITY CASCADE"))
+    else:
+        for table in reversed(TABLES + ARCHIVE_TABLES):
+            db.session.execute(text(f"DELETE FROM {table}"))
+    db.session.commit()
+
+
+def sync_sequences(db):
+    """Move serial sequences past the explicit ids written by COPY"""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    id_columns = {
+        'department_facility': 'department_id', 'suppliers': 'supplier_id', 'products': 'product_id',
+        'product_suppliers': 'product_supplier_id', 'purchase_requests': 'request_id',
+        'evaluation': 'evaluation_id', 'damaged_items': 'damaged_item_id', 'inventory': 'inventory_id',
+        'maintenance': 'maintenance_id', 'department_requests': 'department_request_id',
+    }
+    for table, column in id_columns.items():
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), "
+            f"COALESCE((SELECT MAX({column}) FROM {table}), 0) + 1, false)"
+        ))
+
+
+def ensure_admin(db, User):
+    """A known admin account for the benchmark runner to log in with"""
+    if User.query.filter_by(email=BENCH_ADMIN_EMAIL).first():
+        return
+    from utils.passwordHasher import _hash_password
+    db.session.add(User(email=BENCH_ADMIN_EMAIL, password=_hash_password(BENCH_ADMIN_PASSWORD, 12),
+                        first_name='Bench', last_name='Admin', is_admin=True))
+    db.session.commit()
+
+
+def generate(db, counts, seed=42, days=730, open_days=None):
+    """Rows dated over the last ``days`` days. With ``open_days``, only requests
+    that recent may still be pending evaluation or replacement."""
+    rng = random.Random(seed)
+    now = datetime.now()
+    start = now - timedelta(days=days)
+    settled = now - timedelta(days=open_days) if open_days is not None else start
+
+    def when():
+        return start + timedelta(seconds=rng.randrange(days * 86400))
+
+    # Departments and suppliers
+    writer = TableWriter(db, 'department_facility', ['department_id', 'department_name', 'created_at', 'updated_at'])
+    for department_id in range(1, counts['departments'] + 1):
+        name = f"{DEPARTMENTS[department_id % len(DEPARTMENTS)]} {department_id}"
+        created = timestamp(when())
+        writer.add((department_id, name, created, created))
+    writer.flush()
+
+    writer = TableWriter(db, 'suppliers', ['supplier_id', 'supplier_name', 'address', 'contact_number',
+                                           'status', 'created_at', 'updated_at'])
+    for supplier_id in range(1, counts['suppliers'] + 1):
+        address = f"{rng.randrange(1, 999)} {rng.choice(STREETS)}, {rng.choice(CITIES)}"
+        created = timestamp(when())
+        writer.add((supplier_id, f"Supplier {supplier_id} Trading", address, f"09{rng.randrange(10**9):09d}",
+                    'active' if rng.random() < 0.9 else 'inactive', created, created))
+    writer.flush()
+
+    # Products, each sold by one to three suppliers
+    products = TableWriter(db, 'products', ['product_id', 'name', 'category', 'product_type', 'brand',
+                                            'model', 'created_at', 'updated_at'])
+    price_list = TableWriter(db, 'product_suppliers', ['product_supplier_id', 'product_id', 'supplier_id',
+                                                       'unit_price', 'status', 'created_at', 'updated_at'],
+                             parents=[products])
+    offers = {}
+    asset_ids = []
+    price_ids = itertools.count(1)
+    for product_id in range(1, counts['products'] + 1):
+        item = ITEMS[product_id % len(ITEMS)]
+        brand = rng.choice(BRANDS)
+        model = f"{brand[:2].upper()}-{rng.randrange(100, 9999)}"
+        product_type = 'asset' if item in ('Printer', 'Laptop', 'Monitor', 'Projector', 'Microscope') else 'item'
+        if product_type == 'asset':
+            asset_ids.append(product_id)
+        created = timestamp(when())
+        products.add((product_id, f"{brand} {item} {model} #{product_id}", rng.choice(CATEGORIES),
+                      product_type, brand, model, created, created))
+
+        base_price = round(rng.uniform(20, 5000), 2)
+        suppliers = rng.sample(range(1, counts['suppliers'] + 1), k=min(counts['suppliers'], rng.randint(1, 3)))
+        offers[product_id] = []
+        for supplier_id in suppliers:
+            price = round(base_price * rng.uniform(0.9, 1.1), 2)
+            offers[product_id].append((supplier_id, price))
+            price_list.add((next(price_ids), product_id, supplier_id, f"{price:.2f}",
+                            'active', created, created))
+    products.flush()
+    price_list.flush()
+
+    # Purchase requests; evaluated ones add to inventory and may record damage
+    purchases = TableWriter(db, 'purchase_requests', ['request_id', 'product_id', 'supplier_id', 'unit_price',
+                                                      'quantity', 'status', 'request_date', 'total_amount'])
+    evaluations = TableWriter(db, 'evaluation', ['evaluation_id', 'request_id', 'undamaged_quantity',
+                                                 'damaged_quantity', 'evaluation_date'], parents=[purchases])
+    damages = TableWriter(db, 'damaged_items', ['damaged_item_id', 'evaluation_id', 'product_id', 'quantity',
+                                                'return_status', 'created_at', 'updated_at'], parents=[evaluations])
+    stock = {}
+    evaluation_ids = itertools.count(1)
+    damage_ids = itertools.count(1)
+    for request_id in range(1, counts['purchases'] + 1):
+        product_id = rng.randrange(1, counts['products'] + 1)
+        supplier_id, price = rng.choice(offers[product_id])
+        quantity = rng.randint(1, 50)
+        requested = when()
+
+        roll = rng.random()
+        if requested < settled:
+            # Evaluated long ago: the same odds for the outcomes other than pending
+            roll = 0.3 + roll * 0.7
+        if roll < 0.3:
+            status, undamaged = 'pending', None
+        elif roll < 0.31:
+            status, undamaged = 'rejected', 0
+        elif roll < 0.45:
+            status, undamaged = 'approved', rng.randint(1, quantity)
+        else:
+            status, undamaged = 'approved', quantity
+
+        purchases.add((request_id, product_id, supplier_id, f"{price:.2f}", quantity, status,
+                       timestamp(requested), f"{price * quantity:.2f}"))
+        if undamaged is None:
+            continue
+
+        evaluated = requested + timedelta(hours=rng.randint(1, 240))
+        evaluation_id = next(evaluation_ids)
+        damaged = quantity - undamaged
+        evaluations.add((evaluation_id, request_id, undamaged, damaged, timestamp(evaluated)))
+        if damaged:
+            return_status = 'rejected' if status == 'rejected' else rng.choice(['pending', 'pending', 'replaced'])
+            if return_status == 'pending' and requested < settled:
+                return_status = 'replaced'
+            damages.add((next(damage_ids), evaluation_id, product_id, damaged,
+                         return_status, timestamp(evaluated), timestamp(evaluated)))
+        if undamaged:
+            quantity_on_hand, amount = stock.get(product_id, (0, 0.0))
+            stock[product_id] = (quantity_on_hand + undamaged, amount + undamaged * price)
+    purchases.flush()
+    evaluations.flush()
+    damages.flush()
+
+    # Department requests draw down the stock that evaluations produced
+    requests = TableWriter(db, 'department_requests', ['department_request_id', 'department_id', 'product_id',
+                                                       'quantity', 'request_date'])
+    stocked = list(stock)
+    for department_request_id in range(1, counts['department_requests'] + 1):
+        if not stocked:
+            break
+        product_id = rng.choice(stocked)
+        quantity_on_hand, amount = stock[product_id]
+        quantity = min(quantity_on_hand, rng.randint(1, 5))
+        unit_cost = amount / quantity_on_hand
+        stock[product_id] = (quantity_on_hand - quantity, amount - quantity * unit_cost)
+        if stock[product_id][0] == 0:
+            stocked.remove(product_id)
+        requests.add((department_request_id, rng.randrange(1, counts['departments'] + 1), product_id,
+                      quantity, timestamp(when())))
+    requests.flush()
+
+    writer = TableWriter(db, 'inventory', ['inventory_id', 'product_id', 'quantity', 'running_amount',
+                                           'created_at', 'updated_at'])
+    for inventory_id, (product_id, (quantity, amount)) in enumerate(sorted(stock.items()), start=1):
+        created = timestamp(when())
+        writer.add((inventory_id, product_id, quantity, f"{min(max(amount, 0), 99999999.99):.2f}", created, created))
+    writer.flush()
+
+    # Maintenance on asset-type products
+    writer = TableWriter(db, 'maintenance', ['maintenance_id', 'product_id', 'description', 'engineer_name',
+                                             'scheduled_date', 'completed_date', 'status', 'notes',
+                                             'created_at', 'updated_at'])
+    for maintenance_id in range(1, counts['maintenance'] + 1 if asset_ids else 1):
+        scheduled = when()
+        status = rng.choice(['pending', 'in_progress', 'completed', 'completed', 'condemned'])
+        completed = f"{timestamp(scheduled + timedelta(days=rng.randint(1, 14)))}+08:00" if status == 'completed' else None
+        created = f"{timestamp(scheduled - timedelta(days=rng.randint(1, 30)))}+08:00"
+        writer.add((maintenance_id, rng.choice(asset_ids), 'Routine preventive maintenance',
+                    rng.choice(ENGINEERS), f"{timestamp(scheduled)}+08:00", completed, status, None,
+                    created, created))
+    writer.flush()
+
+    sync_sequences(db)
+    db.session.commit()
+
+
+def seed(counts, reset_tables=False, seed=42, days=730, open_days=None):
+    """Seed inside the caller's app context; returns per-table row counts"""
+    from extensions import db
+    from models.users import User
+
+    if reset_tables:
+        reset(db)
+    elif db.session.execute(text("SELECT COUNT(*) FROM products")).scalar():
+        raise SystemExit("❌ Tables already contain data; pass --reset to replace it")
+
+    generate(db, counts, seed, days, open_days)
+    ensure_admin(db, User)
+    return {table: db.session.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar() for table in TABLES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic inventory data')
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--reset', action='store_true', help='truncate the inventory tables first')
+    parser.add_argument('--seed', type=int, default=42, help='random seed, for repeatable datasets')
+    parser.add_argument('--days', type=int, default=730, help='days of history to spread the rows over')
+    parser.add_argument('--open-days', type=int, help='only requests this recent may still be pending')
+    for name in SCALES['small']:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, dest=name, help=f'override the {name} count')
+    args = parser.parse_args()
+
+    counts = dict(SCALES[args.scale])
+    counts.update({name: getattr(args, name) for name in counts if getattr(args, name) is not None})
+
+    from app import create_app
+    from extensions import db
+    with create_app().app_context():
+        db.create_all()
+        print(f"🌱 Seeding {args.scale} dataset: {counts}")
+        started = time.perf_counter()
+        totals = seed(counts, args.reset, args.seed, args.days, args.open_days)
+        elapsed = time.perf_counter() - started
+
+    for table, count in totals.items():
+        print(f"   {table:<22} {count:>10,}")
+    print(f"✅ Done in {elapsed:.1f}s (admin login: {BENCH_ADMIN_EMAIL})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Sparse fieldset benchmark
+Calls list endpoints in-process with and without a ?fields= selection of the
+kind a dropdown or lookup needs, and reports server time (best of N) and
+uncompressed payload size for both. The reference cache is disabled so both
+sides pay for the query and the encoding.
+
+Uses DATABASE_URL as is (seed it first with benchmarks/seed_data.py), or a
+throwaway SQLite database seeded with the given number of purchases.
+
+Usage: python benchmarks/sparse_fields.py [purchases] [repeats]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Default to a throwaway SQLite database so the benchmark never touches real data
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'sparse_fields.db')
+os.environ.setdefault('EMAIL_OUTBOX_WORKER', 'False')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ['REFERENCE_CACHE_TTL'] = '0'
+
+from app import create_app
+from extensions import db
+from models.users import User
+from models.products import Product
+from benchmarks.seed_data import BENCH_ADMIN_EMAIL, seed
+
+app = create_app()
+
+CASES = [
+    ('/api/products/', 'product_id,name'),
+    ('/api/product-suppliers/', 'product_supplier_id,unit_price,product.name,supplier.supplier_name'),
+    ('/api/purchase/', 'request_id,product_name,status'),
+    ('/api/inventory/', 'product_id,product_name,quantity'),
+    ('/api/evaluate/', 'evaluation_id,request_id,damaged_quantity'),
+]
+
+
+def timed_get(client, path, repeats):
+    best, response = None, None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        response = client.get(path, headers={'Accept-Encoding': 'identity'})
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, response
+
+
+if __name__ == '__main__':
+    purchases = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    with app.app_context():
+        db.create_all()
+        if not Product.query.count():
+            print(f"🌱 Seeding {purchases} purchases...")
+            seed(dict(departments=20, suppliers=200, products=purchases // 4, purchases=purchases,
+                      maintenance=0, department_requests=0))
+        admin_id = User.query.filter_by(email=BENCH_ADMIN_EMAIL).first().get_id()
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = admin_id
+        session['_fresh'] = True
+
+    print(f"✂️  Best of {repeats}")
+    print(f"   {'endpoint':<26} {'full ms':>9} {'sparse ms':>10} {'full bytes':>12} {'sparse bytes':>13} {'saved':>6}")
+    for path, fields in CASES:
+        full_time, full = timed_get(client, path, repeats)
+        sparse_time, sparse = timed_get(client, f'{path}?fields={fields}', repeats)
+        full_size, sparse_size = len(full.get_data()), len(sparse.get_data())
+        print(f"   {path:<26} {full_time * 1000:>9.1f} {sparse_time * 1000:>10.1f} "
+              f"{full_size:>12,} {sparse_size:>13,} {1 - sparse_size / full_size:>6.0%}")
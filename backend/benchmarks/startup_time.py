@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Startup time benchmark
+Measures, in fresh interpreters, how long a worker takes to become useful:
+importing the app module, create_app() for each config, and the first
+request. It then compares a cold worker boot with forking from an already
+loaded app and running after_fork(), which is what gunicorn's preload_app
+gives each worker.
+
+Usage: python benchmarks/startup_time.py [runs]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a child interpreter; prints one JSON object of timings in ms
+PROBE = '''
+import json, os, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {backend!r})
+import app as app_module
+imported = time.perf_counter()
+app = app_module.create_app({config!r})
+created = time.perf_counter()
+with app.test_client() as client:
+    client.get('/test-db')
+first_request = time.perf_counter()
+
+read_end, write_end = os.pipe()
+forked = time.perf_counter()
+pid = os.fork()
+if pid == 0:
+    app_module.after_fork(app)
+    with app.test_client() as client:
+        client.get('/test-db')
+    os.write(write_end, b'x')
+    os._exit(0)
+os.read(read_end, 1)
+fork_ready = time.perf_counter()
+os.waitpid(pid, 0)
+
+print(json.dumps({{
+    'import': (imported - started) * 1000,
+    'create_app': (created - imported) * 1000,
+    'first_request': (first_request - created) * 1000,
+    'cold_total': (first_request - started) * 1000,
+    'fork_ready': (fork_ready - forked) * 1000,
+}}))
+'''
+
+
+def probe(config):
+    env = dict(os.environ)
+    env.setdefault('SECRET_KEY', 'startup-benchmark')
+    output = subprocess.run([sys.executable, '-c', PROBE.format(backend=BACKEND, config=config)],
+                            env=env, cwd=BACKEND, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    # Default to a throwaway SQLite database so the benchmark never touches real data
+    if not os.getenv('DATABASE_URL'):
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'startup_time.db')
+    os.environ.setdefault('EMAIL_OUTBOX_WORKER', 'False')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    for config in ('development', 'production'):
+        samples = [probe(config) for _ in range(runs)]
+        print(f"⏱️  {config} (median of {runs} fresh interpreters)")
+        for key in ('import', 'create_app', 'first_request', 'cold_total', 'fork_ready'):
+            print(f"   {key:<14} {statistics.median(sample[key] for sample in samples):8.1f} ms")
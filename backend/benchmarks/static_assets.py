@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Static asset benchmark
+Compares requests per second for the frontend files served the old way (a
+Flask catch-all route calling send_from_directory) with the static asset
+layer in front of the app. Uses frontend/dist when it has been built,
+otherwise a synthetic Vite-like build in a temp folder. Both sides are
+called in-process with a browser-like Accept-Encoding.
+
+Usage: python benchmarks/static_assets.py [requests]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Default to a throwaway SQLite database so the benchmark never touches real data
+if not os.getenv('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'static_assets.db')
+os.environ.setdefault('EMAIL_OUTBOX_WORKER', 'False')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from flask import abort, send_from_directory
+from app import create_app
+
+HEADERS = {'Accept-Encoding': 'gzip, deflate, br', 'Accept': '*/*'}
+
+
+def synthetic_dist():
+    """index.html plus hashed JS/CSS bundles of realistic size"""
+    folder = tempfile.mkdtemp()
+    os.makedirs(os.path.join(folder, 'assets'))
+    rng = random.Random(1)
+    files = {
+        'index.html': '<!doctype html><html><head><script type="module" src="/assets/index-AbC12_xY.js">'
+                      '</script></head><body><div id="root"></div></body></html>',
+        'assets/index-AbC12_xY.js': '\n'.join(f'function f{i}(a,b){{return a*{i}+b+"{rng.random()}";}}' for i in range(15000)),
+        'assets/index-Zz9Yy8Xx.css': '\n'.join(f'.c{i}{{color:#{i % 999:03d};margin:{i % 7}px}}' for i in range(3000)),
+        'vite.svg': '<svg xmlns="http://www.w3.org/2000/svg"><rect width="10" height="10"/></svg>',
+    }
+    for name, content in files.items():
+        with open(os.path.join(folder, name), 'w') as f:
+            f.write(content)
+    return folder
+
+
+def legacy_app(folder):
+    """The app with the static layer removed and the old catch-all route restored"""
+    app = create_app()
+    app.wsgi_app = app.wsgi_app.wsgi_app
+
+    @app.route("/", defaults={"filename": ""})
+    @app.route("/<path:filename>")
+    def index(filename):
+        if not filename:
+            filename = "index.html"
+        try:
+            return send_from_directory(folder, filename)
+        except FileNotFoundError:
+            abort(404)
+    return app
+
+
+def run(app, paths, requests):
+    client = app.test_client()
+    transferred = 0
+    started = time.perf_counter()
+    for i in range(requests):
+        response = client.get(paths[i % len(paths)], headers=HEADERS)
+        transferred += len(response.get_data())
+    elapsed = time.perf_counter() - started
+    return requests / elapsed, transferred / requests
+
+
+if __name__ == '__main__':
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    dist = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '..', 'frontend', 'dist')
+    folder = dist if os.path.isfile(os.path.join(dist, 'index.html')) else synthetic_dist()
+    os.environ['FRONTEND_DIST'] = folder
+
+    paths = ['/' + name.replace(os.sep, '/') for name in
+             (os.path.relpath(os.path.join(root, f), folder) for root, _, files in os.walk(folder) for f in files)
+             if not name.endswith(('.br', '.gz'))]
+    paths = ['/' if path == '/index.html' else path for path in paths] + ['/dashboard']
+
+    print(f"📂 {os.path.abspath(folder)}: {len(paths)} paths, {requests} requests per side")
+    for label, app in (('send_from_directory', legacy_app(folder)), ('static layer', create_app())):
+        rate, size = run(app, paths, requests)
+        print(f"   {label:<20} {rate:>8.0f} req/s {size / 1024:>9.1f} KiB/response")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Admin user search benchmark
+Seeds N users into a PostgreSQL database (DATABASE_URL) and compares the old
+ILIKE + paginate() listing against the indexed search with keyset pagination.
+
+Usage: python benchmarks/user_search.py [users] [repeats]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text, or_, tuple_
+from app import create_app
+from extensions import db
+from models.users import User
+from routes.adminRoutes import apply_user_search, count_users
+
+app = create_app()
+
+TERMS = ['jo', 'smith', 'user12345', 'contractor.9']
+
+
+def seed(count):
+    existing = User.query.count()
+    if existing >= count:
+        return existing
+
+    print(f"🌱 Seeding {count - existing} users...")
+    db.session.execute(text("""
+        INSERT INTO users (email, password, first_name, last_name, is_admin, is_active, auth_version, created_at, updated_at)
+        SELECT 'user' || g || '@contractor.' || (g % 97) || '.example.com',
+               'x',
+               (ARRAY['John', 'Joan', 'Maria', 'Jose', 'Ana', 'Mark', 'Grace', 'Paolo'])[1 + g % 8] || g % 1000,
+               (ARRAY['Smith', 'Santos', 'Reyes', 'Cruz', 'Garcia', 'Lim', 'Tan', 'Dela Cruz'])[1 + g % 8],
+               false, g % 10 <> 0, 1,
+               now() - (g || ' seconds')::interval,
+               now()
+        FROM generate_series(:start, :stop) AS g
+    """), {'start': existing + 1, 'stop': count})
+    db.session.commit()
+
+    # Same indexes as migration 5b7e9f3a2c18
+    with db.engine.connect() as conn:
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_users_created_at_id ON users (created_at, id)"))
+        for column in ('email', 'first_name', 'last_name'):
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_users_{column}_prefix ON users (lower({column}) text_pattern_ops)"))
+        if conn.execute(text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).scalar():
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for column in ('email', 'first_name', 'last_name'):
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_users_{column}_trgm ON users USING gin ({column} gin_trgm_ops)"))
+        else:
+            print("⚠️  pg_trgm is not available; substring searches will not be indexed")
+        conn.execute(text("ANALYZE users"))
+        conn.commit()
+    return count
+
+
+def legacy_search(term, page):
+    pattern = f"%{term}%"
+    query = User.query.filter(or_(User.email.ilike(pattern), User.first_name.ilike(pattern), User.last_name.ilike(pattern)))
+    users = query.order_by(User.created_at.desc()).paginate(page=page, per_page=10, error_out=False)
+    return [user.id for user in users.items], users.total
+
+
+def new_search(term, cursor=None):
+    query = apply_user_search(User.query, term, 'auto')
+    total, _ = count_users(query, 'estimated')
+    ordered = query.order_by(User.created_at.desc(), User.id.desc())
+    if cursor:
+        ordered = ordered.filter(tuple_(User.created_at, User.id) < cursor)
+    users = ordered.limit(11).all()
+    return [user.id for user in users[:10]], total
+
+
+def cursor_for_page(term, page):
+    """(created_at, id) of the last row before the requested page"""
+    query = apply_user_search(User.query, term, 'auto').order_by(User.created_at.desc(), User.id.desc())
+    last = query.offset((page - 1) * 10 - 1).first()
+    return (last.created_at, last.id) if last else None
+
+
+def timed(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+        db.session.rollback()
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main(count, repeats):
+    with app.app_context():
+        if db.engine.dialect.name != 'postgresql':
+            sys.exit("❌ This benchmark needs a PostgreSQL DATABASE_URL")
+        db.create_all()
+        total = seed(count)
+        print(f"👥 {total} users, median of {repeats} runs\n")
+        print(f"{'term':<16}{'legacy p1':>12}{'new p1':>10}{'legacy p50':>13}{'new p50':>10}")
+        for term in TERMS:
+            legacy_first = timed(lambda: legacy_search(term, 1), repeats)
+            new_first = timed(lambda: new_search(term), repeats)
+            legacy_deep = timed(lambda: legacy_search(term, 50), repeats)
+            cursor = cursor_for_page(term, 50)
+            new_deep = timed(lambda: new_search(term, cursor), repeats)
+            print(f"{term:<16}{legacy_first:>10.1f}ms{new_first:>8.1f}ms{legacy_deep:>11.1f}ms{new_deep:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    main(count, repeats)
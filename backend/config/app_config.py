@@ -0,0 +1,73 @@
+import os
+from datetime import timedelta
+
+
+class Config:
+    """Settings shared by every environment; values come from the environment (.env)"""
+
+    SECRET_KEY = os.getenv('SECRET_KEY', 'your-super-secret-key-here-change-this')
+
+    # Database Configuration
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Server-side sessions stored on disk
+    SESSION_TYPE = 'filesystem'
+    SESSION_PERMANENT = True
+    SESSION_USE_SIGNER = True
+    SESSION_KEY_PREFIX = 'flordegrace_session:'
+    SESSION_COOKIE_NAME = 'flordegrace_session'
+    SESSION_COOKIE_SECURE = False  # Important for HTTP localhost
+    SESSION_COOKIE_HTTPONLY = False  # Allow JavaScript access for debugging
+    SESSION_COOKIE_SAMESITE = 'Lax'  # Important for CORS
+    SESSION_COOKIE_DOMAIN = None  # Let Flask handle domain automatically
+    SESSION_COOKIE_PATH = '/'
+    SESSION_FILE_DIR = os.getenv('SESSION_FILE_DIR', os.path.join(os.getcwd(), 'flask_sessions'))
+    SESSION_FILE_THRESHOLD = 500
+    SESSION_FILE_MODE = 0o600
+
+    # Set session lifetime to 24 hours
+    PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
+    REMEMBER_COOKIE_SECURE = False
+
+    CORS_ORIGINS = [
+        'http://localhost:3002',
+        'http://127.0.0.1:3002',
+        'http://localhost:3000',
+        'http://127.0.0.1:3000'
+    ]
+
+    # /debug/* authentication and session inspection routes
+    DEBUG_ROUTES = False
+
+
+class DevelopmentConfig(Config):
+    """Local development: Flask debug mode and the /debug routes"""
+
+    DEBUG = True
+    DEBUG_ROUTES = True
+
+
+class ProductionConfig(Config):
+    """Behind gunicorn: no debug routes, secure cookies, a real secret key"""
+
+    DEBUG = False
+    SECRET_KEY = os.getenv('SECRET_KEY')
+    SESSION_COOKIE_SECURE = os.getenv('SESSION_COOKIE_SECURE', 'True').lower() == 'true'
+    SESSION_COOKIE_HTTPONLY = True
+    REMEMBER_COOKIE_SECURE = SESSION_COOKIE_SECURE
+    CORS_ORIGINS = [origin.strip() for origin in os.getenv('CORS_ORIGINS', '').split(',') if origin.strip()]
+
+
+CONFIGS = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+}
+
+
+def get_config(name=None):
+    """Config class for a name, defaulting to APP_ENV (development when unset)"""
+    name = (name or os.getenv('APP_ENV', 'development')).lower()
+    if name not in CONFIGS:
+        raise RuntimeError(f"Unknown APP_ENV '{name}', expected one of: {', '.join(CONFIGS)}")
+    return CONFIGS[name]
@@ -1,8 +1,11 @@
 import os
 from flask_mail import Mail, Message
 from flask import current_app
+from jinja2 import Environment
+from utils.logger import get_logger
 
 mail = Mail()
+log = get_logger('email')
 
 def init_mail(app):
     """Initialize Flask-Mail with the app"""
@@ -18,23 +21,21 @@ def init_mail(app):
     mail.init_app(app)
     return mail
 
-def send_password_reset_email(user, reset_url):
-    """Send password reset email to user"""
-    try:
-        msg = Message(
-            subject='Password Reset Request - Flordegrace System',
-            recipients=[user.email],
-            html=f'''
+# Email bodies are compiled once at import time and only rendered per message
+_templates = Environment(autoescape=True)
+
+PASSWORD_RESET_SUBJECT = 'Password Reset Request - Flordegrace System'
+PASSWORD_RESET_TEMPLATE = _templates.from_string('''
             <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
                 <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px;">
                     <h2 style="color: #333; text-align: center;">Password Reset Request</h2>
                     
-                    <p>Hello {user.first_name},</p>
+                    <p>Hello {{ first_name }},</p>
                     
                     <p>You have requested to reset your password for the Flordegrace System. Click the button below to reset your password:</p>
                     
                     <div style="text-align: center; margin: 30px 0;">
-                        <a href="{reset_url}" 
+                        <a href="{{ reset_url }}" 
                            style="background-color: #007bff; color: white; padding: 12px 24px; 
                                   text-decoration: none; border-radius: 5px; display: inline-block;">
                             Reset Password
@@ -42,7 +43,7 @@ def send_password_reset_email(user, reset_url):
                     </div>
                     
                     <p>Or copy and paste this link in your browser:</p>
-                    <p style="word-break: break-all; color: #007bff;">{reset_url}</p>
+                    <p style="word-break: break-all; color: #007bff;">{{ reset_url }}</p>
                     
                     <p style="color: #666; font-size: 14px;">
                         This link will expire in 1 hour for security reasons.
@@ -58,27 +59,15 @@ def send_password_reset_email(user, reset_url):
                     </p>
                 </div>
             </div>
-            '''
-        )
-        
-        mail.send(msg)
-        return True
-    except Exception as e:
-        print(f"Error sending email: {str(e)}")
-        return False
+            ''')
 
-def send_password_changed_notification(user):
-    """Send notification when password is changed"""
-    try:
-        msg = Message(
-            subject='Password Changed - Flordegrace System',
-            recipients=[user.email],
-            html=f'''
+PASSWORD_CHANGED_SUBJECT = 'Password Changed - Flordegrace System'
+PASSWORD_CHANGED_TEMPLATE = _templates.from_string('''
             <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
                 <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px;">
                     <h2 style="color: #333; text-align: center;">Password Changed Successfully</h2>
                     
-                    <p>Hello {user.first_name},</p>
+                    <p>Hello {{ first_name }},</p>
                     
                     <p>Your password for the Flordegrace System has been successfully changed.</p>
                     
@@ -92,11 +81,120 @@ def send_password_changed_notification(user):
                     </p>
                 </div>
             </div>
-            '''
+            ''')
+
+def queue_email(recipient, subject, html):
+    """Add an email to the outbox in the caller's transaction.
+
+    Nothing is committed here: the email is stored, and the background sender
+    woken, when the caller commits the write it belongs to, and dropped with
+    it on rollback.
+    """
+    from sqlalchemy import event
+    from extensions import db
+    from models.emailoutbox import EmailOutbox
+    from utils.emailOutbox import outbox_worker
+
+    db.session.add(EmailOutbox(recipient=recipient, subject=subject, html=html))
+    event.listen(db.session(), 'after_commit', lambda session: outbox_worker.wake(), once=True)
+
+def send_password_reset_email(user, reset_url):
+    """Queue password reset email to user"""
+    try:
+        queue_email(
+            user.email,
+            PASSWORD_RESET_SUBJECT,
+            PASSWORD_RESET_TEMPLATE.render(first_name=user.first_name, reset_url=reset_url)
         )
-        
-        mail.send(msg)
         return True
     except Exception as e:
-        print(f"Error sending notification: {str(e)}")
-        return False
\ No newline at end of file
+        log.exception("Error queueing password reset email")
+        return False
+
+def send_password_changed_notification(user):
+    """Queue notification when password is changed"""
+    try:
+        queue_email(
+            user.email,
+            PASSWORD_CHANGED_SUBJECT,
+            PASSWORD_CHANGED_TEMPLATE.render(first_name=user.first_name)
+        )
+        return True
+    except Exception as e:
+        log.exception("Error queueing password changed notification")
+        return False
+
+LOW_STOCK_SUBJECT = 'Low Stock Alert - Flordegrace System'
+LOW_STOCK_TEMPLATE = _templates.from_string('''
+            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+                <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px;">
+                    <h2 style="color: #333; text-align: center;">Low Stock Alert</h2>
+                    
+                    <p>Hello {{ first_name }},</p>
+                    
+                    <p>The following items are below {{ threshold }} units:</p>
+                    
+                    <table style="width: 100%; border-collapse: collapse;">
+                        {% for item in items %}
+                        <tr>
+                            <td style="padding: 6px; border-bottom: 1px solid #eee;">{{ item.product_name }}</td>
+                            <td style="padding: 6px; border-bottom: 1px solid #eee; text-align: right;">
+                                {{ 'Out of Stock' if item.quantity == 0 else item.quantity }}
+                            </td>
+                        </tr>
+                        {% endfor %}
+                    </table>
+                    
+                    <hr style="border: 1px solid #eee; margin: 20px 0;">
+                    <p style="color: #666; font-size: 12px; text-align: center;">
+                        Flordegrace Management System
+                    </p>
+                </div>
+            </div>
+            ''')
+
+OVERDUE_MAINTENANCE_SUBJECT = 'Overdue Maintenance - Flordegrace System'
+OVERDUE_MAINTENANCE_TEMPLATE = _templates.from_string('''
+            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+                <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px;">
+                    <h2 style="color: #333; text-align: center;">Overdue Maintenance</h2>
+                    
+                    <p>Hello {{ first_name }},</p>
+                    
+                    <p>The following maintenance jobs are past their scheduled date and not completed:</p>
+                    
+                    <table style="width: 100%; border-collapse: collapse;">
+                        {% for item in items %}
+                        <tr>
+                            <td style="padding: 6px; border-bottom: 1px solid #eee;">{{ item.product_name }}</td>
+                            <td style="padding: 6px; border-bottom: 1px solid #eee;">{{ item.engineer_name }}</td>
+                            <td style="padding: 6px; border-bottom: 1px solid #eee; text-align: right;">
+                                {{ item.scheduled_date.strftime('%Y-%m-%d') }}
+                            </td>
+                        </tr>
+                        {% endfor %}
+                    </table>
+                    
+                    <hr style="border: 1px solid #eee; margin: 20px 0;">
+                    <p style="color: #666; font-size: 12px; text-align: center;">
+                        Flordegrace Management System
+                    </p>
+                </div>
+            </div>
+            ''')
+
+def send_low_stock_alert(user, items, threshold):
+    """Queue the low stock digest to an admin"""
+    queue_email(
+        user.email,
+        LOW_STOCK_SUBJECT,
+        LOW_STOCK_TEMPLATE.render(first_name=user.first_name, items=items, threshold=threshold)
+    )
+
+def send_overdue_maintenance_alert(user, items):
+    """Queue the overdue maintenance digest to an admin"""
+    queue_email(
+        user.email,
+        OVERDUE_MAINTENANCE_SUBJECT,
+        OVERDUE_MAINTENANCE_TEMPLATE.render(first_name=user.first_name, items=items)
+    )
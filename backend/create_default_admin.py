@@ -4,12 +4,12 @@ FGS-IMS Default Admin Setup Script
 Creates a default administrator account for first-time setup
 """
 
-from app import app, db, User
-from flask_bcrypt import Bcrypt
+from app import create_app
+from extensions import db, bcrypt
+from models.users import User
 import sys
 
-# Initialize bcrypt
-bcrypt = Bcrypt(app)
+app = create_app()
 
 def create_default_admin():
     """Creates a default admin account if none exists"""
@@ -1,9 +1,10 @@
-from app import app
+from app import create_app
 from extensions import db
 from sqlalchemy import text
 import os
 
-# Don't call db.init_app(app) here - app.py already did it!
+# create_app() already calls db.init_app(app)
+app = create_app()
 
 # Create the tables and define triggers
 with app.app_context():
@@ -22,6 +23,7 @@ with app.app_context():
         from models.inventory import Inventory
         from models.maintenance import Maintenance
         from models.departmentrequest import DepartmentRequest
+        from models.emailoutbox import EmailOutbox
 
         # Force drop everything with CASCADE to handle dependent objects
         print("🗑️ Force dropping all tables and dependent objects...")
@@ -48,6 +50,7 @@ with app.app_context():
         print("   - Inventory")
         print("   - Maintenance")
         print("   - Department Requests")
+        print("   - Email Outbox")
         
     except Exception as e:
         print(f"❌ An error occurred while setting up the database: {e}")
@@ -1,3 +1,11 @@
 from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate
+from flask_bcrypt import Bcrypt
+from flask_login import LoginManager
+from utils.dbPool import RoutingSession
 
-db = SQLAlchemy()
\ No newline at end of file
+# Sessions can route a request to the analytics pool (see utils/dbPool.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+migrate = Migrate()
+bcrypt = Bcrypt()
+login_manager = LoginManager()
@@ -0,0 +1,47 @@
+"""
+Gunicorn configuration: gunicorn -c gunicorn.conf.py wsgi:app
+
+Sizing defaults to (2 x CPU) + 1 worker processes with a few threads each,
+overridable through WEB_CONCURRENCY and GUNICORN_THREADS. The app is loaded
+once in the master (preload_app) and forked, so workers share its memory and
+start instantly; post_fork gives each worker its own database pool and
+background threads. Set METRICS_MULTIPROC_DIR so /metrics reports totals
+across all workers.
+"""
+
+import multiprocessing
+import os
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', str(cpu_count * 2 + 1)))
+# The app sizes per-process pools (bcrypt) from the worker count
+os.environ['WEB_CONCURRENCY'] = str(workers)
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+preload_app = True
+
+# Recycle workers now and then so slow leaks cannot build up; the jitter
+# keeps them from all restarting at the same moment
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', str(max_requests // 10)))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
+
+def child_exit(server, worker):
+    # Fold the exited worker's counters into metrics_dead.json and drop its snapshot
+    from utils.metrics import metrics
+    metrics.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    from wsgi import app
+    from app import after_fork
+    after_fork(app)
@@ -0,0 +1,45 @@
+"""Add user search indexes
+
+Revision ID: 5b7e9f3a2c18
+Revises: 8f41c6d0e2a7
+Create Date: 2026-10-19 11:26:03.714420
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e9f3a2c18'
+down_revision = '8f41c6d0e2a7'
+branch_labels = None
+depends_on = None
+
+SEARCH_COLUMNS = ('email', 'first_name', 'last_name')
+
+
+def upgrade():
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    # Prefix matching: lower(col) LIKE 'term%'
+    for column in SEARCH_COLUMNS:
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_users_{column}_prefix ON users (lower({column}) text_pattern_ops)")
+
+    # Substring matching: col ILIKE '%term%' (needs the pg_trgm contrib extension)
+    has_trgm = bind.execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).scalar()
+    if has_trgm:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for column in SEARCH_COLUMNS:
+            op.execute(f"CREATE INDEX IF NOT EXISTS ix_users_{column}_trgm ON users USING gin ({column} gin_trgm_ops)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for column in SEARCH_COLUMNS:
+            op.execute(f"DROP INDEX IF EXISTS ix_users_{column}_trgm")
+            op.execute(f"DROP INDEX IF EXISTS ix_users_{column}_prefix")
+    op.drop_index('ix_users_created_at_id', table_name='users')
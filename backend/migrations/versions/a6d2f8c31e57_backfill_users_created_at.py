@@ -0,0 +1,29 @@
+"""Backfill users.created_at and make it NOT NULL
+
+Revision ID: a6d2f8c31e57
+Revises: f9a3c1d84e27
+Create Date: 2026-10-19 22:14:08.530917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d2f8c31e57'
+down_revision = 'f9a3c1d84e27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The admin user list pages by (created_at, id); legacy and seeded users
+    # without a created_at would fall out of it
+    op.execute("UPDATE users SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) WHERE created_at IS NULL")
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
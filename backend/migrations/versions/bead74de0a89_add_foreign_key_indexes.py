@@ -0,0 +1,92 @@
+"""Add foreign key indexes and unique inventory product
+
+Revision ID: bead74de0a89
+Revises: 5b7e9f3a2c18
+Create Date: 2026-10-19 13:41:52.208316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bead74de0a89'
+down_revision = '5b7e9f3a2c18'
+branch_labels = None
+depends_on = None
+
+# (table, column): Postgres does not index the referencing side of a foreign key
+INDEXES = (
+    ('purchase_requests', 'product_id'),
+    ('purchase_requests', 'supplier_id'),
+    ('purchase_requests', 'status'),
+    ('evaluation', 'request_id'),
+    ('damaged_items', 'evaluation_id'),
+    ('damaged_items', 'product_id'),
+    ('department_requests', 'department_id'),
+    ('department_requests', 'product_id'),
+    ('maintenance', 'product_id'),
+)
+INVENTORY_UNIQUE = 'inventory_product_id_unique'
+
+
+def merge_duplicate_inventory():
+    """Fold duplicate inventory rows into the oldest row for the product"""
+    op.execute("""
+        UPDATE inventory SET
+            quantity = (SELECT SUM(i.quantity) FROM inventory i WHERE i.product_id = inventory.product_id),
+            running_amount = (SELECT SUM(i.running_amount) FROM inventory i WHERE i.product_id = inventory.product_id),
+            created_at = (SELECT MIN(i.created_at) FROM inventory i WHERE i.product_id = inventory.product_id),
+            updated_at = (SELECT MAX(i.updated_at) FROM inventory i WHERE i.product_id = inventory.product_id)
+        WHERE inventory_id IN (
+            SELECT MIN(inventory_id) FROM inventory GROUP BY product_id HAVING COUNT(*) > 1
+        )
+    """)
+    op.execute("""
+        DELETE FROM inventory WHERE inventory_id NOT IN (
+            SELECT MIN(inventory_id) FROM inventory GROUP BY product_id
+        )
+    """)
+
+
+def drop_invalid_index(bind, name):
+    # A failed CREATE INDEX CONCURRENTLY leaves an invalid index behind that
+    # IF NOT EXISTS would otherwise skip over on the next attempt
+    invalid = bind.execute(sa.text(
+        "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {'name': name}).scalar()
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def upgrade():
+    merge_duplicate_inventory()
+
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        for table, column in INDEXES:
+            op.create_index(f'ix_{table}_{column}', table, [column], unique=False)
+        with op.batch_alter_table('inventory') as batch_op:
+            batch_op.create_unique_constraint(INVENTORY_UNIQUE, ['product_id'])
+        return
+
+    # CONCURRENTLY cannot run inside a transaction; building this way keeps
+    # the tables writable while the indexes are built
+    with op.get_context().autocommit_block():
+        for table, column in INDEXES:
+            name = f'ix_{table}_{column}'
+            drop_invalid_index(bind, name)
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({column})")
+        drop_invalid_index(bind, INVENTORY_UNIQUE)
+        op.execute(f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {INVENTORY_UNIQUE} ON inventory (product_id)")
+
+    # Promoting the finished index to a constraint only takes a brief lock
+    op.execute(f"ALTER TABLE inventory ADD CONSTRAINT {INVENTORY_UNIQUE} UNIQUE USING INDEX {INVENTORY_UNIQUE}")
+
+
+def downgrade():
+    with op.batch_alter_table('inventory') as batch_op:
+        batch_op.drop_constraint(INVENTORY_UNIQUE, type_='unique')
+    for table, column in reversed(INDEXES):
+        op.drop_index(f'ix_{table}_{column}', table_name=table)
@@ -0,0 +1,73 @@
+"""Add sync tombstones and (updated_at, id) indexes for delta sync
+
+Revision ID: c4e1a9d27f36
+Revises: bead74de0a89
+Create Date: 2026-10-19 16:05:31.472903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e1a9d27f36'
+down_revision = 'bead74de0a89'
+branch_labels = None
+depends_on = None
+
+# (table, primary key): delta sync pages through each table in (updated_at, id) order
+SYNCED = (
+    ('products', 'product_id'),
+    ('suppliers', 'supplier_id'),
+    ('product_suppliers', 'product_supplier_id'),
+    ('inventory', 'inventory_id'),
+    ('maintenance', 'maintenance_id'),
+    ('department_facility', 'department_id'),
+)
+
+
+def drop_invalid_index(bind, name):
+    # A failed CREATE INDEX CONCURRENTLY leaves an invalid index behind that
+    # IF NOT EXISTS would otherwise skip over on the next attempt
+    invalid = bind.execute(sa.text(
+        "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {'name': name}).scalar()
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def upgrade():
+    op.create_table('sync_tombstones',
+    sa.Column('tombstone_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('table_name', sa.String(length=64), nullable=False),
+    sa.Column('row_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('tombstone_id')
+    )
+    op.create_index('ix_sync_tombstones_table_deleted_at_id', 'sync_tombstones', ['table_name', 'deleted_at', 'tombstone_id'], unique=False)
+
+    # Rows without updated_at would never be picked up by a delta
+    for table, _ in SYNCED:
+        op.execute(f"UPDATE {table} SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) WHERE updated_at IS NULL")
+
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        for table, key in SYNCED:
+            op.create_index(f'ix_{table}_updated_at_{key}', table, ['updated_at', key], unique=False)
+        return
+
+    # CONCURRENTLY cannot run inside a transaction; building this way keeps
+    # the tables writable while the indexes are built
+    with op.get_context().autocommit_block():
+        for table, key in SYNCED:
+            name = f'ix_{table}_updated_at_{key}'
+            drop_invalid_index(bind, name)
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} (updated_at, {key})")
+
+
+def downgrade():
+    for table, key in reversed(SYNCED):
+        op.drop_index(f'ix_{table}_updated_at_{key}', table_name=table)
+    op.drop_index('ix_sync_tombstones_table_deleted_at_id', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
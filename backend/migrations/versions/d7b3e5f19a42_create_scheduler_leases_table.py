@@ -0,0 +1,34 @@
+"""Create scheduler leases table
+
+Revision ID: d7b3e5f19a42
+Revises: c4e1a9d27f36
+Create Date: 2026-10-19 19:12:40.218306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7b3e5f19a42'
+down_revision = 'c4e1a9d27f36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scheduler_leases',
+    sa.Column('job_name', sa.String(length=255), nullable=False),
+    sa.Column('owner', sa.String(length=255), nullable=True),
+    sa.Column('leased_until', sa.DateTime(), nullable=True),
+    sa.Column('next_run_at', sa.DateTime(), nullable=False),
+    sa.Column('last_started_at', sa.DateTime(), nullable=True),
+    sa.Column('last_finished_at', sa.DateTime(), nullable=True),
+    sa.Column('last_status', sa.String(length=16), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('job_name')
+    )
+
+
+def downgrade():
+    op.drop_table('scheduler_leases')
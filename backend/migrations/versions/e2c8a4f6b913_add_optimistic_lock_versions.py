@@ -0,0 +1,31 @@
+"""Add version columns for optimistic locking
+
+Revision ID: e2c8a4f6b913
+Revises: d7b3e5f19a42
+Create Date: 2026-10-19 20:03:11.604728
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2c8a4f6b913'
+down_revision = 'd7b3e5f19a42'
+branch_labels = None
+depends_on = None
+
+VERSIONED = ('inventory', 'products', 'suppliers', 'product_suppliers')
+
+
+def upgrade():
+    # A constant default: existing rows start at version 1 without a table rewrite
+    for table in VERSIONED:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    for table in VERSIONED:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('version')
@@ -0,0 +1,139 @@
+"""Add history archive tables and date indexes
+
+Revision ID: f9a3c1d84e27
+Revises: e2c8a4f6b913
+Create Date: 2026-10-19 21:26:45.318042
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f9a3c1d84e27'
+down_revision = 'e2c8a4f6b913'
+branch_labels = None
+depends_on = None
+
+# (table, column): the archive job and ?from=/?to= filter on these dates
+INDEXES = (
+    ('purchase_requests', 'request_date'),
+    ('evaluation', 'evaluation_date'),
+    ('damaged_items', 'created_at'),
+    ('department_requests', 'request_date'),
+)
+
+# (table, columns) in parent-first order; downgrade moves archived rows back
+ARCHIVED = (
+    ('purchase_requests', 'request_id, product_id, supplier_id, unit_price, quantity, status, request_date, total_amount'),
+    ('evaluation', 'evaluation_id, request_id, undamaged_quantity, damaged_quantity, evaluation_date'),
+    ('damaged_items', 'damaged_item_id, evaluation_id, product_id, quantity, return_status, created_at, updated_at'),
+    ('department_requests', 'department_request_id, department_id, product_id, quantity, request_date'),
+)
+
+
+def existing_enum(name, *values):
+    # The hot tables already created these types on PostgreSQL
+    return postgresql.ENUM(*values, name=name, create_type=False)
+
+
+def drop_invalid_index(bind, name):
+    # A failed CREATE INDEX CONCURRENTLY leaves an invalid index behind that
+    # IF NOT EXISTS would otherwise skip over on the next attempt
+    invalid = bind.execute(sa.text(
+        "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {'name': name}).scalar()
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def upgrade():
+    op.create_table('purchase_requests_archive',
+    sa.Column('request_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('supplier_id', sa.Integer(), nullable=False),
+    sa.Column('unit_price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('status', existing_enum('purchaserequeststatusenum', 'pending', 'approved', 'rejected'), nullable=False),
+    sa.Column('request_date', sa.DateTime(), nullable=True),
+    sa.Column('total_amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.product_id'], ),
+    sa.ForeignKeyConstraint(['supplier_id'], ['suppliers.supplier_id'], ),
+    sa.PrimaryKeyConstraint('request_id')
+    )
+    op.create_index('ix_purchase_requests_archive_product_id', 'purchase_requests_archive', ['product_id'], unique=False)
+    op.create_index('ix_purchase_requests_archive_supplier_id', 'purchase_requests_archive', ['supplier_id'], unique=False)
+    op.create_index('ix_purchase_requests_archive_request_date', 'purchase_requests_archive', ['request_date'], unique=False)
+
+    op.create_table('evaluation_archive',
+    sa.Column('evaluation_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('request_id', sa.Integer(), nullable=False),
+    sa.Column('undamaged_quantity', sa.Integer(), nullable=False),
+    sa.Column('damaged_quantity', sa.Integer(), nullable=False),
+    sa.Column('evaluation_date', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['request_id'], ['purchase_requests_archive.request_id'], ),
+    sa.PrimaryKeyConstraint('evaluation_id')
+    )
+    op.create_index('ix_evaluation_archive_request_id', 'evaluation_archive', ['request_id'], unique=False)
+    op.create_index('ix_evaluation_archive_evaluation_date', 'evaluation_archive', ['evaluation_date'], unique=False)
+
+    op.create_table('damaged_items_archive',
+    sa.Column('damaged_item_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('evaluation_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('return_status', existing_enum('returnstatusenum', 'pending', 'replaced', 'rejected'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['evaluation_id'], ['evaluation_archive.evaluation_id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.product_id'], ),
+    sa.PrimaryKeyConstraint('damaged_item_id')
+    )
+    op.create_index('ix_damaged_items_archive_evaluation_id', 'damaged_items_archive', ['evaluation_id'], unique=False)
+    op.create_index('ix_damaged_items_archive_product_id', 'damaged_items_archive', ['product_id'], unique=False)
+    op.create_index('ix_damaged_items_archive_created_at', 'damaged_items_archive', ['created_at'], unique=False)
+
+    op.create_table('department_requests_archive',
+    sa.Column('department_request_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('department_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('request_date', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['department_id'], ['department_facility.department_id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.product_id'], ),
+    sa.PrimaryKeyConstraint('department_request_id')
+    )
+    op.create_index('ix_department_requests_archive_department_id', 'department_requests_archive', ['department_id'], unique=False)
+    op.create_index('ix_department_requests_archive_product_id', 'department_requests_archive', ['product_id'], unique=False)
+    op.create_index('ix_department_requests_archive_request_date', 'department_requests_archive', ['request_date'], unique=False)
+
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        for table, column in INDEXES:
+            op.create_index(f'ix_{table}_{column}', table, [column], unique=False)
+        return
+
+    # CONCURRENTLY cannot run inside a transaction; building this way keeps
+    # the tables writable while the indexes are built
+    with op.get_context().autocommit_block():
+        for table, column in INDEXES:
+            name = f'ix_{table}_{column}'
+            drop_invalid_index(bind, name)
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({column})")
+
+
+def downgrade():
+    for table, columns in ARCHIVED:
+        op.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_archive")
+    for table, column in reversed(INDEXES):
+        op.drop_index(f'ix_{table}_{column}', table_name=table)
+    op.drop_table('department_requests_archive')
+    op.drop_table('damaged_items_archive')
+    op.drop_table('evaluation_archive')
+    op.drop_table('purchase_requests_archive')
@@ -11,11 +11,11 @@ class DamagedItem(db.Model):
     __tablename__ = 'damaged_items'
 
     damaged_item_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    evaluation_id = db.Column(db.Integer, db.ForeignKey('evaluation.evaluation_id'), nullable=False)
-    product_id = db.Column(db.Integer, db.ForeignKey('products.product_id'), nullable=False)
+    evaluation_id = db.Column(db.Integer, db.ForeignKey('evaluation.evaluation_id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.product_id'), nullable=False, index=True)
     quantity = db.Column(db.Integer, nullable=False)
     return_status = db.Column(db.Enum(ReturnStatusEnum), nullable=False, default=ReturnStatusEnum.pending)
-    created_at = db.Column(db.DateTime, default=datetime.now)
+    created_at = db.Column(db.DateTime, default=datetime.now, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
 
     # Relationships
@@ -38,3 +38,20 @@ class DamagedItem(db.Model):
             'created_at': self.created_at,
             'updated_at': self.updated_at
         }
+
+
+class DamagedItemArchive(db.Model):
+    """A settled damaged item archived together with its evaluation"""
+    __tablename__ = 'damaged_items_archive'
+
+    damaged_item_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    evaluation_id = db.Column(db.Integer, db.ForeignKey('evaluation_archive.evaluation_id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.product_id'), nullable=False, index=True)
+    quantity = db.Column(db.Integer, nullable=False)
+    return_status = db.Column(db.Enum(ReturnStatusEnum), nullable=False)
+    created_at = db.Column(db.DateTime, index=True)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<DamagedItemArchive {self.damaged_item_id}>"
@@ -13,6 +13,11 @@ class DepartmentFacility(db.Model):
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(MANILA_TZ))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(MANILA_TZ), onupdate=lambda: datetime.now(MANILA_TZ))
 
+    # Keyset order for delta sync
+    __table_args__ = (
+        db.Index('ix_department_facility_updated_at_department_id', 'updated_at', 'department_id'),
+    )
+
     def __repr__(self):
         return f"<DepartmentFacility {self.department_name}>"
 
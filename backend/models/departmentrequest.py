@@ -5,10 +5,10 @@ class DepartmentRequest(db.Model):
     __tablename__ = 'department_requests'
 
     department_request_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    department_id = db.Column(db.Integer, db.ForeignKey('department_facility.department_id'), nullable=False)
-    product_id = db.Column(db.Integer, db.ForeignKey('products.product_id'), nullable=False)
+    department_id = db.Column(db.Integer, db.ForeignKey('department_facility.department_id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.product_id'), nullable=False, index=True)
     quantity = db.Column(db.Integer, nullable=False)
-    request_date = db.Column(db.DateTime, default=datetime.now)
+    request_date = db.Column(db.DateTime, default=datetime.now, index=True)
 
     # Relationships
     department = db.relationship('DepartmentFacility', backref='department_requests', lazy=True)
@@ -29,3 +29,18 @@ class DepartmentRequest(db.Model):
             'quantity': self.quantity,
             'request_date': self.request_date,
         }
+
+
+class DepartmentRequestArchive(db.Model):
+    """A department request moved out of department_requests by the archive job"""
+    __tablename__ = 'department_requests_archive'
+
+    department_request_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    department_id = db.Column(db.Integer, db.ForeignKey('department_facility.department_id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.product_id'), nullable=False, index=True)
+    quantity = db.Column(db.Integer, nullable=False)
+    request_date = db.Column(db.DateTime, index=True)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<DepartmentRequestArchive {self.department_request_id}>"
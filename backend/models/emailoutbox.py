@@ -0,0 +1,42 @@
+from extensions import db
+from datetime import datetime
+from enum import Enum
+
+class OutboxStatus(Enum):
+    pending = "pending"
+    sent = "sent"
+    failed = "failed"
+
+class EmailOutbox(db.Model):
+    __tablename__ = 'email_outbox'
+
+    email_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    recipient = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    html = db.Column(db.Text, nullable=False)
+    status = db.Column(db.Enum(OutboxStatus), nullable=False, default=OutboxStatus.pending)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    def __repr__(self):
+        return f"<EmailOutbox {self.email_id} to {self.recipient} ({self.status.value})>"
+
+    def to_dict(self):
+        return {
+            'email_id': self.email_id,
+            'recipient': self.recipient,
+            'subject': self.subject,
+            'status': self.status.value,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
+        }
@@ -9,10 +9,10 @@ class Evaluation(db.Model):
     __tablename__ = 'evaluation'
 
     evaluation_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    request_id = db.Column(db.Integer, db.ForeignKey('purchase_requests.request_id'), nullable=False)
+    request_id = db.Column(db.Integer, db.ForeignKey('purchase_requests.request_id'), nullable=False, index=True)
     undamaged_quantity = db.Column(db.Integer, nullable=False, default=0)
     damaged_quantity = db.Column(db.Integer, nullable=False, default=0)
-    evaluation_date = db.Column(db.DateTime, default=lambda: datetime.now(MANILA_TZ))
+    evaluation_date = db.Column(db.DateTime, default=lambda: datetime.now(MANILA_TZ), index=True)
 
     # Relationship to the PurchaseRequest model
     purchase_request = db.relationship('PurchaseRequest', backref='evaluations')
@@ -26,13 +26,28 @@ class Evaluation(db.Model):
             'request_id': self.request_id,
             'undamaged_quantity': self.undamaged_quantity,
             'damaged_quantity': self.damaged_quantity,
-            'evaluation_date': self.evaluation_date.isoformat() if self.evaluation_date else None,
+            'evaluation_date': self.evaluation_date,
             'product_name': self.purchase_request.product.name if self.purchase_request and self.purchase_request.product else None,
             'brand': self.purchase_request.product.brand if self.purchase_request and self.purchase_request.product else None,
             'model': self.purchase_request.product.model if self.purchase_request and self.purchase_request.product else None,
             'quantity': self.purchase_request.quantity if self.purchase_request else None,
             'supplier_name': self.purchase_request.supplier.supplier_name if self.purchase_request and self.purchase_request.supplier else None,
-            'total_amount': str(self.purchase_request.total_amount) if self.purchase_request and self.purchase_request.total_amount else '0.00',
-            'status': self.purchase_request.status.value if self.purchase_request else None,
-            'request_date': self.purchase_request.request_date.isoformat() if self.purchase_request and self.purchase_request.request_date else None
+            'total_amount': self.purchase_request.total_amount or '0.00' if self.purchase_request else '0.00',
+            'status': self.purchase_request.status if self.purchase_request else None,
+            'request_date': self.purchase_request.request_date if self.purchase_request else None
         }
+
+
+class EvaluationArchive(db.Model):
+    """An evaluation archived together with its purchase request"""
+    __tablename__ = 'evaluation_archive'
+
+    evaluation_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    request_id = db.Column(db.Integer, db.ForeignKey('purchase_requests_archive.request_id'), nullable=False, index=True)
+    undamaged_quantity = db.Column(db.Integer, nullable=False, default=0)
+    damaged_quantity = db.Column(db.Integer, nullable=False, default=0)
+    evaluation_date = db.Column(db.DateTime, index=True)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<EvaluationArchive {self.evaluation_id}>"
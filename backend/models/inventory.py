@@ -11,12 +11,21 @@ class Inventory(db.Model):
     product_id = db.Column(db.Integer, db.ForeignKey('products.product_id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
     running_amount = db.Column(db.Numeric(10, 2), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.now(MANILA_TZ))
-    updated_at = db.Column(db.DateTime, default=datetime.now(MANILA_TZ), onupdate=datetime.now(MANILA_TZ))
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(MANILA_TZ))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(MANILA_TZ), onupdate=lambda: datetime.now(MANILA_TZ))
+    # Bumped on every write; an UPDATE made from a stale read matches no row (see utils/optimisticLock.py)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
 
     # Relationship with Product
     product = db.relationship('Product', backref='inventory')
 
+    # One stock row per product
+    __table_args__ = (
+        db.UniqueConstraint('product_id', name='inventory_product_id_unique'),
+        db.Index('ix_inventory_updated_at_inventory_id', 'updated_at', 'inventory_id'),
+    )
+    __mapper_args__ = {'version_id_col': version}
+
     def __repr__(self):
         return f"<Inventory {self.inventory_id} for Product {self.product.name}>"
 
@@ -28,9 +37,10 @@ class Inventory(db.Model):
             'product_model': self.product.model if self.product else None,
             'product_brand': self.product.brand if self.product else None,
             'product_category': self.product.category if self.product else None,
-            'product_type': self.product.product_type.name if self.product and self.product.product_type else None,
+            'product_type': self.product.product_type if self.product else None,
             'quantity': self.quantity,
-            'running_amount': str(self.running_amount),
+            'running_amount': self.running_amount,
             'created_at': self.created_at,
-            'updated_at': self.updated_at
+            'updated_at': self.updated_at,
+            'version': self.version
         }
@@ -0,0 +1,30 @@
+from extensions import db
+
+
+class JobLease(db.Model):
+    """One scheduled job's lease and last run, shared by every process running the scheduler"""
+    __tablename__ = 'scheduler_leases'
+
+    job_name = db.Column(db.String(255), primary_key=True)
+    owner = db.Column(db.String(255))
+    leased_until = db.Column(db.DateTime)
+    next_run_at = db.Column(db.DateTime, nullable=False)
+    last_started_at = db.Column(db.DateTime)
+    last_finished_at = db.Column(db.DateTime)
+    last_status = db.Column(db.String(16))
+    last_error = db.Column(db.Text)
+
+    def __repr__(self):
+        return f"<JobLease {self.job_name} next {self.next_run_at}>"
+
+    def to_dict(self):
+        return {
+            'job_name': self.job_name,
+            'owner': self.owner,
+            'leased_until': self.leased_until.isoformat() if self.leased_until else None,
+            'next_run_at': self.next_run_at.isoformat() if self.next_run_at else None,
+            'last_started_at': self.last_started_at.isoformat() if self.last_started_at else None,
+            'last_finished_at': self.last_finished_at.isoformat() if self.last_finished_at else None,
+            'last_status': self.last_status,
+            'last_error': self.last_error
+        }
@@ -15,7 +15,7 @@ class Maintenance(db.Model):
     __tablename__ = 'maintenance'
 
     maintenance_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    product_id = db.Column(db.Integer, db.ForeignKey('products.product_id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.product_id'), nullable=False, index=True)
     description = db.Column(db.Text)
     engineer_name = db.Column(db.String(100), nullable=False)
     scheduled_date = db.Column(db.DateTime(timezone=True))
@@ -29,6 +29,11 @@ class Maintenance(db.Model):
     # Relationships
     product = db.relationship('Product', backref=db.backref('maintenance', lazy=True))
 
+    # Keyset order for delta sync
+    __table_args__ = (
+        db.Index('ix_maintenance_updated_at_maintenance_id', 'updated_at', 'maintenance_id'),
+    )
+
     def __repr__(self):
         return f"<Maintenance {self.maintenance_id} - {self.engineer_name}>"
 
@@ -44,11 +49,11 @@ class Maintenance(db.Model):
             'model': product.model if product else None,
             'description': self.description,
             'engineer_name': self.engineer_name,
-            'scheduled_date': self.scheduled_date.isoformat() if self.scheduled_date else None,
-            'completed_date': self.completed_date.isoformat() if self.completed_date else None,
-            'status': self.status.value,
+            'scheduled_date': self.scheduled_date,
+            'completed_date': self.completed_date,
+            'status': self.status,
             # 'total_cost': str(self.total_cost) if self.total_cost else None,
             'notes': self.notes,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
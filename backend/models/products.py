@@ -20,11 +20,15 @@ class Product(db.Model):
     model = db.Column(db.String(100))
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(MANILA_TZ))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(MANILA_TZ), onupdate=lambda: datetime.now(MANILA_TZ))
+    # Optimistic lock version, sent as the ETag on reads and updates
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
 
     # Add composite unique constraint
     __table_args__ = (
         db.UniqueConstraint('name', name='products_name_unique'),
+        db.Index('ix_products_updated_at_product_id', 'updated_at', 'product_id'),
     )
+    __mapper_args__ = {'version_id_col': version}
 
     def __repr__(self):
         return f"<Product {self.name}>"
@@ -34,9 +38,10 @@ class Product(db.Model):
             'product_id': self.product_id,
             'name': self.name,
             'category': self.category,
-            'product_type': self.product_type.value,
+            'product_type': self.product_type,
             'brand': self.brand,
             'model': self.model,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'version': self.version
         }
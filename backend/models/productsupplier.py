@@ -20,6 +20,8 @@ class ProductSupplier(db.Model):
     status = db.Column(db.Enum(Status), default=Status.active, nullable=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(MANILA_TZ))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(MANILA_TZ), onupdate=lambda: datetime.now(MANILA_TZ))
+    # Optimistic lock: price edits from two screens no longer overwrite each other
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
 
     # Relationships
     product = db.relationship('Product', backref='product_suppliers')
@@ -28,7 +30,9 @@ class ProductSupplier(db.Model):
     # Unique Constraint (product_id and supplier_id must be unique together)
     __table_args__ = (
         db.UniqueConstraint('product_id', 'supplier_id', name='product_supplier_unique'),
+        db.Index('ix_product_suppliers_updated_at_product_supplier_id', 'updated_at', 'product_supplier_id'),
     )
+    __mapper_args__ = {'version_id_col': version}
 
     def __repr__(self):
         return f"<ProductSupplier Product: {self.product_id}, Supplier: {self.supplier_id}, Price: {self.unit_price}>"
@@ -39,15 +43,16 @@ class ProductSupplier(db.Model):
             'product_supplier_id': self.product_supplier_id,
             'product_id': self.product_id,
             'supplier_id': self.supplier_id,
-            'unit_price': str(self.unit_price),
-            'status': self.status.value,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'unit_price': self.unit_price,
+            'status': self.status,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'version': self.version,
             'product': {
                 'product_id': self.product.product_id if self.product else None,
                 'name': self.product.name if self.product else None,
                 'category': self.product.category if self.product else None,
-                'product_type': self.product.product_type.value if self.product and self.product.product_type else None,
+                'product_type': self.product.product_type if self.product else None,
                 'brand': self.product.brand if self.product else None,
                 'model': self.product.model if self.product else None
             },
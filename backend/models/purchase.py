@@ -16,12 +16,12 @@ class PurchaseRequest(db.Model):
     __tablename__ = 'purchase_requests'
 
     request_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    product_id = db.Column(db.Integer, db.ForeignKey('products.product_id'), nullable=False)
-    supplier_id = db.Column(db.Integer, db.ForeignKey('suppliers.supplier_id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.product_id'), nullable=False, index=True)
+    supplier_id = db.Column(db.Integer, db.ForeignKey('suppliers.supplier_id'), nullable=False, index=True)
     unit_price = db.Column(db.Numeric(10, 2), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
-    status = db.Column(db.Enum(PurchaseRequestStatusEnum), default=PurchaseRequestStatusEnum.pending, nullable=False)
-    request_date = db.Column(db.DateTime, default=lambda: datetime.now(MANILA_TZ))
+    status = db.Column(db.Enum(PurchaseRequestStatusEnum), default=PurchaseRequestStatusEnum.pending, nullable=False, index=True)
+    request_date = db.Column(db.DateTime, default=lambda: datetime.now(MANILA_TZ), index=True)
     total_amount = db.Column(db.Numeric(10, 2))
 
     # Relationships
@@ -40,13 +40,31 @@ class PurchaseRequest(db.Model):
             'model': self.product.model if self.product else None,
             'supplier_id': self.supplier_id,
             'supplier_name': self.supplier.supplier_name if self.supplier else None,
-            'unit_price': str(self.unit_price) if self.unit_price else '0.00',
+            'unit_price': self.unit_price or '0.00',
             'quantity': self.quantity,
-            'status': self.status.value,
-            'request_date': self.request_date.isoformat() if self.request_date else None,
-            'total_amount': str(self.total_amount) if self.total_amount else '0.00'
+            'status': self.status,
+            'request_date': self.request_date,
+            'total_amount': self.total_amount or '0.00'
         }
 
+class PurchaseRequestArchive(db.Model):
+    """A closed purchase request moved out of purchase_requests by the archive job"""
+    __tablename__ = 'purchase_requests_archive'
+
+    # Same columns as purchase_requests; rows keep their original ids
+    request_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.product_id'), nullable=False, index=True)
+    supplier_id = db.Column(db.Integer, db.ForeignKey('suppliers.supplier_id'), nullable=False, index=True)
+    unit_price = db.Column(db.Numeric(10, 2), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.Enum(PurchaseRequestStatusEnum), nullable=False)
+    request_date = db.Column(db.DateTime, index=True)
+    total_amount = db.Column(db.Numeric(10, 2))
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<PurchaseRequestArchive {self.request_id}>"
+
 # Automatically calculate total_amount before insert or update
 @event.listens_for(PurchaseRequest, "before_insert")
 def calculate_total_amount_before_insert(mapper, connection, target):
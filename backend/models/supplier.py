@@ -20,6 +20,14 @@ class Supplier(db.Model):
     status = db.Column(db.Enum(SupplierStatus), default=SupplierStatus.active, nullable=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(MANILA_TZ))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(MANILA_TZ), onupdate=lambda: datetime.now(MANILA_TZ))
+    # Optimistic lock version
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
+    # Keyset order for delta sync
+    __table_args__ = (
+        db.Index('ix_suppliers_updated_at_supplier_id', 'updated_at', 'supplier_id'),
+    )
+    __mapper_args__ = {'version_id_col': version}
 
     def __repr__(self):
         return f"<Supplier {self.supplier_name}, Status: {self.status.name}>"
@@ -32,5 +40,6 @@ class Supplier(db.Model):
             'contact_number': self.contact_number,
             'status': self.status.value,
             'created_at': self.created_at,
-            'updated_at': self.updated_at
+            'updated_at': self.updated_at,
+            'version': self.version
         }
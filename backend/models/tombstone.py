@@ -0,0 +1,21 @@
+from extensions import db
+from datetime import datetime
+import pytz
+
+MANILA_TZ = pytz.timezone("Asia/Manila")
+
+class Tombstone(db.Model):
+    """A deleted row, kept so delta sync clients can drop it from their copy"""
+    __tablename__ = 'sync_tombstones'
+
+    tombstone_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    table_name = db.Column(db.String(64), nullable=False)
+    row_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(MANILA_TZ))
+
+    __table_args__ = (
+        db.Index('ix_sync_tombstones_table_deleted_at_id', 'table_name', 'deleted_at', 'tombstone_id'),
+    )
+
+    def __repr__(self):
+        return f"<Tombstone {self.table_name} {self.row_id}>"
@@ -13,16 +13,28 @@ class User(UserMixin, db.Model):
     last_name = db.Column(db.String(50), nullable=False)
     is_admin = db.Column(db.Boolean, default=False, nullable=False)
     is_active = db.Column(db.Boolean, default=True, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped whenever credentials or access change so cached identities and old sessions go stale
+    auth_version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     
     # Password reset functionality
     reset_token = db.Column(db.String(100), nullable=True)
     reset_token_expires = db.Column(db.DateTime, nullable=True)
     
+    # Keyset pagination order for the admin user list
+    __table_args__ = (
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
+    
     def __repr__(self):
         return f'<User {self.email}>'
     
+    def get_id(self):
+        # The session and remember cookie carry the auth_version they were
+        # issued for, so the user loader can reject them once it changes
+        return f"{self.id}:{self.auth_version}"
+    
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+FGS-IMS Frontend Precompression
+Writes .br and .gz siblings next to every compressible file in frontend/dist,
+at maximum compression, for the static asset layer to serve as is. Run after
+`npm run build`; without it the app compresses small files itself at startup.
+
+Usage: python precompress_assets.py [dist folder]
+"""
+
+import gzip
+import mimetypes
+import os
+import sys
+from utils.staticAssets import COMPRESSIBLE
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def precompress(folder):
+    written = 0
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if name.endswith(('.br', '.gz')) or mimetypes.guess_type(name)[0] not in COMPRESSIBLE:
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if len(data) < 1024:
+                continue
+
+            outputs = {'.gz': gzip.compress(data, 9, mtime=0)}
+            if brotli is not None:
+                outputs['.br'] = brotli.compress(data, quality=11)
+            for suffix, compressed in outputs.items():
+                if len(compressed) < len(data):
+                    with open(path + suffix, 'wb') as f:
+                        f.write(compressed)
+                    written += 1
+            print(f"   {os.path.relpath(path, folder):<50} {len(data):>10,} -> "
+                  + ', '.join(f"{suffix[1:]} {len(compressed):,}" for suffix, compressed in outputs.items()))
+    return written
+
+
+if __name__ == '__main__':
+    folder = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frontend', 'dist')
+    if not os.path.isdir(folder):
+        print(f"❌ {folder} not found; run `npm run build` in frontend first")
+        sys.exit(1)
+    if brotli is None:
+        print("⚠️ brotli is not installed; writing .gz files only")
+    print(f"🗜️ Precompressing {os.path.abspath(folder)}")
+    print(f"✅ {precompress(folder)} compressed files written")
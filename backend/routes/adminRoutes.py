@@ -2,51 +2,175 @@ from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
 from extensions import db
 from models.users import User
-from sqlalchemy import or_
+from utils.userCache import user_cache, invalidate_user
+from sqlalchemy import or_, func, tuple_
+from datetime import datetime
+import base64
+import json
+import math
+from services.dashboardServices import get_user_counts
 
 admin_bp = Blueprint('admin', __name__)
 
+# Result sets larger than this get a planner estimate instead of an exact count
+EXACT_COUNT_LIMIT = 1000
+MAX_PER_PAGE = 100
+
+def escape_like(term):
+    """Escape LIKE wildcards so user input is matched literally"""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def apply_user_search(query, search, match):
+    """Filter users by email/name, using prefix matching for short terms.
+
+    Prefix matches use the lower(...) text_pattern_ops indexes, substring
+    matches the pg_trgm GIN indexes (see the user search index migration).
+    """
+    term = search.strip().lower()
+    if match == 'auto':
+        # Trigram indexes cannot help with terms shorter than three characters
+        match = 'prefix' if len(term) < 3 else 'contains'
+
+    if match == 'prefix':
+        pattern = f"{escape_like(term)}%"
+        return query.filter(
+            or_(
+                func.lower(User.email).like(pattern, escape='\\'),
+                func.lower(User.first_name).like(pattern, escape='\\'),
+                func.lower(User.last_name).like(pattern, escape='\\')
+            )
+        )
+
+    pattern = f"%{escape_like(term)}%"
+    return query.filter(
+        or_(
+            User.email.ilike(pattern, escape='\\'),
+            User.first_name.ilike(pattern, escape='\\'),
+            User.last_name.ilike(pattern, escape='\\')
+        )
+    )
+
+def encode_user_cursor(user):
+    payload = json.dumps([user.created_at.isoformat(), user.id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def decode_user_cursor(cursor):
+    """Return (created_at, id) from a cursor, raising ValueError if malformed"""
+    try:
+        created_at, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(created_at), int(user_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def planner_row_estimate(query):
+    """Ask PostgreSQL how many rows it expects the query to return"""
+    bind = db.session.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return None
+    compiled = query.statement.compile(dialect=bind.dialect)
+    plan = db.session.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    ).scalar()
+    return int(plan[0]['Plan']['Plan Rows'])
+
+def count_users(query, mode):
+    """Return (total, is_estimate) for the filtered query according to mode"""
+    if mode == 'none':
+        return None, False
+
+    query = query.order_by(None)
+    if mode == 'exact':
+        return query.count(), False
+
+    # Count exactly while it is cheap, fall back to the planner for big result sets
+    capped = db.session.query(func.count()).select_from(
+        query.with_entities(User.id).limit(EXACT_COUNT_LIMIT + 1).subquery()
+    ).scalar()
+    if capped <= EXACT_COUNT_LIMIT:
+        return capped, False
+
+    estimate = planner_row_estimate(query)
+    return max(estimate or 0, capped), True
+
 @admin_bp.route('/api/admin/users', methods=['GET'])
 @login_required
 def get_all_users():
-    """Get all users (admin only)"""
+    """Get all users (admin only)
+
+    Pass ``cursor`` (empty for the first page) for keyset pagination, or
+    ``page`` for numbered pages. ``total`` is one of exact, estimated (the
+    default: exact up to EXACT_COUNT_LIMIT rows, then the planner's estimate)
+    or none.
+    """
     try:
         if not current_user.is_admin:
             return jsonify({'success': False, 'message': 'Admin access required'}), 403
         
         # Get query parameters
         page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        per_page = min(max(request.args.get('per_page', 10, type=int), 1), MAX_PER_PAGE)
         search = request.args.get('search', '', type=str)
+        match = request.args.get('match', 'auto', type=str)
+        cursor = request.args.get('cursor', type=str)
+        keyset = cursor is not None
+        total_mode = request.args.get('total', 'estimated', type=str)
+        
+        if match not in ('auto', 'contains', 'prefix'):
+            return jsonify({'success': False, 'message': 'match must be auto, contains or prefix'}), 400
+        
+        if total_mode not in ('exact', 'estimated', 'none'):
+            return jsonify({'success': False, 'message': 'total must be exact, estimated or none'}), 400
         
         # Build query
         query = User.query
         
-        if search:
-            search_filter = f"%{search}%"
-            query = query.filter(
-                or_(
-                    User.email.ilike(search_filter),
-                    User.first_name.ilike(search_filter),
-                    User.last_name.ilike(search_filter)
-                )
-            )
+        if search.strip():
+            query = apply_user_search(query, search, match)
         
-        # Paginate results
-        users = query.order_by(User.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        total, total_is_estimate = count_users(query, total_mode)
+        ordered = query.order_by(User.created_at.desc(), User.id.desc())
+        
+        if keyset:
+            if cursor:
+                try:
+                    cursor_created_at, cursor_id = decode_user_cursor(cursor)
+                except ValueError as e:
+                    return jsonify({'success': False, 'message': str(e)}), 400
+                ordered = ordered.filter(tuple_(User.created_at, User.id) < (cursor_created_at, cursor_id))
+            
+            # One extra row tells us whether another page exists without counting
+            users = ordered.limit(per_page + 1).all()
+            has_next = len(users) > per_page
+            users = users[:per_page]
+            
+            return jsonify({
+                'success': True,
+                'users': [user.to_dict() for user in users],
+                'pagination': {
+                    'per_page': per_page,
+                    'next_cursor': encode_user_cursor(users[-1]) if has_next else None,
+                    'has_next': has_next,
+                    'total': total,
+                    'total_is_estimate': total_is_estimate
+                }
+            }), 200
+        
+        page = max(page, 1)
+        users = ordered.offset((page - 1) * per_page).limit(per_page + 1).all()
+        has_next = len(users) > per_page
+        users = users[:per_page]
         
         return jsonify({
             'success': True,
-            'users': [user.to_dict() for user in users.items],
+            'users': [user.to_dict() for user in users],
             'pagination': {
-                'page': users.page,
-                'pages': users.pages,
-                'per_page': users.per_page,
-                'total': users.total,
-                'has_next': users.has_next,
-                'has_prev': users.has_prev
+                'page': page,
+                'pages': math.ceil(total / per_page) if total is not None else None,
+                'per_page': per_page,
+                'total': total,
+                'total_is_estimate': total_is_estimate,
+                'has_next': has_next,
+                'has_prev': page > 1
             }
         }), 200
         
@@ -92,6 +216,8 @@ def update_user(user_id):
         if not data:
             return jsonify({'success': False, 'message': 'No data provided'}), 400
         
+        access_before = (user.is_admin, user.is_active)
+        
         # Update allowed fields
         if 'first_name' in data:
             user.first_name = data['first_name'].strip()
@@ -111,7 +237,12 @@ def update_user(user_id):
                 return jsonify({'success': False, 'message': 'Cannot deactivate yourself'}), 400
             user.is_active = data['is_active']
         
+        # Access changes invalidate the user's cached identity and existing sessions
+        if (user.is_admin, user.is_active) != access_before:
+            invalidate_user(user)
+        
         db.session.commit()
+        user_cache.invalidate(user.id)
         
         return jsonify({
             'success': True,
@@ -142,6 +273,7 @@ def delete_user(user_id):
         
         db.session.delete(user)
         db.session.commit()
+        user_cache.invalidate(user_id)
         
         return jsonify({
             'success': True,
@@ -160,19 +292,9 @@ def dashboard_stats():
         if not current_user.is_admin:
             return jsonify({'success': False, 'message': 'Admin access required'}), 403
         
-        total_users = User.query.count()
-        active_users = User.query.filter_by(is_active=True).count()
-        admin_users = User.query.filter_by(is_admin=True).count()
-        inactive_users = total_users - active_users
-        
         return jsonify({
             'success': True,
-            'stats': {
-                'total_users': total_users,
-                'active_users': active_users,
-                'inactive_users': inactive_users,
-                'admin_users': admin_users
-            }
+            'stats': get_user_counts()
         }), 200
         
     except Exception as e:
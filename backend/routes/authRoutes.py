@@ -1,13 +1,28 @@
 from flask import Blueprint, request, jsonify, url_for, session
 from flask_login import login_user, logout_user, login_required, current_user
-from flask_bcrypt import Bcrypt
 from extensions import db
 from models.users import User
 from config.email_config import send_password_reset_email, send_password_changed_notification
+from utils.userCache import user_cache, invalidate_user
+from utils.passwordHasher import password_hasher, HasherBusy
+from utils.rateLimiter import login_ip_limiter, login_client_limiter, login_account_limiter, login_client_key
+from utils.logger import get_logger
 import re
 
 auth_bp = Blueprint('auth', __name__)
-bcrypt = Bcrypt()
+log = get_logger('auth')
+
+def hasher_busy_response():
+    """503 returned when the bcrypt pool cannot take more work"""
+    response = jsonify({'success': False, 'message': 'Server is busy, please try again shortly'})
+    response.headers['Retry-After'] = '2'
+    return response, 503
+
+def rate_limited_response(retry_after):
+    """429 returned when a login limiter bucket is empty"""
+    response = jsonify({'success': False, 'message': 'Too many login attempts, please try again later'})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 429
 
 def validate_email(email):
     """Validate email format"""
@@ -44,6 +59,20 @@ def login():
         if not validate_email(email):
             return jsonify({'success': False, 'message': 'Invalid email format'}), 400
         
+        # Throttle per client and per account before spending any CPU on bcrypt
+        allowed, retry_after = login_ip_limiter.consume(request.remote_addr or 'unknown')
+        if not allowed:
+            return rate_limited_response(retry_after)
+        
+        client_key = login_client_key(email, request.remote_addr)
+        allowed, retry_after = login_client_limiter.consume(client_key)
+        if not allowed:
+            return rate_limited_response(retry_after)
+        
+        allowed, retry_after = login_account_limiter.consume(email)
+        if not allowed:
+            return rate_limited_response(retry_after)
+        
         # Find user by email
         user = User.query.filter_by(email=email).first()
         
@@ -53,21 +82,23 @@ def login():
         if not user.is_active:
             return jsonify({'success': False, 'message': 'Account is deactivated'}), 401
         
+        # Hand the database connection back while the hash waits for the pool;
+        # the loaded row stays usable detached
+        db.session.expunge(user)
+        db.session.rollback()
+        
         # Check password
-        if not bcrypt.check_password_hash(user.password, password):
+        if not password_hasher.check_password_hash(user.password, password):
             return jsonify({'success': False, 'message': 'Invalid email or password'}), 401
         
+        # Only failed attempts count against the account
+        login_client_limiter.reset(client_key)
+        login_account_limiter.refund(email)
+        
         # Login user with remember=True for persistence
         login_user(user, remember=True)
         
-        # Session debugging
-        print(f"🔍 LOGIN DEBUG:")
-        print(f"  - User logged in: {user.email}")
-        print(f"  - Session ID: {session.get('_id')}")
-        print(f"  - User ID in session: {session.get('_user_id')}")
-        print(f"  - Current user authenticated: {current_user.is_authenticated}")
-        print(f"  - Session keys: {list(session.keys())}")
-        print(f"  - Request cookies: {dict(request.cookies)}")
+        log.info("User logged in", extra={'user_id': user.id})
         
         # Make session permanent
         session.permanent = True
@@ -83,8 +114,12 @@ def login():
         
         return response, 200
         
+    except HasherBusy:
+        db.session.rollback()
+        return hasher_busy_response()
+        
     except Exception as e:
-        print(f"❌ Login error: {str(e)}")
+        log.exception("Login error")
         return jsonify({'success': False, 'message': f'Login failed: {str(e)}'}), 500
 
 @auth_bp.route('/api/auth/register', methods=['POST'])
@@ -123,7 +158,7 @@ def register():
             return jsonify({'success': False, 'message': 'Email already exists'}), 400
         
         # Create new user
-        hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+        hashed_password = password_hasher.generate_password_hash(password)
         new_user = User(
             email=email,
             password=hashed_password,
@@ -141,6 +176,10 @@ def register():
             'user': new_user.to_dict()
         }), 201
         
+    except HasherBusy:
+        db.session.rollback()
+        return hasher_busy_response()
+        
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': f'Registration failed: {str(e)}'}), 500
@@ -195,6 +234,7 @@ def forgot_password():
         
         # Send email
         if send_password_reset_email(user, reset_url):
+            db.session.commit()
             return jsonify({
                 'success': True,
                 'message': f'Password reset link has been sent to {email}. Please check your inbox.',
@@ -208,7 +248,8 @@ def forgot_password():
             }), 500
             
     except Exception as e:
-        print(f"❌ Forgot password error: {str(e)}")
+        log.exception("Forgot password error")
+        db.session.rollback()
         return jsonify({'success': False, 'message': f'Request failed: {str(e)}'}), 500
 
 @auth_bp.route('/api/auth/reset-password', methods=['POST'])
@@ -243,20 +284,25 @@ def reset_password():
             return jsonify({'success': False, 'message': 'Invalid or expired reset token'}), 400
         
         # Update password
-        hashed_password = bcrypt.generate_password_hash(new_password).decode('utf-8')
+        hashed_password = password_hasher.generate_password_hash(new_password)
         user.password = hashed_password
+        invalidate_user(user)
         user.clear_reset_token()
         
-        db.session.commit()
-        
         # Send confirmation email
         send_password_changed_notification(user)
         
+        db.session.commit()
+        
         return jsonify({
             'success': True,
             'message': 'Password has been reset successfully'
         }), 200
         
+    except HasherBusy:
+        db.session.rollback()
+        return hasher_busy_response()
+        
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': f'Password reset failed: {str(e)}'}), 500
@@ -277,8 +323,10 @@ def change_password():
         if not all([current_password, new_password]):
             return jsonify({'success': False, 'message': 'Current and new password are required'}), 400
         
+        user = User.query.get(current_user.id)
+
         # Verify current password
-        if not bcrypt.check_password_hash(current_user.password, current_password):
+        if not password_hasher.check_password_hash(user.password, current_password):
             return jsonify({'success': False, 'message': 'Current password is incorrect'}), 400
         
         # Validate new password strength
@@ -287,19 +335,28 @@ def change_password():
             return jsonify({'success': False, 'message': password_message}), 400
         
         # Update password
-        hashed_password = bcrypt.generate_password_hash(new_password).decode('utf-8')
-        current_user.password = hashed_password
+        hashed_password = password_hasher.generate_password_hash(new_password)
+        user.password = hashed_password
+        invalidate_user(user)
+        
+        # Send confirmation email
+        send_password_changed_notification(user)
         
         db.session.commit()
         
-        # Send confirmation email
-        send_password_changed_notification(current_user)
+        # Keep this session valid (its user id carries the new auth_version),
+        # other sessions and remember cookies of the user are signed out
+        login_user(user, remember=True)
         
         return jsonify({
             'success': True,
             'message': 'Password changed successfully'
         }), 200
         
+    except HasherBusy:
+        db.session.rollback()
+        return hasher_busy_response()
+        
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': f'Password change failed: {str(e)}'}), 500
@@ -336,6 +393,7 @@ def admin_reset_user_password():
         
         # Send email
         if send_password_reset_email(user, reset_url):
+            db.session.commit()
             return jsonify({
                 'success': True,
                 'message': f'Password reset link has been sent to {user.first_name} {user.last_name} ({user_email})'
@@ -347,6 +405,7 @@ def admin_reset_user_password():
             }), 500
             
     except Exception as e:
+        db.session.rollback()
         return jsonify({'success': False, 'message': f'Request failed: {str(e)}'}), 500
 
 # ============================================
@@ -357,8 +416,6 @@ def admin_reset_user_password():
 def profile():
     """Get or update user profile"""
     try:
-        print(f"🔍 Profile route accessed by user: {current_user.email if current_user.is_authenticated else 'Anonymous'}")
-        
         if request.method == 'GET':
             return jsonify({
                 'success': True,
@@ -367,7 +424,7 @@ def profile():
         
         elif request.method == 'PUT':
             data = request.get_json()
-            print(f"🔍 Profile update data: {data}")
+            log.debug("Profile update requested", extra={'user_id': current_user.id, 'fields': sorted(data or {})})
             
             if not data:
                 return jsonify({'success': False, 'message': 'No data provided'}), 400
@@ -390,21 +447,23 @@ def profile():
                 return jsonify({'success': False, 'message': 'Email address is already in use'}), 400
             
             # Update profile
-            current_user.first_name = first_name
-            current_user.last_name = last_name
-            current_user.email = email
+            user = User.query.get(current_user.id)
+            user.first_name = first_name
+            user.last_name = last_name
+            user.email = email
             
             db.session.commit()
-            print(f"✅ Profile updated successfully for {current_user.email}")
+            user_cache.invalidate(user.id)
+            log.info("Profile updated", extra={'user_id': user.id})
             
             return jsonify({
                 'success': True,
                 'message': 'Profile updated successfully',
-                'user': current_user.to_dict()
+                'user': user.to_dict()
             }), 200
             
     except Exception as e:
-        print(f"❌ Profile route error: {str(e)}")
+        log.exception("Profile route error")
         db.session.rollback()
         return jsonify({'success': False, 'message': f'Profile operation failed: {str(e)}'}), 500
 
@@ -414,11 +473,7 @@ def logout():
     try:
         from flask import make_response
         
-        user_email = current_user.email if current_user.is_authenticated else 'Anonymous'
-        print(f"🔍 LOGOUT DEBUG:")
-        print(f"  - User logging out: {user_email}")
-        print(f"  - Session before logout: {dict(session)}")
-        print(f"  - Cookies before logout: {dict(request.cookies)}")
+        user_id = current_user.id if current_user.is_authenticated else None
         
         # Logout user if authenticated
         if current_user.is_authenticated:
@@ -428,8 +483,6 @@ def logout():
         session.clear()
         session.permanent = False
         
-        print(f"  - Session after logout: {dict(session)}")
-        
         # Create response
         response = make_response(jsonify({
             'success': True,
@@ -453,11 +506,11 @@ def logout():
             # Also try with max_age=0 for stubborn browsers
             response.set_cookie(cookie_name, '', max_age=0, path='/')
         
-        print("🧨 All cookies nuked!")
+        log.info("User logged out", extra={'user_id': user_id})
         
         return response, 200
     except Exception as e:
-        print(f"❌ Logout error: {str(e)}")
+        log.exception("Logout error")
         return jsonify({'success': False, 'message': f'Logout failed: {str(e)}'}), 500
 
 # Add these NEW routes to your existing authRoutes.py file
@@ -478,7 +531,7 @@ def check_first_time():
         }), 200
         
     except Exception as e:
-        print(f"❌ Error checking first time setup: {str(e)}")
+        log.exception("Error checking first time setup")
         return jsonify({
             'success': False,
             'message': f'Error checking setup status: {str(e)}'
@@ -538,7 +591,7 @@ def first_time_setup():
             }), 400
         
         # Create the first admin user
-        hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+        hashed_password = password_hasher.generate_password_hash(password)
         admin_user = User(
             email=email,
             password=hashed_password,
@@ -551,7 +604,7 @@ def first_time_setup():
         db.session.add(admin_user)
         db.session.commit()
         
-        print(f"✅ First admin user created: {email}")
+        log.info("First admin user created", extra={'user_id': admin_user.id})
         
         return jsonify({
             'success': True,
@@ -559,8 +612,12 @@ def first_time_setup():
             'user': admin_user.to_dict()
         }), 201
         
+    except HasherBusy:
+        db.session.rollback()
+        return hasher_busy_response()
+        
     except Exception as e:
-        print(f"❌ First-time setup error: {str(e)}")
+        log.exception("First-time setup error")
         db.session.rollback()
         return jsonify({
             'success': False,
@@ -0,0 +1,17 @@
+from flask import Blueprint, current_app, jsonify, request
+from flask_login import login_required
+from utils.batchRequests import BatchError, batch_executor
+
+batch_bp = Blueprint('batch', __name__, url_prefix='/api')
+
+# Several GET reads in one round trip:
+# {"requests": ["/api/inventory/", {"id": "damages", "path": "/api/damages/?fields=damaged_item_id"}]}
+@batch_bp.route('/batch', methods=['POST'])
+@login_required
+def run_batch():
+    try:
+        items = batch_executor.parse(request.get_json(silent=True))
+    except BatchError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'responses': batch_executor.run(current_app._get_current_object(), items)}), 200
@@ -0,0 +1,12 @@
+from flask import Blueprint
+from services.dashboardServices import get_dashboard_summary
+from utils.dbPool import analytics_pool
+
+# Create Blueprint for dashboard
+dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
+
+# Route to get all dashboard widgets in one round trip
+@dashboard_bp.route('/summary', methods=['GET'])
+@analytics_pool
+def fetch_dashboard_summary():
+    return get_dashboard_summary()
@@ -0,0 +1,161 @@
+from flask import Blueprint, current_app, jsonify, request, session
+from flask_login import current_user, login_required
+from utils.logger import get_logger
+
+# Authentication and session inspection routes; only registered when
+# DEBUG_ROUTES is enabled (the development config)
+debug_bp = Blueprint('debug', __name__, url_prefix='/debug')
+log = get_logger('debug')
+
+@debug_bp.route('/test-profile-put', methods=['PUT'])
+@login_required
+def debug_test_profile_put():
+    return jsonify({
+        'success': True,
+        'message': 'PUT with @login_required works!',
+        'user': current_user.email
+    })
+
+@debug_bp.route('/detailed-auth', methods=['GET', 'PUT', 'POST'])
+def debug_detailed_auth():
+    """Detailed debug for all request types"""
+    from flask_login import current_user
+    import datetime
+    
+    debug_info = {
+        'timestamp': datetime.datetime.now().isoformat(),
+        'method': request.method,
+        'endpoint': request.endpoint,
+        'url': request.url,
+        'headers': dict(request.headers),
+        'cookies': dict(request.cookies),
+        'session_data': dict(session),
+        'current_user': {
+            'exists': current_user is not None,
+            'is_authenticated': current_user.is_authenticated if current_user else False,
+            'is_active': getattr(current_user, 'is_active', None),
+            'is_anonymous': getattr(current_user, 'is_anonymous', None),
+            'get_id': getattr(current_user, 'get_id', lambda: None)(),
+            'email': getattr(current_user, 'email', None),
+        },
+        'flask_login_info': {
+            'session_protection': current_app.login_manager.session_protection,
+            'login_view': current_app.login_manager.login_view,
+            'remember_cookie_name': current_app.login_manager.remember_cookie_name,
+        }
+    }
+    
+    log.debug("Detailed auth debug", extra={
+        'method': request.method,
+        'path': request.path,
+        'session_keys': list(session.keys()),
+        'cookie_names': list(request.cookies.keys()),
+        'authenticated': current_user.is_authenticated if current_user else False,
+    })
+    
+    return jsonify(debug_info)
+
+@debug_bp.route('/session-comparison')
+def debug_session_comparison():
+    """Compare session data between different request types"""
+    return jsonify({
+        'message': 'Test this endpoint with different methods to compare sessions',
+        'instructions': [
+            'Call GET /debug/detailed-auth',
+            'Call PUT /debug/detailed-auth', 
+            'Call PUT /api/auth/profile with credentials',
+            'Compare the session data between calls'
+        ]
+    })
+
+@debug_bp.route('/test-login-required', methods=['GET', 'PUT', 'POST'])
+@login_required
+def debug_test_login_required():
+    """Test login_required decorator on different methods"""
+    return jsonify({
+        'success': True,
+        'method': request.method,
+        'message': f'{request.method} request successful with @login_required',
+        'user': current_user.email if current_user.is_authenticated else 'Not authenticated'
+    })
+
+@debug_bp.route('/manual-auth-check', methods=['GET', 'PUT', 'POST'])
+def debug_manual_auth_check():
+    """Manual authentication check without decorator"""
+    from flask_login import current_user
+    
+    result = {
+        'method': request.method,
+        'manual_check': {
+            'current_user_exists': current_user is not None,
+            'is_authenticated': current_user.is_authenticated if current_user else False,
+            'user_id': getattr(current_user, 'id', None),
+            'email': getattr(current_user, 'email', None),
+        },
+        'session_info': {
+            'has_user_id': '_user_id' in session,
+            'user_id_in_session': session.get('_user_id'),
+            'session_keys': list(session.keys()),
+        },
+        'cookies_info': {
+            'has_session_cookie': 'flordegrace_session' in request.cookies,
+            'has_remember_token': 'remember_token' in request.cookies,
+            'session_cookie_value': request.cookies.get('flordegrace_session', 'Not found')[:50] + '...',
+        }
+    }
+    
+    if current_user.is_authenticated:
+        result['status'] = 'AUTHENTICATED'
+        result['message'] = f'User {current_user.email} is authenticated'
+    else:
+        result['status'] = 'NOT AUTHENTICATED'
+        result['message'] = 'User is not authenticated'
+    
+    log.debug("Manual auth check", extra={
+        'method': request.method,
+        'status': result['status'],
+        'session_has_user_id': '_user_id' in session,
+    })
+    
+    return jsonify(result)
+
+# Test if the issue is with your specific profile route
+@debug_bp.route('/profile-test', methods=['PUT'])
+@login_required
+def debug_profile_test():
+    """Test PUT request with login_required (simplified profile)"""
+    return jsonify({
+        'success': True,
+        'message': 'PUT request with @login_required works!',
+        'user': current_user.email,
+        'method': request.method
+    })
+
+@debug_bp.route('/user')
+def debug_user():
+    """Debug route to check current user and session"""
+    try:
+        return jsonify({
+            'authenticated': current_user.is_authenticated,
+            'user': current_user.to_dict() if current_user.is_authenticated else None,
+            'session_keys': list(session.keys()),
+            'session_id': session.get('_id'),
+            'user_id_in_session': session.get('_user_id'),
+            'cookies': dict(request.cookies)
+        })
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'authenticated': False,
+            'session_keys': list(session.keys())
+        })
+
+@debug_bp.route('/session')
+def debug_session():
+    """Debug route to check session details"""
+    return jsonify({
+        'session_data': dict(session),
+        'has_session_cookie': 'flordegrace_session' in request.cookies,
+        'has_remember_token': 'flordegrace_remember_token' in request.cookies,
+        'all_cookies': dict(request.cookies)
+    })
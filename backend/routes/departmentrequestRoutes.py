@@ -1,5 +1,6 @@
 from flask import Blueprint, request
 from services.departmentrequestServices import create_department_request, get_department_requests, get_top_purchases_per_department
+from utils.dbPool import analytics_pool
 
 # Define the Blueprint
 departmentrequest_bp = Blueprint('departmentrequest', __name__, url_prefix='/api/department-request')
@@ -16,6 +17,7 @@ def handle_get_department_requests():
 
 # Define the route for getting top purchases per department
 @departmentrequest_bp.route('/top-purchases', methods=['GET'])
+@analytics_pool
 def handle_get_top_purchases_per_department():
     return get_top_purchases_per_department()
 
@@ -0,0 +1,17 @@
+import os
+from flask import Blueprint, jsonify
+from utils.dbPool import check_database, pool_status, engines
+
+health_bp = Blueprint('health', __name__)
+
+# Liveness: the process is up and serving; never touches the database
+@health_bp.route('/healthz', methods=['GET'])
+def healthz():
+    pools = {name: pool_status(engine) for name, engine in engines().items()}
+    return jsonify({'status': 'ok', 'pid': os.getpid(), 'pools': pools}), 200
+
+# Readiness: every pool can reach the database, with round-trip latency
+@health_bp.route('/readyz', methods=['GET'])
+def readyz():
+    ready, pools = check_database()
+    return jsonify({'status': 'ready' if ready else 'unavailable', 'pid': os.getpid(), 'pools': pools}), 200 if ready else 503
@@ -0,0 +1,13 @@
+from flask import Blueprint
+from services.syncServices import get_changes
+from utils.replicaRouter import primary_only
+
+# Create Blueprint for delta sync
+sync_bp = Blueprint('sync', __name__, url_prefix='/api/sync')
+
+# Changes since a cursor: GET /api/sync/products?since=<cursor from the previous response>
+# Kept on the primary: a lagging replica would let the cursor move past rows it has not seen yet
+@sync_bp.route('/<resource>', methods=['GET'])
+@primary_only
+def fetch_changes(resource):
+    return get_changes(resource)
@@ -1,9 +1,17 @@
 from flask import jsonify, make_response
-from models.damage import DamagedItem
+from models.damage import DamagedItem, DamagedItemArchive, ReturnStatusEnum
 from models.inventory import Inventory
+from models.products import Product
 from extensions import db
+from sqlalchemy import func
+from sqlalchemy.orm.exc import StaleDataError
+from services.evaluateServices import EVALUATION_ARCHIVE
+from utils.archive import ArchivedTable, date_range, include_archive
+from utils.optimisticLock import retry_on_conflict
+from utils.projection import Projection
 
 # Service function to update a damaged item's status and inventory
+@retry_on_conflict
 def update_damage_status(damaged_item_id):
     try:
         # Fetch the damaged item by ID
@@ -12,7 +20,7 @@ def update_damage_status(damaged_item_id):
             return make_response(jsonify({"error": "Damaged item not found"}), 404)
 
         # Ensure the damaged item's status is not already replaced
-        if damaged_item.return_status == "replaced":
+        if damaged_item.return_status == ReturnStatusEnum.replaced:
             return make_response(jsonify({"error": "Damaged item already replaced"}), 400)
 
         # Fetch the related purchase request to get unit_price
@@ -35,7 +43,7 @@ def update_damage_status(damaged_item_id):
         inventory.running_amount += total_amount
 
         # Update the damaged item's status to replaced
-        damaged_item.return_status = "replaced"
+        damaged_item.return_status = ReturnStatusEnum.replaced
 
         # Commit the changes
         db.session.commit()
@@ -48,18 +56,47 @@ def update_damage_status(damaged_item_id):
             }),
             200
         )
+    except StaleDataError:
+        raise
     except Exception as e:
         db.session.rollback()
         return make_response(jsonify({"error": str(e)}), 500)
 
 
+# Settled damaged items are archived together with their evaluation; pending
+# ones always stay in damaged_items
+DAMAGE_ARCHIVE = ArchivedTable(DamagedItem, DamagedItemArchive, 'created_at',
+                               parent=(EVALUATION_ARCHIVE, 'evaluation_id'))
+
+
+def _damaged_item_rows(damage):
+    """Read model for the damaged item list, with product details"""
+    return Projection('DamagedItemRow', damage, {
+        'damaged_item_id': damage.damaged_item_id,
+        'evaluation_id': damage.evaluation_id,
+        'product_id': damage.product_id,
+        'product_name': Product.name,
+        'product_model': Product.model,
+        'product_brand': Product.brand,
+        'quantity': damage.quantity,
+        'return_status': damage.return_status,
+        'created_at': damage.created_at,
+        'updated_at': damage.updated_at,
+    }, joins=[(Product, damage.product_id == Product.product_id)], order_by=damage.damaged_item_id)
+
+
+DAMAGED_ITEM_ROWS = _damaged_item_rows(DamagedItem)
+DAMAGED_ITEM_HISTORY_ROWS = _damaged_item_rows(DAMAGE_ARCHIVE.everything)
+
+
+# Recent damaged items, or with ?archive=include all of them; ?from= and ?to= bound created_at
 def get_damages():
-    damaged_items = DamagedItem.query.all()
-    damaged_items_list = [damaged_item.to_dict() for damaged_item in damaged_items]
-    total_damages = len(damaged_items)
+    rows = (DAMAGED_ITEM_HISTORY_ROWS if include_archive() else DAMAGED_ITEM_ROWS).from_request()
+    damaged_items_list = rows.all(*date_range(rows.source.created_at))
+    total_damages = len(damaged_items_list)
 
-    pending_damages = DamagedItem.query.filter_by(return_status='pending').all()
-    total_pending_damages = len(pending_damages)
+    # Pending items are never archived, so the hot table has them all
+    total_pending_damages = db.session.query(func.count(DamagedItem.damaged_item_id)).filter_by(return_status='pending').scalar()
 
     # Prepare the response data
     response_data = {
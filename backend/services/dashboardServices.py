@@ -0,0 +1,169 @@
+import os
+from flask import jsonify, make_response
+from flask_login import current_user
+from sqlalchemy import func, case, select
+from extensions import db
+from models.users import User
+from models.inventory import Inventory
+from models.damage import DamagedItem, ReturnStatusEnum
+from models.maintenance import Maintenance, MaintenanceStatus
+from models.supplier import Supplier
+from models.purchase import PurchaseRequest, PurchaseRequestStatusEnum
+from models.products import Product
+from models.department import DepartmentFacility
+from models.departmentrequest import DepartmentRequest
+from services.inventoryServices import LOW_STOCK_THRESHOLD
+from utils.cache import TTLCache
+
+dashboard_cache = TTLCache('dashboard', ttl=int(os.getenv('DASHBOARD_CACHE_TTL', '15')))
+
+
+def get_user_counts():
+    total, active, admins = db.session.query(
+        func.count(User.id),
+        func.coalesce(func.sum(case((User.is_active.is_(True), 1), else_=0)), 0),
+        func.coalesce(func.sum(case((User.is_admin.is_(True), 1), else_=0)), 0)
+    ).one()
+
+    return {
+        'total_users': int(total),
+        'active_users': int(active),
+        'inactive_users': int(total) - int(active),
+        'admin_users': int(admins)
+    }
+
+
+def _count(model, *criteria):
+    return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+
+def _compute_summary():
+    # Inventory totals and low-stock items in a single pass over inventory
+    total_quantity, stock_value, low_stock = db.session.query(
+        func.coalesce(func.sum(Inventory.quantity), 0),
+        func.coalesce(func.sum(Inventory.running_amount), 0),
+        func.coalesce(func.sum(case((Inventory.quantity < LOW_STOCK_THRESHOLD, 1), else_=0)), 0)
+    ).one()
+
+    # Remaining counters as scalar subqueries of one statement
+    counts = db.session.execute(select(
+        _count(Supplier).label('total_suppliers'),
+        _count(DamagedItem, DamagedItem.return_status == ReturnStatusEnum.pending).label('pending_damages'),
+        _count(Maintenance).label('total_maintenance'),
+        _count(Maintenance, Maintenance.status == MaintenanceStatus.pending).label('pending_maintenance'),
+        _count(Maintenance, Maintenance.status == MaintenanceStatus.condemned).label('total_condemned')
+    )).one()
+
+    recent_purchases = db.session.query(
+        PurchaseRequest.request_id,
+        PurchaseRequest.product_id,
+        Product.name,
+        Supplier.supplier_name,
+        PurchaseRequest.quantity,
+        PurchaseRequest.total_amount,
+        PurchaseRequest.status,
+        PurchaseRequest.request_date
+    ).join(Product, PurchaseRequest.product_id == Product.product_id
+    ).join(Supplier, PurchaseRequest.supplier_id == Supplier.supplier_id
+    ).order_by(PurchaseRequest.request_id.desc()).limit(5).all()
+
+    top_products = db.session.query(
+        PurchaseRequest.product_id,
+        Product.name,
+        func.count(PurchaseRequest.request_id).label('total_purchases')
+    ).join(Product, PurchaseRequest.product_id == Product.product_id
+    ).filter(PurchaseRequest.status == PurchaseRequestStatusEnum.approved
+    ).group_by(PurchaseRequest.product_id, Product.name
+    ).order_by(func.count(PurchaseRequest.request_id).desc()).limit(10).all()
+
+    top_per_department = db.session.query(
+        DepartmentFacility.department_name,
+        Product.name.label('product_name'),
+        func.sum(DepartmentRequest.quantity).label('total_purchases')
+    ).join(DepartmentRequest, DepartmentFacility.department_id == DepartmentRequest.department_id
+    ).join(Product, DepartmentRequest.product_id == Product.product_id
+    ).group_by(DepartmentFacility.department_name, Product.name
+    ).order_by(DepartmentFacility.department_name, func.sum(DepartmentRequest.quantity).desc()
+    ).limit(5).all()
+
+    recent_department_requests = db.session.query(
+        DepartmentRequest.department_request_id,
+        DepartmentFacility.department_name,
+        Product.name,
+        Product.model,
+        Product.brand,
+        DepartmentRequest.quantity,
+        DepartmentRequest.request_date
+    ).join(DepartmentFacility, DepartmentRequest.department_id == DepartmentFacility.department_id
+    ).join(Product, DepartmentRequest.product_id == Product.product_id
+    ).order_by(DepartmentRequest.department_request_id.desc()).limit(5).all()
+
+    return {
+        'user_counts': get_user_counts(),
+        'inventory': {
+            'total_quantity': int(total_quantity),
+            'stock_value': str(stock_value),
+            'low_stock_count': int(low_stock),
+            'low_stock_threshold': LOW_STOCK_THRESHOLD
+        },
+        'total_suppliers': counts.total_suppliers,
+        'pending_damages': counts.pending_damages,
+        'maintenance': {
+            'total_maintenance': counts.total_maintenance,
+            'pending_maintenance': counts.pending_maintenance,
+            'total_condemned': counts.total_condemned
+        },
+        'recent_purchases': [
+            {
+                'request_id': request_id,
+                'product_id': product_id,
+                'product_name': product_name,
+                'supplier_name': supplier_name,
+                'quantity': quantity,
+                'total_amount': str(total_amount) if total_amount else '0.00',
+                'status': status.value,
+                'request_date': request_date.isoformat() if request_date else None
+            } for request_id, product_id, product_name, supplier_name, quantity, total_amount, status, request_date in recent_purchases
+        ],
+        'top_products': [
+            {
+                'product_id': product_id,
+                'product_name': product_name,
+                'total_purchases': total_purchases
+            } for product_id, product_name, total_purchases in top_products
+        ],
+        'top_purchases_per_department': [
+            {
+                'department_name': department_name,
+                'product_name': product_name,
+                'total_purchases': int(total_purchases)
+            } for department_name, product_name, total_purchases in top_per_department
+        ],
+        'recent_department_requests': [
+            {
+                'department_request_id': department_request_id,
+                'department_name': department_name,
+                'product_name': product_name,
+                'product_model': product_model,
+                'product_brand': product_brand,
+                'quantity': quantity,
+                'request_date': request_date.isoformat() if request_date else None
+            } for department_request_id, department_name, product_name, product_model, product_brand, quantity, request_date in recent_department_requests
+        ]
+    }
+
+
+# Service function to get every dashboard widget in one response
+def get_dashboard_summary():
+    try:
+        summary = dict(dashboard_cache.get_or_compute('summary', _compute_summary))
+
+        # User counts are computed with the rest but only shown to admins
+        if not (current_user.is_authenticated and current_user.is_admin):
+            summary.pop('user_counts', None)
+
+        return make_response(jsonify(summary), 200)
+
+    except Exception as e:
+        db.session.rollback()
+        return make_response(jsonify({'error': str(e)}), 500)
@@ -1,13 +1,21 @@
 from flask import request, jsonify, make_response
 from models.department import DepartmentFacility
 from extensions import db
+from utils.projection import Projection
+from utils.cache import reference_cache, cached_json, invalidates
+
+# Read model for the department list
+DEPARTMENT_ROWS = Projection('DepartmentRow', DepartmentFacility, {
+    'department_id': DepartmentFacility.department_id,
+    'department_name': DepartmentFacility.department_name,
+    'created_at': DepartmentFacility.created_at,
+    'updated_at': DepartmentFacility.updated_at,
+}, order_by=DepartmentFacility.department_id)
 
 # Get all departments
 def get_departments():
-    departments = DepartmentFacility.query.all()
-    department_list = [department.to_dict() for department in departments]
-    
-    return make_response(jsonify(department_list), 200)
+    rows = DEPARTMENT_ROWS.from_request()
+    return cached_json(reference_cache, ('departments', rows.signature), rows.all, tags=('department_facility',))
 
 # Service function to get a single department by ID
 def get_department_by_id(department_id):
@@ -20,6 +28,7 @@ def get_department_by_id(department_id):
 
 
  # Create a new department with error handling
+@invalidates('department_facility')
 def create_department(data):
     try:
         name = data.get('department_name')
@@ -49,6 +58,7 @@ def create_department(data):
     
 
 # Update an existing department
+@invalidates('department_facility')
 def update_department(department_id, data):
     try:
         department = DepartmentFacility.query.get(department_id)
@@ -87,6 +97,7 @@ def update_department(department_id, data):
 
 # Delete an existing department
 # Delete an existing department
+@invalidates('department_facility')
 def delete_department(department_id):
     try:
         # Import DepartmentRequest model to check for dependencies
@@ -1,12 +1,41 @@
 from flask import request, jsonify, make_response
-from models.departmentrequest import DepartmentRequest
+from models.departmentrequest import DepartmentRequest, DepartmentRequestArchive
 from models.inventory import Inventory
 from models.department import DepartmentFacility
 from models.products import Product
 from extensions import db
 from datetime import datetime
 from sqlalchemy import func
-
+from sqlalchemy.orm.exc import StaleDataError
+from utils.archive import ArchivedTable, date_range, include_archive
+from utils.optimisticLock import retry_on_conflict
+from utils.projection import Projection
+
+# Department requests older than ARCHIVE_AFTER_MONTHS are moved to department_requests_archive
+DEPARTMENT_REQUEST_ARCHIVE = ArchivedTable(DepartmentRequest, DepartmentRequestArchive, 'request_date')
+
+
+def _department_request_rows(department_request):
+    """Read model for the department request list, with department and product names"""
+    return Projection('DepartmentRequestRow', department_request, {
+        'department_request_id': department_request.department_request_id,
+        'department_id': department_request.department_id,
+        'department_name': DepartmentFacility.department_name,
+        'product_id': department_request.product_id,
+        'product_name': Product.name,
+        'product_model': Product.model,
+        'product_brand': Product.brand,
+        'quantity': department_request.quantity,
+        'request_date': department_request.request_date,
+    }, joins=[(DepartmentFacility, department_request.department_id == DepartmentFacility.department_id),
+              (Product, department_request.product_id == Product.product_id)],
+       order_by=department_request.department_request_id)
+
+
+DEPARTMENT_REQUEST_ROWS = _department_request_rows(DepartmentRequest)
+DEPARTMENT_REQUEST_HISTORY_ROWS = _department_request_rows(DEPARTMENT_REQUEST_ARCHIVE.everything)
+
+@retry_on_conflict
 def create_department_request():
     try:
         # Parse the incoming data
@@ -37,7 +66,6 @@ def create_department_request():
 
         # Decrease the inventory
         inventory.quantity -= quantity
-        inventory.updated_at = datetime.now()
 
         # Add the new request and update the inventory in the database
         db.session.add(new_request)
@@ -46,6 +74,10 @@ def create_department_request():
 
         return make_response(jsonify(new_request.to_dict()), 201)
 
+    except StaleDataError:
+        # Another request took stock first; retried against the new quantity
+        raise
+
     except Exception as e:
         db.session.rollback()
         return make_response(jsonify({"error": str(e)}), 500)
@@ -53,24 +85,27 @@ def create_department_request():
     finally:
         db.session.remove()
 
-# Get all department requests
+# Get the recent department requests, or with ?archive=include all of them
 def get_department_requests():
-    # Fetch all department requests from the database
-    department_requests = DepartmentRequest.query.all()
-    department_request_list = [request.to_dict() for request in department_requests]
-    return make_response(jsonify(department_request_list), 200)
+    rows = (DEPARTMENT_REQUEST_HISTORY_ROWS if include_archive() else DEPARTMENT_REQUEST_ROWS).from_request()
+    return make_response(jsonify(rows.all(*date_range(rows.source.request_date))), 200)
 
 def get_top_purchases_per_department():
+    # Recent requests unless ?archive=include
+    department_request = DEPARTMENT_REQUEST_ARCHIVE.source(include_archive())
+    period = date_range(department_request.request_date)
+
     try:
         # Query to aggregate and fetch top 10 purchases per department
         top_purchases = db.session.query(
             DepartmentFacility.department_name,
             Product.name.label('product_name'),
-            func.sum(DepartmentRequest.quantity).label('total_purchases')
-        ).join(DepartmentRequest, DepartmentFacility.department_id == DepartmentRequest.department_id
-        ).join(Product, DepartmentRequest.product_id == Product.product_id
+            func.sum(department_request.quantity).label('total_purchases')
+        ).join(department_request, DepartmentFacility.department_id == department_request.department_id
+        ).join(Product, department_request.product_id == Product.product_id
+        ).filter(*period
         ).group_by(DepartmentFacility.department_name, Product.name
-        ).order_by(DepartmentFacility.department_name, func.sum(DepartmentRequest.quantity).desc()
+        ).order_by(DepartmentFacility.department_name, func.sum(department_request.quantity).desc()
         ).limit(5).all()  # Limit the results to top 10
 
         # Convert the query result to a list of dictionaries
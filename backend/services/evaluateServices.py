@@ -1,11 +1,51 @@
 from flask import jsonify, make_response
 from models.purchase import PurchaseRequest, PurchaseRequestStatusEnum
-from models.evaluate import Evaluation
+from models.evaluate import Evaluation, EvaluationArchive
 from models.damage import DamagedItem, ReturnStatusEnum
 from models.inventory import Inventory
 from models.products import Product
+from models.supplier import Supplier
 from extensions import db
-
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from decimal import Decimal
+from services.purchaseServices import PURCHASE_ARCHIVE
+from utils.archive import ArchivedTable, date_range, include_archive
+from utils.optimisticLock import is_unique_violation, retry_on_conflict
+from utils.projection import Projection
+
+# Evaluations are archived together with their purchase request
+EVALUATION_ARCHIVE = ArchivedTable(Evaluation, EvaluationArchive, 'evaluation_date',
+                                   parent=(PURCHASE_ARCHIVE, 'request_id'))
+
+
+def _evaluation_rows(evaluation, purchase):
+    """Read model for the evaluation list, with the purchase request, product and supplier details"""
+    return Projection('EvaluationRow', evaluation, {
+        'evaluation_id': evaluation.evaluation_id,
+        'request_id': evaluation.request_id,
+        'undamaged_quantity': evaluation.undamaged_quantity,
+        'damaged_quantity': evaluation.damaged_quantity,
+        'evaluation_date': evaluation.evaluation_date,
+        'product_name': Product.name,
+        'brand': Product.brand,
+        'model': Product.model,
+        'quantity': purchase.quantity,
+        'supplier_name': Supplier.supplier_name,
+        'total_amount': func.coalesce(purchase.total_amount, Decimal('0.00')),
+        'status': purchase.status,
+        'request_date': purchase.request_date,
+    }, joins=[(purchase, evaluation.request_id == purchase.request_id),
+              (Product, purchase.product_id == Product.product_id),
+              (Supplier, purchase.supplier_id == Supplier.supplier_id)],
+       order_by=evaluation.evaluation_id)
+
+
+EVALUATION_ROWS = _evaluation_rows(Evaluation, PurchaseRequest)
+EVALUATION_HISTORY_ROWS = _evaluation_rows(EVALUATION_ARCHIVE.everything, PURCHASE_ARCHIVE.everything)
+
+@retry_on_conflict
 def evaluate_purchase_request(request_id, undamaged_quantity, damaged_quantity):
     try:
         # Fetch the purchase request by request_id
@@ -31,7 +71,8 @@ def evaluate_purchase_request(request_id, undamaged_quantity, damaged_quantity):
                 damaged_quantity=damaged_quantity
             )
             db.session.add(evaluation)
-            db.session.commit()  # Commit so evaluation_id is available
+            # Flush so evaluation_id is available; everything commits together below
+            db.session.flush()
 
             # If there's damage, save the damaged products to DamagedItem
             damaged_item = DamagedItem(
@@ -53,7 +94,6 @@ def evaluate_purchase_request(request_id, undamaged_quantity, damaged_quantity):
                 damaged_quantity=0
             )
             db.session.add(evaluation)
-            db.session.commit()
             
             # Update the PurchaseRequest status to "approved"
             purchase_request.status = PurchaseRequestStatusEnum.approved
@@ -100,6 +140,17 @@ def evaluate_purchase_request(request_id, undamaged_quantity, damaged_quantity):
 
         return make_response(jsonify({'message': 'Purchase request evaluated successfully', 'data': response_data}), 200)
 
+    except StaleDataError:
+        raise
+
+    except IntegrityError as e:
+        if is_unique_violation(e):
+            # Another delivery created this product's inventory row first; the
+            # retry adds to it instead
+            raise
+        db.session.rollback()
+        return make_response(jsonify({'error': str(e)}), 500)
+
     except Exception as e:
         db.session.rollback()
         return make_response(jsonify({'error': str(e)}), 500)
@@ -107,9 +158,7 @@ def evaluate_purchase_request(request_id, undamaged_quantity, damaged_quantity):
 
     
 
-# Service function to get all evaluations
+# Service function to get the recent evaluations, or with ?archive=include all of them
 def get_evaluations():
-    evaluations = Evaluation.query.all() 
-    evaluations_list = [evaluation.to_dict() for evaluation in evaluations]
-
-    return make_response(jsonify(evaluations_list), 200)
+    rows = (EVALUATION_HISTORY_ROWS if include_archive() else EVALUATION_ROWS).from_request()
+    return make_response(jsonify(rows.all(*date_range(rows.source.evaluation_date))), 200)
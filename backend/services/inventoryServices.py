@@ -1,32 +1,41 @@
 from flask import jsonify, make_response
 from models.inventory import Inventory
+from models.products import Product
 from extensions import db
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from utils.projection import Projection
+
+# Items below this quantity are reported as low stock
+LOW_STOCK_THRESHOLD = 20
+
+# Read model for the inventory list, with product details
+INVENTORY_ROWS = Projection('InventoryRow', Inventory, {
+    'inventory_id': Inventory.inventory_id,
+    'product_id': Inventory.product_id,
+    'product_name': func.coalesce(Product.name, 'Unknown'),
+    'product_model': func.coalesce(Product.model, 'Unknown'),
+    'product_brand': func.coalesce(Product.brand, 'Unknown'),
+    'product_category': func.coalesce(Product.category, 'Unknown'),
+    'product_type': Product.product_type,
+    'quantity': Inventory.quantity,
+    'running_amount': Inventory.running_amount,
+    'created_at': Inventory.created_at,
+    'updated_at': Inventory.updated_at,
+    'version': Inventory.version,
+}, joins=[Inventory.product], order_by=Inventory.inventory_id)
 
 # Service function to get all inventory
 def get_inventory():
     # Add ordering to ensure the inventory is fetched in the correct order
-    inventory_items = Inventory.query.order_by(Inventory.inventory_id).all()
-    
-    inventory_list = []
-    total_quantity = 0  # Initialize total quantity
-
-    for inventory in inventory_items:
-        product = inventory.product
-        
-        # Get the inventory details and add product details
-        inventory_dict = inventory.to_dict()
-
-        # Include all relevant product details
-        inventory_dict['product_name'] = product.name if product else "Unknown"
-        inventory_dict['product_model'] = product.model if product else "Unknown"
-        inventory_dict['product_brand'] = product.brand if product else "Unknown"
-        inventory_dict['product_category'] = product.category if product else "Unknown"
-        inventory_dict['product_type'] = product.product_type.name if product and product.product_type else None
-
-        # Add the inventory's quantity to the total
-        total_quantity += inventory.quantity
+    rows = INVENTORY_ROWS.from_request()
+    inventory_list = rows.all()
 
-        inventory_list.append(inventory_dict)
+    # Sum the quantities already loaded, unless ?fields= left them out
+    if 'quantity' in rows.keys:
+        total_quantity = sum(row.quantity for row in inventory_list)
+    else:
+        total_quantity = db.session.query(func.coalesce(func.sum(Inventory.quantity), 0)).scalar()
 
     # Include total quantity in the response
     response_data = {
@@ -38,7 +47,7 @@ def get_inventory():
 
 # Service function to get notifications for low stock items
 def get_notifications():
-    inventory_items = Inventory.query.all()
+    inventory_items = Inventory.query.options(joinedload(Inventory.product)).all()
     low_stock_items = []
 
     for inventory in inventory_items:
@@ -46,7 +55,7 @@ def get_notifications():
         product_name = product.name if product else "Unknown"
         
         # Check for low stock or out-of-stock items
-        if inventory.quantity == 0 or inventory.quantity < 20:
+        if inventory.quantity == 0 or inventory.quantity < LOW_STOCK_THRESHOLD:
             low_stock_items.append({
                 "product_name": product_name,
                 "quantity": inventory.quantity,
@@ -0,0 +1,135 @@
+import calendar
+import os
+import pytz
+from flask import current_app
+from sqlalchemy import exists, update
+from extensions import db
+from models.users import User
+from models.inventory import Inventory
+from models.products import Product
+from models.maintenance import Maintenance, MaintenanceStatus
+from models.purchase import PurchaseRequest, PurchaseRequestStatusEnum
+from models.evaluate import Evaluation
+from models.damage import DamagedItem, ReturnStatusEnum
+from config.email_config import send_low_stock_alert, send_overdue_maintenance_alert
+from services.inventoryServices import LOW_STOCK_THRESHOLD
+from services.dashboardServices import dashboard_cache, _compute_summary
+from services.purchaseServices import PURCHASE_ARCHIVE
+from services.evaluateServices import EVALUATION_ARCHIVE
+from services.damageServices import DAMAGE_ARCHIVE
+from services.departmentrequestServices import DEPARTMENT_REQUEST_ARCHIVE
+from utils.archive import archive_cutoff, move_to_archive
+from utils.dbPool import ANALYTICS_BIND
+from utils.deltaSync import MANILA_TZ, prune_tombstones
+from utils.logger import get_logger
+from utils.scheduler import Cron, Interval
+
+log = get_logger('jobs')
+
+# Every job is called with the scheduled time, naive UTC, and may run again
+# after a crash, so each one is safe to repeat.
+
+
+def _admins():
+    return User.query.filter(User.is_admin.is_(True), User.is_active.is_(True)).all()
+
+
+def scan_low_stock(now):
+    """Email admins the items below LOW_STOCK_THRESHOLD"""
+    items = db.session.query(
+        Product.name.label('product_name'),
+        Inventory.quantity
+    ).join(Product, Inventory.product_id == Product.product_id
+    ).filter(Inventory.quantity < LOW_STOCK_THRESHOLD
+    ).order_by(Inventory.quantity, Product.name).all()
+
+    if items:
+        for user in _admins():
+            send_low_stock_alert(user, items, LOW_STOCK_THRESHOLD)
+        db.session.commit()
+    log.info("Low stock scan", extra={'items': len(items)})
+
+
+def scan_overdue_maintenance(now):
+    """Email admins the maintenance jobs past their scheduled date"""
+    items = db.session.query(
+        Product.name.label('product_name'),
+        Maintenance.engineer_name,
+        Maintenance.scheduled_date
+    ).join(Product, Maintenance.product_id == Product.product_id
+    ).filter(
+        Maintenance.status.in_([MaintenanceStatus.pending, MaintenanceStatus.in_progress]),
+        Maintenance.scheduled_date < pytz.utc.localize(now)
+    ).order_by(Maintenance.scheduled_date).all()
+
+    if items:
+        for user in _admins():
+            send_overdue_maintenance_alert(user, items)
+        db.session.commit()
+    log.info("Overdue maintenance scan", extra={'items': len(items)})
+
+
+def clear_expired_reset_tokens(now):
+    result = db.session.execute(
+        update(User)
+        .where(User.reset_token_expires < now)
+        .values(reset_token=None, reset_token_expires=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    log.info("Expired reset tokens cleared", extra={'users': result.rowcount})
+
+
+def collect_expired_sessions(now):
+    """Delete session files past their expiry from SESSION_FILE_DIR"""
+    cache = current_app.session_interface.cache
+    before = len(os.listdir(current_app.config['SESSION_FILE_DIR']))
+    # cachelib's own sweep; it otherwise only runs once the directory is over its threshold
+    cache._remove_expired(calendar.timegm(now.timetuple()))
+    removed = before - len(os.listdir(current_app.config['SESSION_FILE_DIR']))
+    log.info("Expired sessions removed", extra={'sessions': removed})
+
+
+def refresh_dashboard_summary(now):
+    """Recompute this process's dashboard summary before the cached one expires"""
+    # Kept for two periods so a slow refresh never leaves requests to compute it
+    dashboard_cache.set('summary', _compute_summary(), ttl=dashboard_cache.ttl * 2)
+
+
+def prune_sync_tombstones(now):
+    removed = prune_tombstones(pytz.utc.localize(now).astimezone(MANILA_TZ))
+    log.info("Sync tombstones pruned", extra={'tombstones': removed})
+
+
+def archive_history(now):
+    """Move closed purchase history and department requests dated before the
+    archive cutoff to the archive tables"""
+    cutoff = archive_cutoff(now)
+    # A purchase request is closed once evaluated, with no damaged item still awaiting replacement
+    awaiting_replacement = exists().where(
+        Evaluation.request_id == PurchaseRequest.request_id,
+        DamagedItem.evaluation_id == Evaluation.evaluation_id,
+        DamagedItem.return_status == ReturnStatusEnum.pending
+    )
+    moved = move_to_archive([PURCHASE_ARCHIVE, EVALUATION_ARCHIVE, DAMAGE_ARCHIVE], cutoff,
+                            PurchaseRequest.status != PurchaseRequestStatusEnum.pending, ~awaiting_replacement)
+    moved.update(move_to_archive([DEPARTMENT_REQUEST_ARCHIVE], cutoff))
+    log.info("History archived", extra={'cutoff': cutoff.isoformat(), **moved})
+
+
+def register_jobs(scheduler, app):
+    """The app's recurring jobs; cron times are in SCHEDULER_TIMEZONE"""
+    timezone = app.config['SCHEDULER_TIMEZONE']
+    scheduler.add('low_stock_scan', scan_low_stock, Cron('0 8 * * *', timezone))
+    scheduler.add('overdue_maintenance', scan_overdue_maintenance, Cron('0 8 * * *', timezone))
+    scheduler.add('reset_token_cleanup', clear_expired_reset_tokens, Interval(hours=1))
+    scheduler.add('prune_sync_tombstones', prune_sync_tombstones, Cron('30 2 * * *', timezone))
+    if app.config['ARCHIVE_AFTER_MONTHS'] > 0:
+        # The first run after enabling may move years of history
+        scheduler.add('archive_history', archive_history, Cron('15 3 * * *', timezone), lease_seconds=3600)
+    # Session files live on each machine's disk
+    scheduler.add('session_gc', collect_expired_sessions, Interval(hours=1), scope='host')
+    # Each process has its own dashboard cache to keep warm
+    if dashboard_cache.ttl > 0:
+        scheduler.add('dashboard_summary', refresh_dashboard_summary, Interval(seconds=dashboard_cache.ttl),
+                      scope='process', pool=ANALYTICS_BIND)
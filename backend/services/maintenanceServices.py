@@ -2,11 +2,30 @@ from flask import jsonify, make_response
 from models.maintenance import Maintenance, MaintenanceStatus
 from models.products import Product
 from extensions import db
+from sqlalchemy import func
+from utils.projection import Projection
 from datetime import datetime
 import pytz
 
 MANILA_TZ = pytz.timezone("Asia/Manila")
 
+# Read model for the maintenance list, with product details
+MAINTENANCE_ROWS = Projection('MaintenanceRow', Maintenance, {
+    'maintenance_id': Maintenance.maintenance_id,
+    'product_id': Maintenance.product_id,
+    'product_name': Product.name,
+    'brand': Product.brand,
+    'model': Product.model,
+    'description': Maintenance.description,
+    'engineer_name': Maintenance.engineer_name,
+    'scheduled_date': Maintenance.scheduled_date,
+    'completed_date': Maintenance.completed_date,
+    'status': Maintenance.status,
+    'notes': Maintenance.notes,
+    'created_at': Maintenance.created_at,
+    'updated_at': Maintenance.updated_at,
+}, joins=[Maintenance.product], order_by=Maintenance.maintenance_id.asc())
+
 def create_maintenance(data):
     try:
         # Extract data from the input dictionary
@@ -110,15 +129,18 @@ def take_action_condemned(maintenance_id, data):
         return make_response(jsonify({"error": "Internal Server Error", "message": str(e)}), 500)
 
 def get_maintenance():
+    rows = MAINTENANCE_ROWS.from_request()
     try:
-        # Fetch all maintenance records and sort by maintenance_id in ascending order
-        maintenances = Maintenance.query.order_by(Maintenance.maintenance_id.asc()).all()
-        maintenance_list = [maintenance.to_dict() for maintenance in maintenances]
+        # Fetch all maintenance records sorted by maintenance_id in ascending order
+        maintenance_list = rows.all()
 
-        # Count the total number of condemned maintenance records
-        total_condemned = Maintenance.query.filter_by(status=MaintenanceStatus.condemned).count()
+        # Count the condemned records from the rows already loaded, unless ?fields= left status out
+        if 'status' in rows.keys:
+            total_condemned = sum(1 for row in maintenance_list if row.status is MaintenanceStatus.condemned)
+        else:
+            total_condemned = db.session.query(func.count(Maintenance.maintenance_id)).filter_by(status=MaintenanceStatus.condemned).scalar()
 
-        total_maintenance = len(maintenances)
+        total_maintenance = len(maintenance_list)
 
         response_data = {
             "total_maintenance": total_maintenance,
@@ -4,8 +4,26 @@ from models.supplier import Supplier
 from extensions import db
 from psycopg2.errors import NumericValueOutOfRange
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from utils.optimisticLock import retry_on_conflict, if_match_conflict
+from utils.projection import Projection
+from utils.cache import reference_cache, cached_json, invalidates
+
+# Read model for the product list
+PRODUCT_ROWS = Projection('ProductRow', Product, {
+    'product_id': Product.product_id,
+    'name': Product.name,
+    'category': Product.category,
+    'product_type': Product.product_type,
+    'brand': Product.brand,
+    'model': Product.model,
+    'created_at': Product.created_at,
+    'updated_at': Product.updated_at,
+    'version': Product.version,
+}, order_by=Product.product_id.asc())
 
 # Service function to create a new product
+@invalidates('products')
 def create_product(data):
     try:
         # Extract the necessary data
@@ -67,6 +85,8 @@ def create_product(data):
     
 
 # Service function to update product
+@invalidates('products')
+@retry_on_conflict
 def update_product(product_id, data):
     try:
         # Fetch the product by its ID
@@ -74,6 +94,11 @@ def update_product(product_id, data):
         if not product:
             return make_response(jsonify({'error': 'Product not found'}), 404)
 
+        # The client edited an older version than the one stored
+        conflict = if_match_conflict(product)
+        if conflict:
+            return conflict
+
         # Extract fields from the input data
         name = data.get('name')
         category = data.get('category')
@@ -125,10 +150,16 @@ def update_product(product_id, data):
             'brand': product.brand,
             'model': product.model,
             'created_at': product.created_at.isoformat() if product.created_at else None,
-            'updated_at': product.updated_at.isoformat() if product.updated_at else None
+            'updated_at': product.updated_at.isoformat() if product.updated_at else None,
+            'version': product.version
         }
 
-        return make_response(jsonify({'message': 'Product updated successfully', 'product': product_response}), 200)
+        response = make_response(jsonify({'message': 'Product updated successfully', 'product': product_response}), 200)
+        response.set_etag(str(product.version))
+        return response
+
+    except StaleDataError:
+        raise
 
     except IntegrityError as e:
         db.session.rollback()
@@ -140,17 +171,26 @@ def update_product(product_id, data):
 
   
 # Service function to delete a product by ID
+@invalidates('products')
+@retry_on_conflict
 def delete_product(product_id):
     try:
         product = Product.query.get(product_id)
         if not product:
             return make_response(jsonify({'error': 'Product not found'}), 404)
 
+        conflict = if_match_conflict(product)
+        if conflict:
+            return conflict
+
         db.session.delete(product)
         db.session.commit()
 
         return make_response(jsonify({'message': 'Product deleted successfully'}), 200)
 
+    except StaleDataError:
+        raise
+
     except IntegrityError as e:
         db.session.rollback()
 
@@ -167,15 +207,9 @@ def delete_product(product_id):
     
     # Service function to get all products
 def get_products():
-    # Query all products and order them by product_id in ascending order
-    products = Product.query.order_by(Product.product_id.asc()).all()
-    products_list = []
-
-    for product in products:
-        product_dict = product.to_dict()
-        products_list.append(product_dict)
-
-    return make_response(jsonify(products_list), 200)
+    # Products ordered by product_id in ascending order
+    rows = PRODUCT_ROWS.from_request()
+    return cached_json(reference_cache, ('products', rows.signature), rows.all, tags=('products',))
 
 
 # Service function to get a single product by ID
@@ -183,6 +217,8 @@ def get_product_by_id(product_id):
     product = Product.query.get(product_id)
 
     if product:
-        return make_response(jsonify(product.to_dict()), 200)
+        response = make_response(jsonify(product.to_dict()), 200)
+        response.set_etag(str(product.version))
+        return response
 
     return make_response(jsonify({'message': 'Product not found'}), 404)
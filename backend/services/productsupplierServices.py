@@ -4,14 +4,47 @@ from models.supplier import Supplier
 from models.products import Product
 from extensions import db
 from psycopg2.errors import NumericValueOutOfRange
+from sqlalchemy.orm.exc import StaleDataError
+from utils.optimisticLock import retry_on_conflict, if_match_conflict
+from utils.cache import reference_cache, cached_json, invalidates
+from utils.projection import Projection
+
+
+# Read model for the price list, with the product and supplier embedded as in to_dict()
+PRODUCT_SUPPLIER_ROWS = Projection('ProductSupplierRow', ProductSupplier, {
+    'product_supplier_id': ProductSupplier.product_supplier_id,
+    'product_id': ProductSupplier.product_id,
+    'supplier_id': ProductSupplier.supplier_id,
+    'unit_price': ProductSupplier.unit_price,
+    'status': ProductSupplier.status,
+    'created_at': ProductSupplier.created_at,
+    'updated_at': ProductSupplier.updated_at,
+    'version': ProductSupplier.version,
+    'product': {
+        'product_id': Product.product_id,
+        'name': Product.name,
+        'category': Product.category,
+        'product_type': Product.product_type,
+        'brand': Product.brand,
+        'model': Product.model,
+    },
+    'supplier': {
+        'supplier_id': Supplier.supplier_id,
+        'supplier_name': Supplier.supplier_name,
+    },
+}, joins=[ProductSupplier.product, ProductSupplier.supplier],
+   order_by=ProductSupplier.product_supplier_id)
+
+# Price lists show the product and supplier names, so edits to either invalidate them too
+PRODUCT_SUPPLIER_TAGS = ('product_suppliers', 'products', 'suppliers')
 
 
 def get_product_suppliers():
-   product_suppliers = ProductSupplier.query.all()
-   product_suppliers_list = [product_supplier.to_dict() for product_supplier in product_suppliers]
-   return make_response(jsonify(product_suppliers_list), 200)
+   rows = PRODUCT_SUPPLIER_ROWS.from_request()
+   return cached_json(reference_cache, ('product_suppliers', rows.signature), rows.all, tags=PRODUCT_SUPPLIER_TAGS)
 
 
+@invalidates('product_suppliers')
 def create_product_supplier(data):
     try:
         # Extract data from the request
@@ -70,6 +103,8 @@ def create_product_supplier(data):
         return make_response(jsonify({'error': str(e)}), 500)
 
 
+@invalidates('product_suppliers')
+@retry_on_conflict
 def update_product_supplier(product_supplier_id, data):
     try:
         # Extract data from the request
@@ -98,6 +133,11 @@ def update_product_supplier(product_supplier_id, data):
         if not product_supplier:
             return make_response(jsonify({'error': 'Product Supplier not found'}), 404)
 
+        # The price shown to the client may already have been changed by someone else
+        conflict = if_match_conflict(product_supplier)
+        if conflict:
+            return conflict
+
         # Check if the supplier exists by ID
         supplier = Supplier.query.get(supplier_id)
         if not supplier:
@@ -135,46 +175,70 @@ def update_product_supplier(product_supplier_id, data):
         # Prepare response data
         product_supplier_response = product_supplier.to_dict()
 
-        return make_response(jsonify({
+        response = make_response(jsonify({
             'message': 'Product Supplier updated successfully', 
             'product_supplier': product_supplier_response
         }), 200)
+        response.set_etag(str(product_supplier.version))
+        return response
+
+    except StaleDataError:
+        raise
 
     except Exception as e:
         db.session.rollback()
         return make_response(jsonify({'error': str(e)}), 500)
     
+@invalidates('product_suppliers')
+@retry_on_conflict
 def toggle_product_supplier_status(product_supplier_id):
     try:
         product_supplier = ProductSupplier.query.get(product_supplier_id)
         if not product_supplier:
             return make_response(jsonify({'error': 'Product Supplier not found'}), 404)
 
+        conflict = if_match_conflict(product_supplier)
+        if conflict:
+            return conflict
+
         product_supplier.status = Status.inactive if product_supplier.status == Status.active else Status.active
 
         db.session.commit()
 
         product_supplier_response = product_supplier.to_dict()
 
-        return make_response(jsonify({
+        response = make_response(jsonify({
             'message': 'Product Supplier status updated successfully', 
             'product_supplier': product_supplier_response
         }), 200)
+        response.set_etag(str(product_supplier.version))
+        return response
+
+    except StaleDataError:
+        raise
 
     except Exception as e:
         db.session.rollback()
         return make_response(jsonify({'error': str(e)}), 500)
     
+@invalidates('product_suppliers')
+@retry_on_conflict
 def delete_product_supplier(product_supplier_id):
     try:
         product_supplier = ProductSupplier.query.get(product_supplier_id)
         if not product_supplier:
             return make_response(jsonify({'error': 'Product Supplier not found'}), 404)
+        conflict = if_match_conflict(product_supplier)
+        if conflict:
+            return conflict
         db.session.delete(product_supplier)
         db.session.commit()
 
         return make_response(jsonify({'message': 'Product Supplier deleted successfully'}), 200)
 
+    except StaleDataError:
+        raise
+
     except Exception as e:
         db.session.rollback()
         return make_response(jsonify({'error': str(e)}), 500)
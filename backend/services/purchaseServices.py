@@ -1,9 +1,40 @@
 from flask import request, jsonify, make_response
-from models.purchase import PurchaseRequest, PurchaseRequestStatusEnum
+from models.purchase import PurchaseRequest, PurchaseRequestArchive, PurchaseRequestStatusEnum
 from models.products import Product
 from models.supplier import Supplier
 from extensions import db
 from sqlalchemy import func
+from decimal import Decimal
+from utils.archive import ArchivedTable, date_range, include_archive
+from utils.projection import Projection
+
+# Recent purchase requests stay in purchase_requests; closed ones older than
+# ARCHIVE_AFTER_MONTHS are moved to purchase_requests_archive
+PURCHASE_ARCHIVE = ArchivedTable(PurchaseRequest, PurchaseRequestArchive, 'request_date')
+
+
+def _purchase_rows(purchase, order_by):
+    """Read model for the purchase request lists, with product and supplier names"""
+    return Projection('PurchaseRequestRow', purchase, {
+        'request_id': purchase.request_id,
+        'product_id': purchase.product_id,
+        'product_name': Product.name,
+        'brand': Product.brand,
+        'model': Product.model,
+        'supplier_id': purchase.supplier_id,
+        'supplier_name': Supplier.supplier_name,
+        'unit_price': purchase.unit_price,
+        'quantity': purchase.quantity,
+        'status': purchase.status,
+        'request_date': purchase.request_date,
+        'total_amount': func.coalesce(purchase.total_amount, Decimal('0.00')),
+    }, joins=[(Product, purchase.product_id == Product.product_id),
+              (Supplier, purchase.supplier_id == Supplier.supplier_id)], order_by=order_by)
+
+
+PURCHASE_ROWS = _purchase_rows(PurchaseRequest, PurchaseRequest.request_id)
+PURCHASE_HISTORY_ROWS = _purchase_rows(PURCHASE_ARCHIVE.everything, PURCHASE_ARCHIVE.everything.request_id)
+RECENT_PURCHASE_ROWS = _purchase_rows(PurchaseRequest, PurchaseRequest.request_id.desc())
 
 # Service function to create a new purchase request
 def create_purchase_request(data):
@@ -83,20 +114,16 @@ def create_purchase_request(data):
         return make_response(jsonify({'error': str(e)}), 500)
 
 
-# Service function to get all purchase requests
+# Service function to get the purchase requests: the recent ones, or with
+# ?archive=include the whole history; ?from= and ?to= bound the request date
 def get_purchase_requests():
-    purchase_requests = PurchaseRequest.query.all()
-    purchase_requests_list = [purchase_request.to_dict() for purchase_request in purchase_requests]
-
-    return make_response(jsonify(purchase_requests_list), 200)
+    rows = (PURCHASE_HISTORY_ROWS if include_archive() else PURCHASE_ROWS).from_request()
+    return make_response(jsonify(rows.all(*date_range(rows.source.request_date))), 200)
 
 
 # # Service function to get 5 recent purchase requests
 def get_recent_purchase_requests():
-    recent_purchase_requests = PurchaseRequest.query.order_by(PurchaseRequest.request_id.desc()).limit(5).all()
-    recent_purchase_requests_list = [purchase_request.to_dict() for purchase_request in recent_purchase_requests]
-
-    return make_response(jsonify(recent_purchase_requests_list), 200)
+    return make_response(jsonify(RECENT_PURCHASE_ROWS.from_request().all(limit=5)), 200)
 
     
 # Delete an existing purchase request
@@ -118,16 +145,20 @@ def delete_purchase_request(request_id):
 
 # Service function to get top 10 products based on the number of approved purchase requests
 def get_top_10_products_by_approved_requests():
+    # Recent requests unless ?archive=include
+    purchase = PURCHASE_ARCHIVE.source(include_archive())
+    period = date_range(purchase.request_date)
+
     try:
         # Query to get the top 10 products with the highest number of approved purchase requests
         top_10_products = db.session.query(
-            PurchaseRequest.product_id,
+            purchase.product_id,
             Product.name,
-            func.count(PurchaseRequest.request_id).label('total_purchases')
-        ).join(Product, PurchaseRequest.product_id == Product.product_id)\
-        .filter(PurchaseRequest.status == PurchaseRequestStatusEnum.approved)\
-        .group_by(PurchaseRequest.product_id, Product.name)\
-        .order_by(func.count(PurchaseRequest.request_id).desc())\
+            func.count(purchase.request_id).label('total_purchases')
+        ).join(Product, purchase.product_id == Product.product_id)\
+        .filter(purchase.status == PurchaseRequestStatusEnum.approved, *period)\
+        .group_by(purchase.product_id, Product.name)\
+        .order_by(func.count(purchase.request_id).desc())\
         .limit(10).all()
 
         if not top_10_products:
@@ -2,34 +2,55 @@ from flask import request, jsonify, make_response
 from models.supplier import Supplier, SupplierStatus
 from extensions import db
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from utils.optimisticLock import retry_on_conflict, if_match_conflict
+from utils.projection import Projection
+from utils.cache import reference_cache, cached_json, invalidates
+
+# Read model for the supplier list
+SUPPLIER_ROWS = Projection('SupplierRow', Supplier, {
+    'supplier_id': Supplier.supplier_id,
+    'supplier_name': Supplier.supplier_name,
+    'address': Supplier.address,
+    'contact_number': Supplier.contact_number,
+    'status': Supplier.status,
+    'created_at': Supplier.created_at,
+    'updated_at': Supplier.updated_at,
+    'version': Supplier.version,
+}, order_by=Supplier.supplier_id.asc())
 
 # Service function to get all suppliers
 def get_suppliers():
-    # Query suppliers and order by supplier_id in ascending order
-    suppliers = Supplier.query.order_by(Supplier.supplier_id.asc()).all()
-    supplier_list = [supplier.to_dict() for supplier in suppliers] 
-    total_suppliers = len(suppliers)
+    rows = SUPPLIER_ROWS.from_request()
+    return cached_json(reference_cache, ('suppliers', rows.signature), lambda: _supplier_list(rows), tags=('suppliers',))
+
+
+def _supplier_list(rows):
+    # Suppliers ordered by supplier_id in ascending order
+    supplier_list = rows.all()
+    total_suppliers = len(supplier_list)
 
     # Include the total number of suppliers in the response
-    response = {
+    return {
         "total_suppliers": total_suppliers,
         "suppliers": supplier_list
     }
 
-    return make_response(jsonify(response), 200)
-
 
 # Service function to get a single supplier by ID
 def get_supplier_by_id(supplier_id):
     supplier = Supplier.query.get(supplier_id)
 
     if supplier:
-        return make_response(jsonify(supplier.to_dict()), 200)
+        response = make_response(jsonify(supplier.to_dict()), 200)
+        response.set_etag(str(supplier.version))
+        return response
 
     return make_response(jsonify({'message': 'Supplier not found'}), 404)
 
 
 # Service function to create a new supplier
+@invalidates('suppliers')
 def create_supplier(data):
     try:
         supplier_name = data.get('supplier_name')
@@ -80,12 +101,18 @@ def create_supplier(data):
 
 
 # Service function to update an existing supplier
+@invalidates('suppliers')
+@retry_on_conflict
 def update_supplier(supplier_id, data):
     try:
         supplier = Supplier.query.get(supplier_id)
         if not supplier:
             return make_response(jsonify({'error': 'Supplier not found'}), 404)
 
+        conflict = if_match_conflict(supplier)
+        if conflict:
+            return conflict
+
         supplier_name = data.get('supplier_name')
         address = data.get('address')
         contact_number = data.get('contact_number')
@@ -133,28 +160,43 @@ def update_supplier(supplier_id, data):
             'contact_number': supplier.contact_number,
             'status': supplier.status.value,
             'created_at': supplier.created_at,
-            'updated_at': supplier.updated_at
+            'updated_at': supplier.updated_at,
+            'version': supplier.version
         }
 
-        return make_response(jsonify({'message': 'Supplier updated successfully', 'supplier': supplier_response}), 200)
+        response = make_response(jsonify({'message': 'Supplier updated successfully', 'supplier': supplier_response}), 200)
+        response.set_etag(str(supplier.version))
+        return response
+
+    except StaleDataError:
+        raise
 
     except Exception as e:
         db.session.rollback()
         return make_response(jsonify({'error': str(e)}), 500)
 
 # Delete an existing supplier
+@invalidates('suppliers')
+@retry_on_conflict
 def delete_supplier(supplier_id):
     try:
         supplier = Supplier.query.get(supplier_id)
         
         if not supplier:
             return jsonify({'error': 'Supplier not found'}), 404
+
+        conflict = if_match_conflict(supplier)
+        if conflict:
+            return conflict
         
         db.session.delete(supplier)
         db.session.commit()
 
         return jsonify({'message': 'Supplier deleted successfully'}), 200
 
+    except StaleDataError:
+        raise
+
     except IntegrityError as e:
         db.session.rollback()
 
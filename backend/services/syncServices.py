@@ -0,0 +1,32 @@
+from flask import jsonify, make_response
+from models.purchase import PurchaseRequest
+from utils.deltaSync import CursorError, DeltaFeed
+from services.productsServices import PRODUCT_ROWS
+from services.supplierServices import SUPPLIER_ROWS
+from services.productsupplierServices import PRODUCT_SUPPLIER_ROWS
+from services.inventoryServices import INVENTORY_ROWS
+from services.maintenanceServices import MAINTENANCE_ROWS
+from services.departmentServices import DEPARTMENT_ROWS
+
+# Tables a client can mirror with ?since=; each feed serves the same rows as the table's list endpoint
+SYNC_FEEDS = {
+    'products': DeltaFeed(PRODUCT_ROWS.source, PRODUCT_ROWS),
+    'suppliers': DeltaFeed(SUPPLIER_ROWS.source, SUPPLIER_ROWS),
+    'product-suppliers': DeltaFeed(PRODUCT_SUPPLIER_ROWS.source, PRODUCT_SUPPLIER_ROWS),
+    'inventory': DeltaFeed(INVENTORY_ROWS.source, INVENTORY_ROWS),
+    'maintenance': DeltaFeed(MAINTENANCE_ROWS.source, MAINTENANCE_ROWS),
+    'departments': DeltaFeed(DEPARTMENT_ROWS.source, DEPARTMENT_ROWS),
+    # Purchase requests have no updated_at; only their deletes are followed
+    'purchase-requests': DeltaFeed(PurchaseRequest),
+}
+
+# Rows changed and deleted since the client's cursor
+def get_changes(resource):
+    feed = SYNC_FEEDS.get(resource)
+    if feed is None:
+        return make_response(jsonify({'error': f'Unknown resource: {resource}', 'resources': sorted(SYNC_FEEDS)}), 404)
+
+    try:
+        return make_response(jsonify(feed.from_request()), 200)
+    except CursorError as e:
+        return make_response(jsonify({'error': str(e)}), e.status)
@@ -0,0 +1,151 @@
+"""
+Email outbox tests
+Runs EmailOutboxWorker.process_batch against an aiosmtpd server on localhost:
+a queued email is delivered once its transaction commits, an unreachable
+server reschedules it with exponential backoff, and EMAIL_OUTBOX_MAX_ATTEMPTS
+failed attempts mark it failed.
+
+Run from backend/: python -m pytest tests
+"""
+
+import os
+import socket
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+from aiosmtpd.controller import Controller
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+SMTP_PORT = _free_port()
+MAX_ATTEMPTS = 3
+
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'email_outbox.db')
+os.environ['SESSION_FILE_DIR'] = tempfile.mkdtemp()
+os.environ['MAIL_SERVER'] = '127.0.0.1'
+os.environ['MAIL_PORT'] = str(SMTP_PORT)
+os.environ['MAIL_USE_TLS'] = 'False'
+os.environ['MAIL_USE_SSL'] = 'False'
+os.environ['MAIL_USERNAME'] = ''
+os.environ['MAIL_PASSWORD'] = ''
+os.environ['MAIL_DEFAULT_SENDER'] = 'noreply@localhost.test'
+os.environ['EMAIL_OUTBOX_MAX_ATTEMPTS'] = str(MAX_ATTEMPTS)
+os.environ['EMAIL_OUTBOX_WORKER'] = 'False'
+os.environ['SCHEDULER_ENABLED'] = 'False'
+os.environ['BCRYPT_POOL_WORKERS'] = '0'
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from app import create_app
+from config.email_config import queue_email
+from extensions import db
+from models.emailoutbox import EmailOutbox, OutboxStatus
+from utils.emailOutbox import outbox_worker
+
+app = create_app('development')
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return '250 OK'
+
+
+@pytest.fixture(autouse=True)
+def worker():
+    with app.app_context():
+        db.create_all()
+        db.session.query(EmailOutbox).delete()
+        db.session.commit()
+        # Other test modules may have bound the shared worker to their app
+        outbox_worker.init_app(app)
+        yield outbox_worker
+        db.session.rollback()
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname='127.0.0.1', port=SMTP_PORT)
+    controller.start()
+    yield handler
+    controller.stop()
+
+
+def queued(recipient='admin@localhost.test'):
+    queue_email(recipient, 'Outbox test', '<p>Hello</p>')
+    db.session.commit()
+    return db.session.query(EmailOutbox).filter_by(recipient=recipient).one()
+
+
+def make_due(row):
+    row.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+
+def test_queued_email_is_delivered(worker, smtp_server):
+    row = queued()
+
+    assert worker.process_batch() == 1
+
+    db.session.refresh(row)
+    assert row.status == OutboxStatus.sent
+    assert row.attempts == 1
+    assert row.sent_at is not None
+    assert [message.rcpt_tos for message in smtp_server.messages] == [['admin@localhost.test']]
+    assert 'Outbox test' in smtp_server.messages[0].content.decode()
+
+
+def test_email_is_only_stored_with_the_callers_commit(worker):
+    queue_email('admin@localhost.test', 'Outbox test', '<p>Hello</p>')
+    db.session.rollback()
+
+    assert db.session.query(EmailOutbox).count() == 0
+
+
+def test_unreachable_server_reschedules_with_backoff(worker):
+    row = queued()
+
+    before = datetime.utcnow()
+    assert worker.process_batch() == 1
+    db.session.refresh(row)
+    assert row.status == OutboxStatus.pending
+    assert row.attempts == 1
+    assert row.last_error
+    first_delay = row.next_attempt_at - before
+    assert timedelta(seconds=worker.backoff_seconds - 1) <= first_delay <= timedelta(seconds=worker.backoff_seconds + 1)
+
+    # Not due yet: the next batch leaves it alone
+    assert worker.process_batch() == 0
+
+    make_due(row)
+    before = datetime.utcnow()
+    assert worker.process_batch() == 1
+    db.session.refresh(row)
+    assert row.attempts == 2
+    assert row.next_attempt_at - before >= 2 * first_delay - timedelta(seconds=2)
+
+
+def test_max_attempts_marks_email_failed(worker):
+    row = queued()
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        make_due(row)
+        assert worker.process_batch() == 1
+        db.session.refresh(row)
+        assert row.attempts == attempt
+    assert row.status == OutboxStatus.failed
+
+    make_due(row)
+    assert worker.process_batch() == 0
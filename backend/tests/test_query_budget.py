@@ -0,0 +1,83 @@
+"""
+Query budget tests
+Calls every parameterless GET endpoint under /api against a seeded throwaway
+SQLite database and fails when one runs more statements than its budget
+(QUERY_BUDGET, or @query_budget on the view) or repeats a lazy load
+N_PLUS_ONE_THRESHOLD times (the N+1 detector runs in raise mode).
+
+Run from backend/: python -m pytest tests
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'query_budget.db')
+os.environ['SESSION_FILE_DIR'] = tempfile.mkdtemp()
+os.environ['N_PLUS_ONE_DETECT'] = 'True'
+os.environ['N_PLUS_ONE_MODE'] = 'raise'
+os.environ['QUERY_BUDGET'] = '20'
+os.environ['EMAIL_OUTBOX_WORKER'] = 'False'
+os.environ['SCHEDULER_ENABLED'] = 'False'
+os.environ['BCRYPT_POOL_WORKERS'] = '0'
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from sqlalchemy import event
+from app import create_app
+from extensions import db
+from models.users import User
+from benchmarks.seed_data import BENCH_ADMIN_EMAIL, seed
+
+# Enough related rows per list that an N+1 shows up as repeated lazy loads
+ROWS = 25
+
+app = create_app('development')
+app.config['TESTING'] = True
+
+ENDPOINTS = sorted(
+    (rule.rule, rule.endpoint) for rule in app.url_map.iter_rules()
+    if rule.rule.startswith('/api/') and 'GET' in rule.methods and not rule.arguments
+)
+
+
+@pytest.fixture(scope='module')
+def client():
+    with app.app_context():
+        db.create_all()
+        seed(dict(departments=3, suppliers=5, products=ROWS, purchases=ROWS * 2,
+                  maintenance=ROWS, department_requests=ROWS))
+        admin_id = User.query.filter_by(email=BENCH_ADMIN_EMAIL).first().get_id()
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = admin_id
+        session['_fresh'] = True
+    return client
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+@pytest.mark.parametrize('path, endpoint', ENDPOINTS, ids=[path for path, _ in ENDPOINTS])
+def test_endpoint_within_query_budget(client, statements, path, endpoint):
+    budget = getattr(app.view_functions[endpoint], 'query_budget', app.config['QUERY_BUDGET'])
+
+    response = client.get(path)
+
+    assert response.status_code == 200, response.get_data(as_text=True)[:200]
+    assert len(statements) <= budget, f"{path} ran {len(statements)} queries (budget {budget})"
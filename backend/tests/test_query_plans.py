@@ -0,0 +1,187 @@
+"""
+Query plan tests
+Runs EXPLAIN on the lookup queries the services issue (and the lazy loads
+behind the model backrefs) and fails any that reads its table with a
+sequential scan instead of an index, so a dropped or missing index fails the
+test run before it shows up as a slow page.
+
+On Postgres the plans are taken with enable_seqscan off: the planner still
+falls back to a Seq Scan when no usable index exists, so the result does not
+depend on the table sizes or statistics of the database being checked. On
+SQLite, EXPLAIN QUERY PLAN reports a full scan as "SCAN <table>".
+
+Uses a throwaway SQLite database built from the models, or
+QUERY_PLANS_DATABASE_URL (run `flask db upgrade` on it first to check the
+migrations; it is seeded when it has no products).
+
+Run from backend/: python -m pytest tests
+"""
+
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ['DATABASE_URL'] = (os.getenv('QUERY_PLANS_DATABASE_URL')
+                              or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'query_plans.db'))
+os.environ['SESSION_FILE_DIR'] = tempfile.mkdtemp()
+os.environ['EMAIL_OUTBOX_WORKER'] = 'False'
+os.environ['SCHEDULER_ENABLED'] = 'False'
+os.environ['BCRYPT_POOL_WORKERS'] = '0'
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from sqlalchemy import func, select, tuple_
+from app import create_app
+from extensions import db
+from models.products import Product
+from models.inventory import Inventory
+from models.purchase import PurchaseRequest, PurchaseRequestStatusEnum
+from models.evaluate import Evaluation
+from models.damage import DamagedItem
+from models.departmentrequest import DepartmentRequest
+from models.maintenance import Maintenance
+from models.productsupplier import ProductSupplier
+from models.tombstone import Tombstone
+from services.syncServices import SYNC_FEEDS
+from services.purchaseServices import PURCHASE_ARCHIVE
+from services.evaluateServices import EVALUATION_ARCHIVE
+from services.damageServices import DAMAGE_ARCHIVE
+from services.departmentrequestServices import DEPARTMENT_REQUEST_ARCHIVE
+from benchmarks.seed_data import seed
+
+# Rows per seeded table
+ROWS = 200
+
+app = create_app('development')
+
+
+def lookup_checks():
+    """(label, table that must be read through an index, statement for the sample ids)"""
+    return [
+        ('inventory row of a product (damage, department request, evaluate services)', 'inventory',
+         lambda ids: select(Inventory).filter_by(product_id=ids['product_id']).limit(1)),
+        ('damaged items of an evaluation (evaluateServices)', 'damaged_items',
+         lambda ids: select(DamagedItem).filter_by(evaluation_id=ids['evaluation_id'])),
+        ('department requests of a department (departmentServices.delete_department)', 'department_requests',
+         lambda ids: select(func.count()).select_from(DepartmentRequest)
+         .filter_by(department_id=ids['department_id'])),
+        ('supplier price of a product (productsupplierServices)', 'product_suppliers',
+         lambda ids: select(ProductSupplier)
+         .filter_by(product_id=ids['product_id'], supplier_id=ids['supplier_id']).limit(1)),
+        ('Product.purchase_requests', 'purchase_requests',
+         lambda ids: select(PurchaseRequest).where(PurchaseRequest.product_id == ids['product_id'])),
+        ('Supplier.purchase_requests', 'purchase_requests',
+         lambda ids: select(PurchaseRequest).where(PurchaseRequest.supplier_id == ids['supplier_id'])),
+        ('pending purchase requests', 'purchase_requests',
+         lambda ids: select(PurchaseRequest).where(PurchaseRequest.status == PurchaseRequestStatusEnum.pending)),
+        ('PurchaseRequest.evaluations', 'evaluation',
+         lambda ids: select(Evaluation).where(Evaluation.request_id == ids['request_id'])),
+        ('Product.damaged_items', 'damaged_items',
+         lambda ids: select(DamagedItem).where(DamagedItem.product_id == ids['product_id'])),
+        ('Product.department_requests', 'department_requests',
+         lambda ids: select(DepartmentRequest).where(DepartmentRequest.product_id == ids['product_id'])),
+        ('Product.maintenance', 'maintenance',
+         lambda ids: select(Maintenance).where(Maintenance.product_id == ids['product_id'])),
+    ]
+
+
+def sync_checks():
+    """A page of each /api/sync feed after a cursor, and of its tombstones"""
+    position = (datetime(2025, 1, 1), 0)
+    for name, feed in SYNC_FEEDS.items():
+        if feed.rows is not None:
+            statement = feed.rows.query(tuple_(feed.updated_at, feed.key) > position,
+                                        limit=500, order_by=(feed.updated_at, feed.key))
+            yield f'changes page of /api/sync/{name}', feed.table_name, lambda ids, statement=statement: statement
+        statement = (select(Tombstone)
+                     .where(Tombstone.table_name == feed.table_name,
+                            tuple_(Tombstone.deleted_at, Tombstone.tombstone_id) > position)
+                     .order_by(Tombstone.deleted_at, Tombstone.tombstone_id).limit(500))
+        yield f'tombstones page of /api/sync/{name}', 'sync_tombstones', lambda ids, statement=statement: statement
+
+
+def archive_checks():
+    """A ?from=&to= month of each history list, recent and with ?archive=include
+    (both halves of the union), and the archive job's batch lookups"""
+    start, end = datetime(2024, 1, 1), datetime(2024, 2, 1)
+    for archived in (PURCHASE_ARCHIVE, EVALUATION_ARCHIVE, DAMAGE_ARCHIVE, DEPARTMENT_REQUEST_ARCHIVE):
+        name, date = archived.table.name, archived.date_column
+        column = getattr(archived.model, date)
+        statement = select(archived.model).where(column >= start, column < end)
+        yield f'a month of {name}', name, lambda ids, statement=statement: statement
+        column = getattr(archived.everything, date)
+        statement = select(archived.everything).where(column >= start, column < end)
+        for table in (name, archived.archive.__tablename__):
+            yield f'a month of {name} with the archive', table, lambda ids, statement=statement: statement
+        if archived.parent is None:
+            statement = (select(archived.key).where(archived.table.c[date] < start)
+                         .order_by(archived.table.c[date], archived.key).limit(1000))
+            yield f'archive job batch of {name}', name, lambda ids, statement=statement: statement
+        else:
+            _, foreign_key = archived.parent
+            statement = select(archived.key).where(archived.table.c[foreign_key].in_([1, 2, 3]))
+            yield f'archive job children in {name}', name, lambda ids, statement=statement: statement
+
+
+CHECKS = [*lookup_checks(), *sync_checks(), *archive_checks()]
+
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from _plan_nodes(child)
+
+
+def seq_scans(connection, sql):
+    """Tables the statement reads with a full scan"""
+    if connection.dialect.name == 'postgresql':
+        plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return {node['Relation Name'] for node in _plan_nodes(plan[0]['Plan']) if node['Node Type'] == 'Seq Scan'}
+
+    scans = set()
+    for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"):
+        words = row[-1].split()
+        if words[0] == 'SCAN' and 'INDEX' not in words:
+            scans.add(words[1])
+    return scans
+
+
+@pytest.fixture(scope='module')
+def sample_ids():
+    """Ids that exist, so each lookup has something to find"""
+    with app.app_context():
+        db.create_all()
+        if not Product.query.count():
+            seed(dict(departments=5, suppliers=10, products=ROWS, purchases=ROWS * 2,
+                      maintenance=ROWS, department_requests=ROWS))
+        return dict(
+            product_id=db.session.scalar(select(func.min(Inventory.product_id))),
+            supplier_id=db.session.scalar(select(func.min(ProductSupplier.supplier_id))),
+            department_id=db.session.scalar(select(func.min(DepartmentRequest.department_id))),
+            request_id=db.session.scalar(select(func.min(Evaluation.request_id))),
+            evaluation_id=db.session.scalar(select(func.min(DamagedItem.evaluation_id))),
+        )
+
+
+@pytest.fixture(scope='module')
+def connection(sample_ids):
+    with app.app_context(), db.engine.connect() as connection:
+        if connection.dialect.name == 'postgresql':
+            connection.exec_driver_sql("ANALYZE")
+            connection.exec_driver_sql("SET enable_seqscan = off")
+        yield connection
+
+
+@pytest.mark.parametrize('label, table, statement', CHECKS,
+                         ids=[f'{label} [{table}]' for label, table, _ in CHECKS])
+def test_query_reads_table_through_an_index(connection, sample_ids, label, table, statement):
+    sql = str(statement(sample_ids).compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+
+    assert table not in seq_scans(connection, sql), f"{label}: sequential scan on {table}"
@@ -0,0 +1,162 @@
+import os
+from datetime import datetime
+from functools import cached_property
+import pytz
+from flask import abort, current_app, jsonify, make_response, request
+from sqlalchemy import DateTime, delete, func, insert, literal, select, union_all
+from sqlalchemy.orm import aliased
+from extensions import db
+
+MANILA_TZ = pytz.timezone("Asia/Manila")
+
+
+class ArchivedTable:
+    """A history table whose old rows the archive job moves to an archive copy.
+
+    ``archive`` is a model with the same columns plus archived_at; rows keep
+    their ids, so a request, evaluation or damaged item is the same record
+    before and after it moves. ``parent`` is the (ArchivedTable, foreign key
+    column) a child table hangs off: its rows only ever move together with
+    their parent's.
+
+    List and report queries read ``model`` (the recent, hot rows) by default,
+    or ``everything`` for the archive-inclusive audit view.
+    """
+
+    def __init__(self, model, archive, date_column, parent=None):
+        self.model = model
+        self.archive = archive
+        self.date_column = date_column
+        self.parent = parent
+        self.table = model.__table__
+        self.key = next(iter(self.table.primary_key.columns))
+        self.columns = [column.name for column in self.table.columns]
+
+    @cached_property
+    def everything(self):
+        """The model aliased to its hot and archived rows together (UNION ALL);
+        criteria on it are pushed down into both halves"""
+        archive = self.archive.__table__
+        rows = union_all(select(self.table), select(*[archive.c[name] for name in self.columns]))
+        return aliased(self.model, rows.subquery(f'{self.table.name}_all'), adapt_on_names=True)
+
+    def source(self, include_archive):
+        return self.everything if include_archive else self.model
+
+    def move(self, ids, archived_at):
+        """Copy the rows with these ids to the archive; the caller deletes them"""
+        archive = self.archive.__table__
+        db.session.execute(insert(archive).from_select(
+            [*self.columns, 'archived_at'],
+            select(*self.table.c, literal(archived_at, DateTime())).where(self.key.in_(ids))
+        ))
+
+    def newest_root_id(self):
+        """Id of the root row that this table's newest row belongs to"""
+        key = select(func.max(self.key)).scalar_subquery()
+        table = self
+        while table.parent:
+            parent, column = table.parent
+            key = select(table.table.c[column]).where(table.key == key).scalar_subquery()
+            table = parent
+        return db.session.scalar(select(key))
+
+    def child_ids(self, parent_ids):
+        _, column = self.parent
+        return db.session.scalars(select(self.key).where(self.table.c[column].in_(parent_ids))).all()
+
+
+def include_archive():
+    """Whether this request asked for archived rows too: ?archive=include"""
+    value = request.args.get('archive', 'exclude')
+    if value not in ('include', 'exclude'):
+        abort(make_response(jsonify({'error': "archive must be 'include' or 'exclude'"}), 400))
+    return value == 'include'
+
+
+def _parse_date(name):
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        value = datetime.fromisoformat(raw)
+    except ValueError:
+        abort(make_response(jsonify({'error': f'{name} must be an ISO date, e.g. 2025-01-31'}), 400))
+    # Dates are stored as naive Manila time
+    return value.astimezone(MANILA_TZ).replace(tzinfo=None) if value.tzinfo else value
+
+
+def date_range(column):
+    """WHERE criteria for this request's ?from= (inclusive) and ?to= (exclusive) on column"""
+    start, end = _parse_date('from'), _parse_date('to')
+    criteria = []
+    if start is not None:
+        criteria.append(column >= start)
+    if end is not None:
+        criteria.append(column < end)
+    return criteria
+
+
+def archive_cutoff(now=None, months=None):
+    """Start of the oldest calendar month kept hot, as naive Manila time.
+
+    ``now`` is naive UTC, as the scheduler passes it; rows dated before the
+    cutoff are archived once they are closed.
+    """
+    months = current_app.config['ARCHIVE_AFTER_MONTHS'] if months is None else months
+    local = pytz.utc.localize(now or datetime.utcnow()).astimezone(MANILA_TZ)
+    month = local.year * 12 + local.month - 1 - months
+    return datetime(month // 12, month % 12 + 1, 1)
+
+
+def move_to_archive(tables, cutoff, *criteria, batch_size=None):
+    """Move rows of the first table dated before cutoff and matching criteria,
+    with their rows in the child tables, to the archive tables.
+
+    Moves batch_size root rows per transaction, oldest first, so locks
+    stay short and an interrupted run keeps what it finished. A batch that
+    fails, e.g. on a child row written after its ids were read, rolls back
+    whole and is picked up by the next run. The newest row of every table
+    stays hot, together with the root row it belongs to: SQLite hands out
+    max(id) + 1 as the next id, which must never be one the archive already
+    holds. Returns the rows moved per table.
+    """
+    root = tables[0]
+    batch_size = batch_size or current_app.config['ARCHIVE_BATCH_SIZE']
+    moved = {table.table.name: 0 for table in tables}
+    while True:
+        newest = {table.newest_root_id() for table in tables} - {None}
+        date = root.table.c[root.date_column]
+        ids = {root: db.session.scalars(
+            select(root.key)
+            .where(date < cutoff, root.key.not_in(newest), *criteria)
+            .order_by(date, root.key)
+            .limit(batch_size)
+        ).all()}
+        if not ids[root]:
+            break
+        for table in tables[1:]:
+            ids[table] = table.child_ids(ids[table.parent[0]])
+
+        archived_at = datetime.now(MANILA_TZ).replace(tzinfo=None)
+        for table in tables:
+            if ids[table]:
+                table.move(ids[table], archived_at)
+        for table in reversed(tables):
+            if ids[table]:
+                db.session.execute(delete(table.table).where(table.key.in_(ids[table])))
+        db.session.commit()
+        for table in tables:
+            moved[table.table.name] += len(ids[table])
+    return moved
+
+
+def init_history_archive(app):
+    """Archive settings.
+
+    ARCHIVE_AFTER_MONTHS is how many whole months of history stay in the hot
+    tables (0 keeps everything there); ARCHIVE_BATCH_SIZE is how many rows
+    move per transaction.
+    """
+    app.config.setdefault('ARCHIVE_AFTER_MONTHS', int(os.getenv('ARCHIVE_AFTER_MONTHS', '12')))
+    app.config.setdefault('ARCHIVE_BATCH_SIZE', int(os.getenv('ARCHIVE_BATCH_SIZE', '1000')))
@@ -0,0 +1,202 @@
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.exceptions import HTTPException
+from extensions import db
+from utils.asyncDb import async_db
+from utils.dbPool import ANALYTICS_BIND
+from utils.logger import get_logger
+
+log = get_logger('asgi')
+
+# Read-heavy blueprints served on the event loop by default
+ASYNC_BLUEPRINTS = 'inventory,purchase,evaluate,damages,maintenance,departmentrequest'
+
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI http scope"""
+    script_name = scope.get('root_path', '').encode('utf8').decode('latin1')
+    path_info = scope['path'].encode('utf8').decode('latin1')
+    if script_name and path_info.startswith(script_name):
+        path_info = path_info[len(script_name):]
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': script_name,
+        'PATH_INFO': path_info,
+        'QUERY_STRING': scope['query_string'].decode('latin1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin1').upper().replace('-', '_')
+        key = name if name in ('CONTENT_TYPE', 'CONTENT_LENGTH') else f'HTTP_{name}'
+        value = value.decode('latin1')
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+class AsgiApp:
+    """ASGI entry point for the Flask app (see asgi.py).
+
+    GET/HEAD requests to the blueprints in ASGI_ASYNC_BLUEPRINTS run on the
+    event loop: the request goes through Flask as usual (hooks, view,
+    after_request), but db.session is the sync side of an AsyncSession, so
+    every query the services make is awaited on the asyncpg pools instead of
+    holding a thread. A slow report query then only holds its own request.
+    Everything else, including writes and the static frontend, runs on the
+    WSGI app in a pool of ASGI_THREADS threads, as under gunicorn.
+
+    At most ASGI_ASYNC_CONCURRENCY async requests (default: the async pool's
+    size plus overflow) run at once, and views on the analytics pool are
+    limited to that pool's size; the rest wait their turn here rather than in
+    the connection pool, where they would time out.
+
+    Work that does not go through db.session still blocks the loop while it
+    runs (session files, the replica lag probe), so keep the async set to
+    read endpoints. Without an async driver for the database (SQLite) every
+    request takes the thread pool.
+    """
+
+    def __init__(self, app):
+        app.config.setdefault('ASGI_ASYNC_BLUEPRINTS', os.getenv('ASGI_ASYNC_BLUEPRINTS', ASYNC_BLUEPRINTS))
+        app.config.setdefault('ASGI_THREADS', int(os.getenv('ASGI_THREADS', '8')))
+        self.app = app
+        async_db.init_app(app)
+        app.config.setdefault('ASGI_ASYNC_CONCURRENCY', int(os.getenv(
+            'ASGI_ASYNC_CONCURRENCY', str(app.config['ASYNC_DB_POOL_SIZE'] + app.config['ASYNC_DB_MAX_OVERFLOW']))))
+        self._slots = {
+            None: asyncio.Semaphore(app.config['ASGI_ASYNC_CONCURRENCY']),
+            ANALYTICS_BIND: asyncio.Semaphore(
+                max(1, app.config['DB_ANALYTICS_POOL_SIZE'] + app.config['DB_ANALYTICS_MAX_OVERFLOW'])),
+        }
+        self.async_blueprints = frozenset(
+            name.strip() for name in app.config['ASGI_ASYNC_BLUEPRINTS'].split(',') if name.strip()
+        ) if async_db.available else frozenset()
+        if not async_db.available:
+            log.warning("No async driver for the database; serving every request from threads")
+        self._urls = app.url_map.bind('localhost')
+        self._threads = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        environ = build_environ(scope, bytes(body))
+        try:
+            view = self.async_view(environ)
+            if view is not None:
+                status, headers, chunks = await self._run_async(environ, getattr(view, 'db_pool', None))
+            else:
+                status, headers, chunks = await asyncio.get_running_loop().run_in_executor(
+                    self._executor(), self._run_wsgi, environ)
+        except Exception:
+            log.exception("Unhandled error serving request", extra={'path': environ['PATH_INFO']})
+            status, headers, chunks = 500, [('Content-Type', 'text/plain')], [b'Internal Server Error']
+
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(name.lower().encode('latin1'), value.encode('latin1')) for name, value in headers]})
+        await send({'type': 'http.response.body', 'body': b''.join(chunks)})
+
+    def async_view(self, environ):
+        """The view for a read on one of the async blueprints, or None"""
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD') or not self.async_blueprints:
+            return None
+        try:
+            endpoint, _ = self._urls.match(environ['PATH_INFO'], method=environ['REQUEST_METHOD'])
+        except HTTPException:
+            return None
+        if endpoint.rpartition('.')[0] not in self.async_blueprints:
+            return None
+        return self.app.view_functions[endpoint]
+
+    async def _run_async(self, environ, pool):
+        async with self._slots.get(pool, self._slots[None]):
+            session = async_db.session()
+            try:
+                return await session.run_sync(self._dispatch, environ)
+            finally:
+                await session.close()
+
+    def _dispatch(self, session, environ):
+        """Flask's wsgi_app, with db.session bound to the async session's sync side"""
+        app = self.app
+        ctx = app.request_context(environ)
+        error = None
+        try:
+            try:
+                ctx.push()
+                db.session.registry.set(session)
+                response = app.full_dispatch_request()
+            except Exception as e:
+                error = e
+                response = app.handle_exception(e)
+            return self._collect(response, environ)
+        finally:
+            if error is not None and app.should_ignore_error(error):
+                error = None
+            ctx.pop(error)
+
+    def _run_wsgi(self, environ):
+        return self._collect(self.app, environ)
+
+    @staticmethod
+    def _collect(wsgi_app, environ):
+        """Call a WSGI app (or response); returns (status, headers, body chunks)"""
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'], started['headers'] = int(status.split(' ', 1)[0]), headers
+
+        iterable = wsgi_app(environ, start_response)
+        try:
+            chunks = list(iterable)
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+        return started['status'], started['headers'], chunks
+
+    def _executor(self):
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.app.config['ASGI_THREADS'],
+                                               thread_name_prefix='wsgi')
+        return self._threads
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Each server process runs its own outbox sender and scheduler
+                from app import start_background_workers
+                start_background_workers(self.app)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                from app import stop_background_workers
+                await asyncio.get_running_loop().run_in_executor(None, stop_background_workers)
+                await async_db.dispose()
+                if self._threads is not None:
+                    self._threads.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
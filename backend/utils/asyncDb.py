@@ -0,0 +1,113 @@
+import os
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from extensions import db
+from utils.dbPool import ANALYTICS_BIND, REPLICA_BIND, routed_pool
+from utils.logger import get_logger
+
+log = get_logger('db')
+
+# Async drivers for the databases that have one installed
+ASYNC_DRIVERS = {'postgresql': 'postgresql+asyncpg'}
+
+
+def async_url(url):
+    """The URL with its async driver, or None when the database has no async driver"""
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    return url.set(drivername=driver) if driver else None
+
+
+def _async_engine_options(url, pool_size, max_overflow, statement_timeout_ms, config):
+    """Engine kwargs for one async pool, the asyncpg counterpart of dbPool._engine_options"""
+    connect_args = {}
+    # asyncpg takes ssl= rather than libpq's sslmode
+    sslmode = url.query.get('sslmode')
+    if sslmode:
+        url = url.difference_update_query(['sslmode'])
+        connect_args['ssl'] = sslmode
+    if statement_timeout_ms:
+        connect_args['server_settings'] = {'statement_timeout': str(statement_timeout_ms)}
+    return url, dict(pool_size=pool_size, max_overflow=max_overflow, pool_timeout=config['DB_POOL_TIMEOUT'],
+                     pool_recycle=config['DB_POOL_RECYCLE'], pool_pre_ping=config['DB_POOL_PRE_PING'],
+                     connect_args=connect_args)
+
+
+class AsyncRoutingSession(Session):
+    """The sync side of an AsyncSession, routed like dbPool.RoutingSession.
+
+    Code written against db.session runs unchanged on it inside
+    AsyncSession.run_sync(): every query is awaited on the async engine
+    through SQLAlchemy's greenlet bridge instead of blocking the thread.
+    """
+
+    def __init__(self, async_engines=None, **kwargs):
+        super().__init__(**kwargs)
+        self._async_engines = async_engines or {}
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        pool = routed_pool(self, clause) if bind is None else None
+        if pool in self._async_engines:
+            return self._async_engines[pool].sync_engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class AsyncDatabase:
+    """asyncpg engines mirroring the app's primary, replica and analytics pools.
+
+    Engines are created on first use, inside the worker's event loop, and
+    sized by ASYNC_DB_POOL_SIZE/ASYNC_DB_MAX_OVERFLOW: one ASGI worker serves
+    many requests at once, so it needs more connections than a sync worker.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.engines = None
+
+    def init_app(self, app):
+        app.config.setdefault('ASYNC_DB_POOL_SIZE', int(os.getenv('ASYNC_DB_POOL_SIZE', '20')))
+        app.config.setdefault('ASYNC_DB_MAX_OVERFLOW', int(os.getenv('ASYNC_DB_MAX_OVERFLOW', '10')))
+        self.app = app
+        self.engines = None
+
+    @property
+    def available(self):
+        return async_url(self.app.config['SQLALCHEMY_DATABASE_URI']) is not None
+
+    def _create_engines(self):
+        config = self.app.config
+        pools = {
+            None: (config['SQLALCHEMY_DATABASE_URI'], config['ASYNC_DB_POOL_SIZE'],
+                   config['ASYNC_DB_MAX_OVERFLOW'], config['DB_STATEMENT_TIMEOUT_MS']),
+            REPLICA_BIND: (config['DB_REPLICA_URL'], config['ASYNC_DB_POOL_SIZE'],
+                           config['ASYNC_DB_MAX_OVERFLOW'], config['DB_STATEMENT_TIMEOUT_MS']),
+            ANALYTICS_BIND: (config['DB_ANALYTICS_URL'], config['DB_ANALYTICS_POOL_SIZE'],
+                             config['DB_ANALYTICS_MAX_OVERFLOW'], config['DB_ANALYTICS_STATEMENT_TIMEOUT_MS']),
+        }
+        # Only the pools the sync app has too, so routing stays the same
+        with self.app.app_context():
+            configured = set(db.engines)
+
+        engines = {}
+        for name, (url, pool_size, max_overflow, timeout_ms) in pools.items():
+            url = async_url(url) if name in configured else None
+            if url is not None:
+                url, options = _async_engine_options(url, pool_size, max_overflow, timeout_ms, config)
+                engines[name] = create_async_engine(url, **options)
+        return engines
+
+    def session(self):
+        """A new AsyncSession whose sync side routes like the app's db.session"""
+        if self.engines is None:
+            self.engines = self._create_engines()
+        return AsyncSession(bind=self.engines[None], sync_session_class=AsyncRoutingSession,
+                            async_engines=self.engines)
+
+    async def dispose(self):
+        engines, self.engines = self.engines or {}, None
+        for engine in engines.values():
+            await engine.dispose()
+
+
+async_db = AsyncDatabase()
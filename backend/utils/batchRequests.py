@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+import msgspec
+from flask import g, request, session
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+from extensions import db
+from utils.logger import get_logger
+
+log = get_logger('batch')
+
+# Request headers a batched read inherits from the batch request itself
+FORWARDED_HEADERS = ('Accept', 'Accept-Language', 'Authorization', 'Cookie', 'User-Agent', 'X-Read-From')
+
+
+class BatchError(ValueError):
+    """The batch payload itself is invalid (reported as a 400)"""
+
+
+class BatchExecutor:
+    """Runs the GET requests of one POST /api/batch inside that request.
+
+    Each item is routed and goes through the before_request hooks and its view
+    like a normal request, but reuses the batch request's session and logged in
+    user instead of loading them again, and runs on the batch's database
+    session, so one pooled connection serves every item in turn. The hooks keep
+    per-request state on g, which is saved and restored around each item.
+    After-request hooks (compression, CORS, metrics) run once, on the combined
+    response.
+
+    With BATCH_CONCURRENCY above 1 the items run in parallel instead, each in
+    its own app context and therefore on its own pooled connection. Items still
+    running at BATCH_TIMEOUT are reported with status 504, as are items not
+    started by then.
+    """
+
+    def __init__(self):
+        self.max_items = 20
+        self.timeout = 10.0
+        self.concurrency = 1
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def init_app(self, app):
+        app.config.setdefault('BATCH_MAX_ITEMS', int(os.getenv('BATCH_MAX_ITEMS', '20')))
+        app.config.setdefault('BATCH_TIMEOUT', float(os.getenv('BATCH_TIMEOUT', '10')))
+        app.config.setdefault('BATCH_CONCURRENCY', int(os.getenv('BATCH_CONCURRENCY', '1')))
+        self.max_items = app.config['BATCH_MAX_ITEMS']
+        self.timeout = app.config['BATCH_TIMEOUT']
+        self.concurrency = max(1, app.config['BATCH_CONCURRENCY'])
+
+    def parse(self, payload):
+        """[(id, path)] from ``{"requests": ["/api/...", {"id": ..., "path": ...}, ...]}``"""
+        requests = payload.get('requests') if isinstance(payload, dict) else None
+        if not isinstance(requests, list) or not requests:
+            raise BatchError('Expected {"requests": [...]} with at least one request')
+        if len(requests) > self.max_items:
+            raise BatchError(f'A batch may contain at most {self.max_items} requests')
+
+        items = []
+        for index, entry in enumerate(requests):
+            if isinstance(entry, str):
+                entry = {'path': entry}
+            if not isinstance(entry, dict) or not isinstance(entry.get('path'), str):
+                raise BatchError(f'Request {index} needs a "path"')
+            path = entry['path']
+            if entry.get('method', 'GET').upper() != 'GET':
+                raise BatchError(f'Request {index}: only GET requests can be batched')
+            if not path.startswith('/api/') or path.split('?', 1)[0].rstrip('/') == '/api/batch':
+                raise BatchError(f'Request {index}: path must be an /api/ endpoint other than /api/batch')
+            items.append((entry.get('id', index), path))
+        return items
+
+    def run(self, app, items):
+        """Execute the parsed items; returns one result dict per item, in order"""
+        deadline = time.monotonic() + self.timeout
+        headers = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+        base = dict(base_url=request.host_url, headers=headers, environ_base={'REMOTE_ADDR': request.remote_addr})
+        user_session = session._get_current_object()
+
+        if self.concurrency > 1 and len(items) > 1:
+            return self._run_parallel(app, items, base, user_session, deadline)
+
+        results = []
+        for item_id, path in items:
+            if time.monotonic() >= deadline:
+                results.append(self._timed_out(item_id, path))
+                continue
+            state = vars(g._get_current_object())
+            saved = dict(state)
+            try:
+                results.append(self._execute(app, item_id, path, base, user_session))
+            finally:
+                state.clear()
+                state.update(saved)
+        return results
+
+    def _run_parallel(self, app, items, base, user_session, deadline):
+        user = g.get('_login_user')
+
+        def run_item(item_id, path):
+            with app.app_context():
+                g._login_user = user
+                return self._execute(app, item_id, path, base, user_session)
+
+        futures = [self._executor().submit(run_item, item_id, path) for item_id, path in items]
+        done, _ = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        results = []
+        for future, (item_id, path) in zip(futures, items):
+            if future in done:
+                results.append(future.result())
+            else:
+                future.cancel()
+                results.append(self._timed_out(item_id, path))
+        return results
+
+    def _executor(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='batch')
+            return self._pool
+
+    def _execute(self, app, item_id, path, base, user_session):
+        started = time.perf_counter()
+        ctx = app.request_context(EnvironBuilder(path=path, method='GET', **base).get_environ())
+        # Preset so the nested context reuses the batch's session instead of loading it again
+        ctx.session = user_session
+        with ctx:
+            try:
+                rv = app.preprocess_request()
+                if rv is None:
+                    rv = app.dispatch_request()
+                response = app.make_response(rv)
+            except HTTPException as e:
+                response = e.get_response()
+            except Exception:
+                log.exception("Batched request failed", extra={'path': path})
+                db.session.rollback()
+                response = app.make_response(({'error': 'Internal Server Error'}, 500))
+            body = response.get_data()
+
+        return {
+            'id': item_id,
+            'path': path,
+            'status': response.status_code,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+            # JSON bodies are embedded as they were encoded, without a decode and re-encode
+            'body': msgspec.Raw(body.rstrip()) if response.is_json and body.strip() else body.decode('utf-8', 'replace'),
+        }
+
+    @staticmethod
+    def _timed_out(item_id, path):
+        return {'id': item_id, 'path': path, 'status': 504, 'duration_ms': None,
+                'body': {'error': 'Batch time limit exceeded'}}
+
+
+batch_executor = BatchExecutor()
@@ -0,0 +1,358 @@
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from itertools import chain
+from flask import current_app, g
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from utils.metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: tag versions stay process-local
+    fcntl = None
+
+
+_MISSING = object()
+
+
+class _Flight:
+    """A computation in progress that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """In-process TTL cache that coalesces concurrent misses for the same key.
+
+    While one caller computes a missing value, others asking for the same key
+    wait for that result instead of running the computation again.
+    """
+
+    def __init__(self, name, ttl=15, max_entries=256):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        metrics.register(self.collect_metrics)
+
+    def _lookup(self, key):
+        """The live cached value for key, or _MISSING; called with the lock held"""
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return _MISSING
+
+    def get(self, key):
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+        return None
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                self._evict()
+            self._entries[key] = (expires, value)
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+        if len(self._entries) >= self.max_entries:
+            del self._entries[min(self._entries, key=lambda k: self._entries[k][0])]
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """Return the cached value for key, computing it at most once across threads"""
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            self.set(key, flight.value, ttl)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def collect_metrics(self):
+        return [
+            (f'fgs_cache_{self.name}_hits_total', 'counter', f'{self.name} cache hits', self.hits),
+            (f'fgs_cache_{self.name}_misses_total', 'counter', f'{self.name} cache misses', self.misses),
+            (f'fgs_cache_{self.name}_coalesced_total', 'counter', f'{self.name} requests that waited on an in-flight computation', self.coalesced),
+        ]
+
+
+# Tag versions: one 8-byte counter per slot, tags hashed onto the slots. Two
+# tags sharing a slot only cost an extra invalidation, never a stale read.
+TAG_SLOTS = 4096
+_SLOT = struct.Struct('<Q')
+
+
+@lru_cache(maxsize=1024)
+def _slot_offset(tag):
+    return (zlib.crc32(tag.encode()) % TAG_SLOTS) * _SLOT.size
+
+
+class TagVersions:
+    """Generation counters per cache tag, shared by all processes on the host.
+
+    Once open() maps a file, every worker that maps the same file (or
+    inherited the mapping through a preloading fork) sees a bump as soon as it
+    is written; without one the counters are local to this process.
+    """
+
+    def __init__(self):
+        self.path = None
+        self._buffer = bytearray(TAG_SLOTS * _SLOT.size)
+        self._fd = None
+        self._lock = threading.Lock()
+
+    def open(self, path):
+        if path == self.path:
+            return
+        size = TAG_SLOTS * _SLOT.size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        with self._lock:
+            old_fd, self._fd = self._fd, fd
+            self._buffer = mmap.mmap(fd, size)
+            self.path = path
+        if old_fd is not None:
+            os.close(old_fd)
+
+    def snapshot(self, tags):
+        buffer = self._buffer
+        return tuple(_SLOT.unpack_from(buffer, _slot_offset(tag))[0] for tag in tags)
+
+    def bump(self, tags):
+        offsets = {_slot_offset(tag) for tag in tags}
+        if not offsets:
+            return
+        with self._lock:
+            # lockf locks are per process, so they exclude sibling workers even
+            # though they share the descriptor inherited from the master
+            if self._fd is not None:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                for offset in offsets:
+                    _SLOT.pack_into(self._buffer, offset, _SLOT.unpack_from(self._buffer, offset)[0] + 1)
+            finally:
+                if self._fd is not None:
+                    fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+
+tag_versions = TagVersions()
+
+
+class _Tagged:
+    __slots__ = ('value', 'tags', 'versions')
+
+    def __init__(self, value, tags, versions):
+        self.value = value
+        self.tags = tags
+        self.versions = versions
+
+
+class TaggedCache(TTLCache):
+    """TTLCache whose entries are tagged with the tables they were read from.
+
+    An entry is dropped once any of its tags is bumped (see invalidates() and
+    the session hooks installed by init_cache), when its TTL runs out, or as
+    the least recently used entry when the cache is full. The tag versions are
+    read before computing a value, so a write committed during the computation
+    still invalidates it.
+    """
+
+    def __init__(self, name, ttl=300, max_entries=256, versions=None):
+        super().__init__(name, ttl, max_entries)
+        self._entries = OrderedDict()
+        self.versions = versions or tag_versions
+        self.stale = 0
+        self.evictions = 0
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires, tagged = entry
+        if expires <= time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        if self.versions.snapshot(tagged.tags) != tagged.versions:
+            del self._entries[key]
+            self.stale += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        return tagged
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+        while len(self._entries) >= self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        tagged = super().get(key)
+        return tagged.value if tagged is not None else None
+
+    def set(self, key, value, ttl=None, tags=()):
+        if not isinstance(value, _Tagged):
+            value = _Tagged(value, tuple(tags), self.versions.snapshot(tags))
+        super().set(key, value, ttl)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def get_or_compute(self, key, compute, ttl=None, tags=()):
+        tags = tuple(tags)
+        versions = self.versions.snapshot(tags)
+        return super().get_or_compute(key, lambda: _Tagged(compute(), tags, versions), ttl).value
+
+    def invalidate_tags(self, *tags):
+        self.versions.bump(tags)
+
+    def collect_metrics(self):
+        return super().collect_metrics() + [
+            (f'fgs_cache_{self.name}_stale_total', 'counter', f'{self.name} cache entries dropped by a tag invalidation', self.stale),
+            (f'fgs_cache_{self.name}_evictions_total', 'counter', f'{self.name} cache entries evicted as least recently used', self.evictions),
+            (f'fgs_cache_{self.name}_entries', 'gauge', f'{self.name} cache entries held', len(self._entries)),
+        ]
+
+
+# Reference data (products, suppliers, departments, supplier price lists):
+# read on nearly every page, written a few times a day
+reference_cache = TaggedCache('reference', ttl=300, max_entries=64)
+
+
+def cached_json(cache, key, compute, tags):
+    """JSON response for compute(), with the encoded body cached under key.
+
+    Fills read from the primary: a lagging replica could otherwise put rows
+    older than the write that caused the invalidation back into the cache.
+    """
+    def fill():
+        pool = g.pop('db_pool', None)
+        try:
+            return current_app.json.response(compute()).get_data()
+        finally:
+            g.db_pool = pool
+
+    body = cache.get_or_compute(key, fill, tags=tags)
+    return current_app.response_class(body, mimetype=current_app.json.mimetype)
+
+
+def invalidates(*tags):
+    """Service decorator: bump the tags once the wrapped write succeeded"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            # Services return a Response or a (body, status) tuple
+            status = result[1] if isinstance(result, tuple) else getattr(result, 'status_code', 200)
+            if status < 400:
+                tag_versions.bump(tags)
+            return result
+        return wrapper
+    return decorator
+
+
+# Session hooks: every table written in a transaction is bumped as a tag when
+# it commits, so writes from any code path invalidate what was read from it
+_PENDING_TAGS = 'cache_tags'
+
+
+def _tag_flushed(session, flush_context):
+    tags = session.info.setdefault(_PENDING_TAGS, set())
+    for obj in chain(session.new, session.deleted, (obj for obj in session.dirty if session.is_modified(obj))):
+        table = getattr(obj, '__tablename__', None)
+        if table:
+            tags.add(table)
+
+
+def _tag_bulk_statement(state):
+    if (state.is_insert or state.is_update or state.is_delete) and state.bind_mapper is not None:
+        state.session.info.setdefault(_PENDING_TAGS, set()).add(state.bind_mapper.persist_selectable.name)
+
+
+def _bump_committed(session):
+    tags = session.info.pop(_PENDING_TAGS, None)
+    if tags:
+        tag_versions.bump(tags)
+
+
+def _discard_rolled_back(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_TAGS, None)
+
+
+def init_cache(app):
+    """Configure the reference cache and share tag versions between workers.
+
+    CACHE_TAG_FILE names the file the tag versions are mapped from; every
+    worker of one deployment must use the same path. Set it empty to keep
+    invalidation process-local.
+    """
+    database_key = zlib.crc32(str(app.config.get('SQLALCHEMY_DATABASE_URI')).encode())
+    app.config.setdefault('REFERENCE_CACHE_TTL', int(os.getenv('REFERENCE_CACHE_TTL', '300')))
+    app.config.setdefault('CACHE_TAG_FILE', os.getenv(
+        'CACHE_TAG_FILE', os.path.join(tempfile.gettempdir(), f'fgs-ims-cache-tags-{database_key:08x}')))
+
+    reference_cache.ttl = app.config['REFERENCE_CACHE_TTL']
+    if app.config['CACHE_TAG_FILE'] and fcntl is not None:
+        tag_versions.open(app.config['CACHE_TAG_FILE'])
+
+    if not event.contains(Session, 'after_commit', _bump_committed):
+        event.listen(Session, 'after_flush', _tag_flushed)
+        event.listen(Session, 'do_orm_execute', _tag_bulk_statement)
+        event.listen(Session, 'after_commit', _bump_committed)
+        event.listen(Session, 'after_soft_rollback', _discard_rolled_back)
+    return reference_cache
@@ -0,0 +1,160 @@
+import os
+import threading
+import zlib
+from flask import request
+from utils.metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+# Compression levels by content type: gzip 1-9, brotli quality 0-11. API JSON
+# is compressed per request, so it trades a little ratio for speed.
+DEFAULT_LEVELS = {
+    'application/json': {'br': 4, 'gzip': 5},
+    'text/html': {'br': 5, 'gzip': 6},
+    'text/css': {'br': 5, 'gzip': 6},
+    'text/javascript': {'br': 5, 'gzip': 6},
+    'application/javascript': {'br': 5, 'gzip': 6},
+    'image/svg+xml': {'br': 5, 'gzip': 6},
+    'text/plain': {'br': 4, 'gzip': 5},
+    'text/csv': {'br': 4, 'gzip': 5},
+}
+
+
+def identity_etag(etag):
+    """The ETag a compressed representation was derived from: "3-br" -> "3"
+    (see ResponseCompressor), so a validator echoed back from a compressed
+    response can be compared with the resource's own"""
+    for encoding in ('br', 'gzip'):
+        if etag.endswith(f'-{encoding}'):
+            return etag[:-len(encoding) - 1]
+    return etag
+
+
+def _gzip_stream(chunks, level):
+    # Output is yielded as the compressor fills a block rather than flushed per
+    # chunk, which would cost most of the ratio on small rows
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _brotli_stream(chunks, level):
+    compressor = brotli.Compressor(quality=level)
+    for chunk in chunks:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class ResponseCompressor:
+    """Compresses responses with gzip or brotli, negotiated from Accept-Encoding.
+
+    Only content types listed in COMPRESS_LEVELS are compressed, and buffered
+    bodies only from COMPRESS_MIN_SIZE bytes. Streamed (generator) responses
+    are compressed chunk by chunk. Responses of those types always get
+    ``Vary: Accept-Encoding``, and an ETag is suffixed with the encoding
+    (``"abc"`` -> ``"abc-br"``) so each representation has its own validator
+    and If-None-Match still yields 304s. File responses served by
+    send_from_directory pass through untouched.
+    """
+
+    def __init__(self):
+        self.min_size = 1024
+        self.levels = DEFAULT_LEVELS
+        self.encodings = ('br', 'gzip')
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_ENABLED', os.getenv('COMPRESS_ENABLED', 'True').lower() == 'true')
+        app.config.setdefault('COMPRESS_MIN_SIZE', int(os.getenv('COMPRESS_MIN_SIZE', '1024')))
+        app.config.setdefault('COMPRESS_ALGORITHMS', os.getenv('COMPRESS_ALGORITHMS', 'br,gzip'))
+        app.config.setdefault('COMPRESS_LEVELS', DEFAULT_LEVELS)
+        if not app.config['COMPRESS_ENABLED']:
+            return
+
+        self.min_size = app.config['COMPRESS_MIN_SIZE']
+        self.levels = app.config['COMPRESS_LEVELS']
+        self.encodings = tuple(
+            name for name in (part.strip() for part in app.config['COMPRESS_ALGORITHMS'].split(','))
+            if name == 'gzip' or (name == 'br' and brotli is not None)
+        )
+        app.after_request(self._after_request)
+        metrics.register(self.collect_metrics)
+
+    def negotiate(self):
+        """Best encoding the client accepts, preferring our order on equal quality"""
+        accepted = request.accept_encodings
+        best, best_quality = None, 0
+        for encoding in self.encodings:
+            quality = accepted[encoding]
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def _after_request(self, response):
+        levels = self.levels.get(response.mimetype)
+        if levels is None or response.direct_passthrough or 'Content-Encoding' in response.headers:
+            return response
+        response.vary.add('Accept-Encoding')
+        if response.status_code < 200 or response.status_code in (204, 304) or request.method == 'HEAD':
+            return response
+
+        streamed = response.is_streamed
+        if not streamed and response.calculate_content_length() < self.min_size:
+            return response
+        encoding = self.negotiate()
+        if encoding is None:
+            return response
+
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f'{etag}-{encoding}', weak)
+            response.make_conditional(request)
+            if response.status_code == 304:
+                return response
+
+        level = levels[encoding]
+        if streamed:
+            stream = _brotli_stream if encoding == 'br' else _gzip_stream
+            response.response = stream(response.iter_encoded(), level)
+            response.headers.pop('Content-Length', None)
+            self._count(encoding, None, None)
+        else:
+            data = response.get_data()
+            compressed = brotli.compress(data, quality=level) if encoding == 'br' else zlib.compress(data, level, 31)
+            response.set_data(compressed)
+            self._count(encoding, len(data), len(compressed))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _count(self, encoding, size_in, size_out):
+        with self._lock:
+            stats = self._stats.setdefault(encoding, [0, 0, 0])
+            stats[0] += 1
+            if size_in is not None:
+                stats[1] += size_in
+                stats[2] += size_out
+
+    def collect_metrics(self):
+        with self._lock:
+            stats = {encoding: list(values) for encoding, values in self._stats.items()}
+        samples = []
+        for encoding, (count, size_in, size_out) in stats.items():
+            labels = {'encoding': encoding}
+            samples += [
+                ('fgs_compressed_responses_total', 'counter', 'Responses compressed, by encoding', count, labels),
+                ('fgs_compression_bytes_in_total', 'counter', 'Uncompressed bytes of buffered compressed responses', size_in, labels),
+                ('fgs_compression_bytes_out_total', 'counter', 'Compressed bytes of buffered compressed responses', size_out, labels),
+            ]
+        return samples
+
+
+response_compressor = ResponseCompressor()
@@ -0,0 +1,163 @@
+import os
+import time
+from flask import current_app, g, has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from utils.metrics import metrics
+from utils.logger import get_logger
+
+log = get_logger('db')
+
+ANALYTICS_BIND = 'analytics'
+REPLICA_BIND = 'replica'
+
+
+def analytics_pool(view):
+    """Run a view's queries on the separate analytics pool.
+
+    For long aggregate reads (dashboards, reports): they queue for their own
+    small pool instead of holding connections the OLTP endpoints need.
+    """
+    view.db_pool = ANALYTICS_BIND
+    return view
+
+
+class RoutingSession(Session):
+    """Session that sends a request's queries to the pool chosen for it.
+
+    g.db_pool names the bind (analytics, replica) for the current request;
+    flushes and INSERT/UPDATE/DELETE statements always go to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        pool = routed_pool(self, clause) if bind is None else None
+        if pool in self._db.engines:
+            return self._db.engines[pool]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def routed_pool(session, clause=None):
+    """The bind g.db_pool picks for a statement, or None when it must go to the primary"""
+    if not has_app_context() or session._flushing or getattr(clause, 'is_dml', False):
+        return None
+    return g.get('db_pool')
+
+
+def _in_memory(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def _engine_options(url, pool_size, max_overflow, statement_timeout_ms, config):
+    """Engine kwargs for one pool; in-memory SQLite keeps its single static connection"""
+    url = make_url(url)
+    options = {'pool_pre_ping': config['DB_POOL_PRE_PING']}
+    if _in_memory(url):
+        return options
+    options.update(pool_size=pool_size, max_overflow=max_overflow,
+                   pool_timeout=config['DB_POOL_TIMEOUT'], pool_recycle=config['DB_POOL_RECYCLE'])
+
+    if statement_timeout_ms:
+        backend = url.get_backend_name()
+        if backend == 'postgresql':
+            options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout_ms}'}
+        elif backend == 'mysql':
+            options['connect_args'] = {'init_command': f'SET SESSION max_execution_time={statement_timeout_ms}'}
+    return options
+
+
+def init_db_pool(app):
+    """Configure the engine pools from the environment; call before db.init_app(app)"""
+    app.config.setdefault('DB_POOL_SIZE', int(os.getenv('DB_POOL_SIZE', '5')))
+    app.config.setdefault('DB_MAX_OVERFLOW', int(os.getenv('DB_MAX_OVERFLOW', '10')))
+    app.config.setdefault('DB_POOL_TIMEOUT', float(os.getenv('DB_POOL_TIMEOUT', '10')))
+    app.config.setdefault('DB_POOL_RECYCLE', int(os.getenv('DB_POOL_RECYCLE', '1800')))
+    app.config.setdefault('DB_POOL_PRE_PING', os.getenv('DB_POOL_PRE_PING', 'True').lower() == 'true')
+    app.config.setdefault('DB_STATEMENT_TIMEOUT_MS', int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000')))
+    app.config.setdefault('DB_REPLICA_URL', os.getenv('DB_REPLICA_URL'))
+    app.config.setdefault('DB_ANALYTICS_URL', os.getenv('DB_ANALYTICS_URL') or app.config['DB_REPLICA_URL']
+                          or app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config.setdefault('DB_ANALYTICS_POOL_SIZE', int(os.getenv('DB_ANALYTICS_POOL_SIZE', '2')))
+    app.config.setdefault('DB_ANALYTICS_MAX_OVERFLOW', int(os.getenv('DB_ANALYTICS_MAX_OVERFLOW', '2')))
+    app.config.setdefault('DB_ANALYTICS_STATEMENT_TIMEOUT_MS',
+                          int(os.getenv('DB_ANALYTICS_STATEMENT_TIMEOUT_MS', '300000')))
+    config = app.config
+
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', _engine_options(
+        config['SQLALCHEMY_DATABASE_URI'], config['DB_POOL_SIZE'], config['DB_MAX_OVERFLOW'],
+        config['DB_STATEMENT_TIMEOUT_MS'], config))
+
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    # A second in-memory SQLite engine would be a different, empty database
+    if config['DB_ANALYTICS_POOL_SIZE'] > 0 and not _in_memory(make_url(config['DB_ANALYTICS_URL'])):
+        binds.setdefault(ANALYTICS_BIND, {
+            'url': config['DB_ANALYTICS_URL'],
+            **_engine_options(config['DB_ANALYTICS_URL'], config['DB_ANALYTICS_POOL_SIZE'],
+                              config['DB_ANALYTICS_MAX_OVERFLOW'], config['DB_ANALYTICS_STATEMENT_TIMEOUT_MS'], config),
+        })
+    # Read replica for GET requests (see utils/replicaRouter.py)
+    if config['DB_REPLICA_URL']:
+        binds.setdefault(REPLICA_BIND, {
+            'url': config['DB_REPLICA_URL'],
+            **_engine_options(config['DB_REPLICA_URL'], config['DB_POOL_SIZE'], config['DB_MAX_OVERFLOW'],
+                              config['DB_STATEMENT_TIMEOUT_MS'], config),
+        })
+    if binds:
+        app.config['SQLALCHEMY_BINDS'] = binds
+
+    app.before_request(_select_pool)
+    metrics.register(collect_pool_metrics)
+
+
+def _select_pool():
+    view = current_app.view_functions.get(request.endpoint)
+    g.db_pool = getattr(view, 'db_pool', None)
+
+
+def pool_status(engine):
+    """Checked-out/overflow counts for a QueuePool; other pool classes report what they can"""
+    pool = engine.pool
+    status = {'pool': type(pool).__name__}
+    for key, attr in (('size', 'size'), ('checked_out', 'checkedout'), ('checked_in', 'checkedin'), ('overflow', 'overflow')):
+        if hasattr(pool, attr):
+            status[key] = getattr(pool, attr)()
+    if 'overflow' in status:
+        # QueuePool counts up from -size; only connections beyond pool_size are overflow
+        status['overflow'] = max(0, status['overflow'])
+    return status
+
+
+def engines():
+    db = current_app.extensions['sqlalchemy']
+    return {name or 'default': engine for name, engine in db.engines.items()}
+
+
+def check_database():
+    """Round trip SELECT 1 on every pool; returns (all_ok, per-pool report)"""
+    report = {}
+    healthy = True
+    for name, engine in engines().items():
+        started = time.perf_counter()
+        try:
+            with engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+            report[name] = {'ok': True, 'latency_ms': round((time.perf_counter() - started) * 1000, 2)}
+        except Exception as e:
+            healthy = False
+            log.warning("Database readiness check failed", extra={'pool': name, 'error': str(e)})
+            report[name] = {'ok': False, 'error': str(e)}
+        report[name].update(pool_status(engine))
+    return healthy, report
+
+
+def collect_pool_metrics():
+    if not has_app_context():
+        return []
+    samples = []
+    for name, engine in engines().items():
+        status = pool_status(engine)
+        for key in ('size', 'checked_out', 'overflow'):
+            if key in status:
+                samples.append((f'fgs_db_pool_{key}', 'gauge', f'Connection pool {key.replace("_", " ")}',
+                                status[key], {'pool': name}))
+    return samples
@@ -0,0 +1,171 @@
+import base64
+import json
+import os
+from datetime import datetime, timedelta
+import pytz
+from flask import current_app, request
+from sqlalchemy import delete, event, exists, inspect, insert, select, tuple_
+from extensions import db
+from models.tombstone import Tombstone
+from utils.projection import _tables
+
+MANILA_TZ = pytz.timezone("Asia/Manila")
+
+
+class CursorError(ValueError):
+    """A since cursor that cannot be used; ``status`` is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _encode_position(position):
+    if position is None:
+        return None
+    timestamp, row_id = position
+    return [timestamp.isoformat(), row_id]
+
+
+def _decode_position(value):
+    if value is None:
+        return None
+    timestamp, row_id = value
+    return datetime.fromisoformat(timestamp), int(row_id)
+
+
+def encode_cursor(changed, deleted):
+    payload = json.dumps([_encode_position(changed), _encode_position(deleted)])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Return the (updated_at, id) positions in the change and tombstone streams"""
+    try:
+        changed, deleted = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return _decode_position(changed), _decode_position(deleted)
+    except Exception:
+        raise CursorError('Invalid cursor')
+
+
+def _record_tombstone(mapper, connection, target):
+    # Written on the deleting connection, so it commits or rolls back with the delete
+    connection.execute(insert(Tombstone).values(
+        table_name=mapper.persist_selectable.name,
+        row_id=mapper.primary_key_from_instance(target)[0],
+    ))
+
+
+def prune_tombstones(now=None):
+    """Delete tombstones older than SYNC_TOMBSTONE_DAYS; returns how many were removed"""
+    horizon = (now or datetime.now(MANILA_TZ)) - timedelta(days=current_app.config['SYNC_TOMBSTONE_DAYS'])
+    result = db.session.execute(delete(Tombstone).where(Tombstone.deleted_at < horizon))
+    db.session.commit()
+    return result.rowcount
+
+
+class DeltaFeed:
+    """Rows of one table changed or deleted since a client's cursor.
+
+    Changes are read through the table's read model in (updated_at, id)
+    order, so a page is a range scan of the (updated_at, id) index; deletes
+    come from the tombstones recorded for the model on every ORM delete,
+    including cascades. The cursor holds the last position reached in both.
+
+    Only the table's own columns are served: a column joined in from another
+    table (a product name on an inventory row) can change without the row's
+    updated_at moving, so clients join their mirrors of the other tables
+    instead.
+
+    Rows are only returned once their updated_at is SYNC_LAG_SECONDS old, so
+    a transaction that stamped a row but had not committed yet when a page
+    was read cannot be skipped by the cursor moving past it. A client with no
+    cursor gets every row and no tombstones.
+
+    Pass ``rows=None`` for a table without updated_at: the feed then only
+    reports deletes.
+    """
+
+    def __init__(self, model, rows=None):
+        mapper = inspect(model)
+        self.model = model
+        self.table_name = mapper.persist_selectable.name
+        self.rows = rows.narrow([
+            key for key, column in rows.fields.items()
+            if not isinstance(column, dict) and _tables(column) <= {self.table_name}
+        ]) if rows is not None else None
+        self.key = mapper.primary_key[0]
+        self.updated_at = model.updated_at if rows is not None else None
+        if not event.contains(model, 'after_delete', _record_tombstone):
+            event.listen(model, 'after_delete', _record_tombstone)
+
+    def _projection(self):
+        # Honour ?fields=, but always select what the next cursor is made of
+        projection = self.rows.from_request()
+        missing = {self.key.key, 'updated_at'} - set(projection.keys)
+        return self.rows.narrow(projection.paths | missing) if missing else projection
+
+    def changes(self, cursor=None, limit=None):
+        config = current_app.config
+        limit = min(max(limit or config['SYNC_PAGE_SIZE'], 1), config['SYNC_PAGE_SIZE'])
+        now = datetime.now(MANILA_TZ)
+        watermark = now - timedelta(seconds=config['SYNC_LAG_SECONDS'])
+
+        if cursor:
+            changed, deleted = decode_cursor(cursor)
+            if deleted is None:
+                raise CursorError('Invalid cursor')
+            horizon = now - timedelta(days=config['SYNC_TOMBSTONE_DAYS'])
+            if deleted[0].replace(tzinfo=None) < horizon.replace(tzinfo=None):
+                raise CursorError('Cursor expired, start again without since', status=410)
+        else:
+            # Nothing to delete on an empty copy: follow deletes from here on
+            changed, deleted = None, (watermark, 0)
+
+        rows, has_more = [], False
+        if self.rows is not None:
+            criteria = [self.updated_at <= watermark]
+            if changed is not None:
+                criteria.append(tuple_(self.updated_at, self.key) > changed)
+            rows = self._projection().all(*criteria, limit=limit + 1, order_by=(self.updated_at, self.key))
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            if rows:
+                changed = (rows[-1].updated_at, getattr(rows[-1], self.key.key))
+
+        tombstones = db.session.execute(
+            select(Tombstone.deleted_at, Tombstone.tombstone_id, Tombstone.row_id)
+            .where(Tombstone.table_name == self.table_name,
+                   tuple_(Tombstone.deleted_at, Tombstone.tombstone_id) > deleted,
+                   Tombstone.deleted_at <= watermark,
+                   # An id that was reused since (SQLite can) belongs to a live row again
+                   ~exists().where(self.key == Tombstone.row_id))
+            .order_by(Tombstone.deleted_at, Tombstone.tombstone_id)
+            .limit(limit + 1)
+        ).all()
+        has_more = has_more or len(tombstones) > limit
+        tombstones = tombstones[:limit]
+        if tombstones:
+            deleted = (tombstones[-1].deleted_at, tombstones[-1].tombstone_id)
+
+        return {
+            'changes': rows,
+            'deleted': [tombstone.row_id for tombstone in tombstones],
+            'cursor': encode_cursor(changed, deleted),
+            'has_more': has_more,
+        }
+
+    def from_request(self):
+        return self.changes(request.args.get('since', type=str), request.args.get('limit', type=int))
+
+
+def init_delta_sync(app):
+    """Delta sync settings.
+
+    SYNC_LAG_SECONDS should exceed the longest write transaction;
+    SYNC_TOMBSTONE_DAYS is how long a client may go without syncing before
+    it has to start over.
+    """
+    app.config.setdefault('SYNC_PAGE_SIZE', int(os.getenv('SYNC_PAGE_SIZE', '500')))
+    app.config.setdefault('SYNC_LAG_SECONDS', float(os.getenv('SYNC_LAG_SECONDS', '5')))
+    app.config.setdefault('SYNC_TOMBSTONE_DAYS', int(os.getenv('SYNC_TOMBSTONE_DAYS', '90')))
@@ -0,0 +1,135 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from flask_mail import Message
+from extensions import db
+from models.emailoutbox import EmailOutbox, OutboxStatus
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+log = get_logger('email.outbox')
+
+
+class EmailOutboxWorker:
+    """Background thread that drains the email_outbox table.
+
+    Each batch is delivered over a single SMTP connection. Failed messages are
+    retried with exponential backoff and marked failed after max_attempts.
+    """
+
+    def __init__(self, poll_interval=10, batch_size=20, max_attempts=5, backoff_seconds=30):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.app = None
+        self._thread = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+
+    def init_app(self, app):
+        app.config.setdefault('EMAIL_OUTBOX_WORKER', os.getenv('EMAIL_OUTBOX_WORKER', 'True').lower() == 'true')
+        app.config.setdefault('EMAIL_OUTBOX_POLL_INTERVAL', float(os.getenv('EMAIL_OUTBOX_POLL_INTERVAL', '10')))
+        app.config.setdefault('EMAIL_OUTBOX_BATCH_SIZE', int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', '20')))
+        app.config.setdefault('EMAIL_OUTBOX_MAX_ATTEMPTS', int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '5')))
+
+        self.app = app
+        self.poll_interval = app.config['EMAIL_OUTBOX_POLL_INTERVAL']
+        self.batch_size = app.config['EMAIL_OUTBOX_BATCH_SIZE']
+        self.max_attempts = app.config['EMAIL_OUTBOX_MAX_ATTEMPTS']
+        metrics.register(self.collect_metrics)
+
+    @property
+    def running(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='email-outbox', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def wake(self):
+        """Ask the sender to look at the outbox now instead of at the next poll"""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                with self.app.app_context():
+                    # Keep draining while full batches come back
+                    while self.process_batch() == self.batch_size:
+                        pass
+            except Exception:
+                log.exception("Email outbox worker error")
+
+    def process_batch(self):
+        """Deliver one batch of due emails; returns how many rows were claimed"""
+        from config.email_config import mail
+
+        now = datetime.utcnow()
+        rows = EmailOutbox.query.filter(
+            EmailOutbox.status == OutboxStatus.pending,
+            EmailOutbox.next_attempt_at <= now
+        ).order_by(EmailOutbox.email_id).limit(self.batch_size).with_for_update(skip_locked=True).all()
+
+        if not rows:
+            db.session.commit()
+            return 0
+
+        handled = set()
+        try:
+            with mail.connect() as connection:
+                for row in rows:
+                    handled.add(row.email_id)
+                    try:
+                        connection.send(Message(subject=row.subject, recipients=[row.recipient], html=row.html))
+                        row.status = OutboxStatus.sent
+                        row.sent_at = datetime.utcnow()
+                        row.attempts += 1
+                        self.sent += 1
+                    except Exception as e:
+                        self._schedule_retry(row, e)
+        except Exception as e:
+            # Could not connect: retry everything this batch did not get to
+            for row in rows:
+                if row.email_id not in handled:
+                    self._schedule_retry(row, e)
+
+        db.session.commit()
+        return len(rows)
+
+    def _schedule_retry(self, row, error):
+        row.attempts += 1
+        row.last_error = str(error)[:1000]
+        if row.attempts >= self.max_attempts:
+            row.status = OutboxStatus.failed
+            self.failed += 1
+            log.error("Giving up on email", extra={'email_id': row.email_id, 'attempts': row.attempts, 'error': str(error)})
+        else:
+            row.next_attempt_at = datetime.utcnow() + timedelta(seconds=self.backoff_seconds * 2 ** (row.attempts - 1))
+            self.retried += 1
+
+    def collect_metrics(self):
+        return [
+            ('fgs_email_sent_total', 'counter', 'Emails delivered by the outbox sender', self.sent),
+            ('fgs_email_retried_total', 'counter', 'Email deliveries scheduled for retry', self.retried),
+            ('fgs_email_failed_total', 'counter', 'Emails given up on after max attempts', self.failed),
+        ]
+
+
+outbox_worker = EmailOutboxWorker()
@@ -0,0 +1,51 @@
+import msgspec
+from flask.json.provider import DefaultJSONProvider
+
+
+def _enc_hook(value):
+    """Types msgspec does not encode natively; anything else is an error"""
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise NotImplementedError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class MsgspecJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by msgspec's C encoder.
+
+    datetime/date/time, Enum, UUID and dataclasses are encoded natively (dates
+    as ISO 8601, keeping any UTC offset) and Decimal as its exact string, so
+    to_dict() can hand model values over untouched. Keys are not sorted,
+    unlike Flask's default provider: nothing relies on key order and sorting
+    every object is pure overhead.
+    """
+
+    sort_keys = False
+
+    def __init__(self, app):
+        super().__init__(app)
+        self._encoder = msgspec.json.Encoder(enc_hook=_enc_hook, decimal_format='string')
+        self._sorted_encoder = msgspec.json.Encoder(enc_hook=_enc_hook, decimal_format='string', order='sorted')
+
+    def _encode(self, obj, indent=False):
+        encoder = self._sorted_encoder if self.sort_keys else self._encoder
+        body = encoder.encode(obj)
+        return msgspec.json.format(body, indent=2) if indent else body
+
+    def dumps(self, obj, **kwargs):
+        return self._encode(obj, bool(kwargs.get('indent'))).decode()
+
+    def loads(self, s, **kwargs):
+        return msgspec.json.decode(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        # Hand the encoded bytes straight to the response instead of a str round trip
+        return self._app.response_class(self._encode(obj, indent) + b'\n', mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    app.json = MsgspecJSONProvider(app)
+    return app.json
@@ -0,0 +1,134 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+ROOT_LOGGER = 'fgs'
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the message, level, logger and extra fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records below WARNING for the configured loggers.
+
+    ``rates`` maps logger names to a 0..1 sample rate; the longest matching
+    prefix wins, so ``{'fgs.auth': 0.1}`` also covers ``fgs.auth.login``.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = rates or {}
+
+    def rate_for(self, name):
+        best, best_rate = '', 1.0
+        for prefix, rate in self.rates.items():
+            if (name == prefix or name.startswith(prefix + '.')) and len(prefix) > len(best):
+                best, best_rate = prefix, rate
+        return best_rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+def parse_sampling(spec):
+    """Parse 'fgs.auth=0.1,fgs.app=0.5' into a rates dict"""
+    rates = {}
+    for part in filter(None, (item.strip() for item in (spec or '').split(','))):
+        name, _, rate = part.partition('=')
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+_listener = None
+_queue_handler = None
+
+
+def get_logger(name):
+    """Return the application logger for a module, e.g. get_logger('auth')"""
+    return logging.getLogger(f'{ROOT_LOGGER}.{name}')
+
+
+def init_logging(app=None):
+    """Route the fgs loggers through a queue drained by a background thread.
+
+    Request threads only enqueue records; formatting and the blocking stdout
+    write happen on the QueueListener thread. Configured with LOG_LEVEL,
+    LOG_FORMAT (json or text) and LOG_SAMPLING.
+    """
+    global _listener, _queue_handler
+
+    config = app.config if app is not None else {}
+    level = config.get('LOG_LEVEL', os.getenv('LOG_LEVEL', 'INFO')).upper()
+    log_format = config.get('LOG_FORMAT', os.getenv('LOG_FORMAT', 'json')).lower()
+    sampling = config.get('LOG_SAMPLING', os.getenv('LOG_SAMPLING', ''))
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level)
+    root.propagate = False
+
+    if _listener is not None:
+        return root
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if log_format == 'text':
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(name)s] %(message)s'))
+    else:
+        stream_handler.setFormatter(JsonFormatter())
+
+    _queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    _queue_handler.addFilter(SamplingFilter(parse_sampling(sampling)))
+    root.handlers = [_queue_handler]
+
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return root
+
+
+def restart_logging():
+    """Start a fresh queue and listener thread in a forked child process.
+
+    The listener thread does not survive fork, so without this a worker's
+    records would pile up in a queue nobody drains.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _queue_handler.queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
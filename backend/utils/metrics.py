@@ -0,0 +1,322 @@
+import atexit
+import bisect
+import json
+import os
+import threading
+from contextlib import contextmanager
+from utils.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: one server process, nothing to lock against
+    fcntl = None
+
+log = get_logger('metrics')
+
+# Counters and histograms of exited workers, merged into one snapshot
+DEAD_SNAPSHOT = 'metrics_dead.json'
+
+# Latency buckets in seconds, shared by the request and query histograms
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram whose value() is JSON-friendly and mergeable"""
+
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, amount):
+        self.counts[bisect.bisect_left(self.buckets, amount)] += 1
+        self.sum += amount
+
+    def value(self):
+        return {'buckets': list(self.buckets), 'counts': list(self.counts), 'sum': self.sum}
+
+
+def _merge_histograms(left, right):
+    if left['buckets'] != right['buckets']:
+        # Bucket layout changed between deploys; keep the newer one
+        return right
+    return {
+        'buckets': left['buckets'],
+        'counts': [a + b for a, b in zip(left['counts'], right['counts'])],
+        'sum': left['sum'] + right['sum'],
+    }
+
+
+def _merge_samples(snapshots, keep_gauges):
+    """Sum counters and histograms across snapshots; gauges only from those
+    keep_gauges(snapshot) accepts"""
+    merged = {}
+    for snapshot in snapshots:
+        gauges = keep_gauges(snapshot)
+        for name, metric_type, help_text, labels, value in snapshot['samples']:
+            if metric_type == 'gauge' and not gauges:
+                continue
+            key = (name, tuple(tuple(label) for label in labels))
+            if key not in merged:
+                merged[key] = [metric_type, help_text, value]
+            elif metric_type == 'histogram':
+                merged[key][2] = _merge_histograms(merged[key][2], value)
+            else:
+                merged[key][2] += value
+    return [(name, metric_type, help_text, labels, value)
+            for (name, labels), (metric_type, help_text, value) in merged.items()]
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+# Process-wide metrics registry. Subsystems register a collector function that
+# returns (name, type, help, value) samples, optionally with a labels dict as a
+# fifth element, and the /metrics route renders them. Histogram values come
+# from Histogram.value().
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dir_lock = threading.Lock()
+        self._collectors = []
+        self.multiproc_dir = None
+        self._flush_thread = None
+        self._flush_stop = threading.Event()
+
+    def register(self, collector):
+        """Register a callable returning a list of (name, type, help, value[, labels]) samples"""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+        return collector
+
+    def collect(self):
+        """Gather samples from every registered collector as (name, type, help, labels, value)"""
+        with self._lock:
+            collectors = list(self._collectors)
+
+        samples = []
+        for collector in collectors:
+            try:
+                for sample in collector():
+                    name, metric_type, help_text, value, *rest = sample
+                    labels = tuple(sorted((rest[0] or {}).items())) if rest else ()
+                    samples.append((name, metric_type, help_text, labels, value))
+            except Exception:
+                log.exception("Metrics collector %s failed", getattr(collector, '__name__', collector))
+        return samples
+
+    # ------------------------------------------------------------------
+    # Multi-process aggregation
+    # ------------------------------------------------------------------
+    def init_app(self, app):
+        """Enable cross-process aggregation when METRICS_MULTIPROC_DIR is set.
+
+        Each worker process periodically writes a snapshot of its samples to
+        that directory; /metrics merges every snapshot so it reports the same
+        totals whichever worker answers the scrape.
+        """
+        app.config.setdefault('METRICS_MULTIPROC_DIR', os.getenv('METRICS_MULTIPROC_DIR'))
+        app.config.setdefault('METRICS_FLUSH_INTERVAL', float(os.getenv('METRICS_FLUSH_INTERVAL', '5')))
+
+        directory = app.config['METRICS_MULTIPROC_DIR']
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        self.multiproc_dir = directory
+        self._start_flusher(app.config['METRICS_FLUSH_INTERVAL'])
+        atexit.register(self.write_snapshot)
+
+    def _start_flusher(self, interval):
+        def run():
+            while not self._flush_stop.wait(interval):
+                self.write_snapshot()
+
+        self._flush_interval = interval
+        self._flush_thread = threading.Thread(target=run, name='metrics-flush', daemon=True)
+        self._flush_thread.start()
+
+    def after_fork(self):
+        """Start this worker's own flusher; threads do not survive fork.
+
+        Called explicitly by the server's post-fork hook rather than from
+        os.register_at_fork, so helper processes such as the bcrypt pool do
+        not start snapshotting copies of their parent's counters.
+        """
+        if self.multiproc_dir:
+            self._start_flusher(self._flush_interval)
+
+    def _snapshot_path(self, pid):
+        return os.path.join(self.multiproc_dir, f'metrics_{pid}.json')
+
+    def _write_json(self, path, payload):
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+    def write_snapshot(self):
+        """Atomically write this process's samples to the shared directory"""
+        if not self.multiproc_dir:
+            return
+        pid = os.getpid()
+        try:
+            self._write_json(self._snapshot_path(pid),
+                             {'pid': pid, 'samples': [list(sample) for sample in self.collect()]})
+        except OSError:
+            log.exception("Could not write metrics snapshot")
+
+    @contextmanager
+    def _directory_lock(self):
+        """Serialize compaction and reads of the shared directory across processes"""
+        with self._dir_lock, open(os.path.join(self.multiproc_dir, 'metrics.lock'), 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _read_snapshots(self):
+        snapshots = []
+        for filename in os.listdir(self.multiproc_dir):
+            if not (filename.startswith('metrics_') and filename.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(self.multiproc_dir, filename)) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                # Half-written or removed between listdir and open
+                continue
+        return snapshots
+
+    def _snapshot_pids(self):
+        pids = []
+        for filename in os.listdir(self.multiproc_dir):
+            pid = filename[len('metrics_'):-len('.json')]
+            if filename.startswith('metrics_') and filename.endswith('.json') and pid.isdigit():
+                pids.append(int(pid))
+        return pids
+
+    def _fold_dead(self, pid):
+        # Caller holds the directory lock
+        path = self._snapshot_path(pid)
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            log.warning("Dropping unreadable metrics snapshot", extra={'path': path})
+            snapshot = {'samples': []}
+        dead_path = os.path.join(self.multiproc_dir, DEAD_SNAPSHOT)
+        try:
+            with open(dead_path) as f:
+                dead = json.load(f)
+        except (OSError, ValueError):
+            dead = {'pid': None, 'samples': []}
+        samples = _merge_samples([dead, snapshot], keep_gauges=lambda _: False)
+        self._write_json(dead_path, {'pid': None, 'samples': [list(sample) for sample in samples]})
+        os.remove(path)
+
+    def mark_process_dead(self, pid):
+        """Fold an exited worker's counters and histograms into metrics_dead.json
+        and remove its snapshot, so recycled workers do not pile up files that
+        every scrape re-reads (prometheus_client's mark_process_dead, for this
+        directory). The server calls it when a worker exits; scrapes also sweep
+        up snapshots of processes that died without it.
+        """
+        if not self.multiproc_dir:
+            return
+        try:
+            with self._directory_lock():
+                self._fold_dead(pid)
+        except OSError:
+            log.exception("Could not fold metrics of exited process", extra={'pid': pid})
+
+    @staticmethod
+    def _pid_alive(pid):
+        if pid is None:
+            return False
+        if pid == os.getpid():
+            return True
+        if os.name == 'nt':
+            # os.kill(pid, 0) would terminate the process on Windows
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.OpenProcess(0x100000, False, pid)  # SYNCHRONIZE
+            if not handle:
+                return False
+            try:
+                return kernel32.WaitForSingleObject(handle, 0) == 0x102  # WAIT_TIMEOUT
+            finally:
+                kernel32.CloseHandle(handle)
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def aggregate(self):
+        """Merge samples from every worker: counters and histograms are summed
+        across all snapshots and the folded exited workers, gauges only across
+        processes that are still alive"""
+        self.write_snapshot()
+        with self._directory_lock():
+            for pid in self._snapshot_pids():
+                if not self._pid_alive(pid):
+                    self._fold_dead(pid)
+            snapshots = self._read_snapshots()
+        return _merge_samples(snapshots, keep_gauges=lambda snapshot: self._pid_alive(snapshot.get('pid')))
+
+    # ------------------------------------------------------------------
+    # Exposition
+    # ------------------------------------------------------------------
+    def render(self):
+        """Render all samples in the Prometheus text exposition format"""
+        samples = self.aggregate() if self.multiproc_dir else self.collect()
+
+        families = {}
+        for name, metric_type, help_text, labels, value in samples:
+            family = families.setdefault(name, (metric_type, help_text, []))
+            family[2].append((labels, value))
+
+        lines = []
+        for name, (metric_type, help_text, series) in families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in sorted(series, key=lambda item: item[0]):
+                if metric_type == 'histogram':
+                    lines.extend(self._render_histogram(name, labels, value))
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histogram(name, labels, value):
+        lines = []
+        cumulative = 0
+        bounds = [str(bound) for bound in value['buckets']] + ['+Inf']
+        for bound, count in zip(bounds, value['counts']):
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+        lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,124 @@
+import os
+import random
+import threading
+import time
+from functools import wraps
+from flask import current_app, jsonify, make_response, request
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from werkzeug.http import parse_etags
+from extensions import db
+from utils.compression import identity_etag
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+log = get_logger('db.concurrency')
+
+
+class ConflictStats:
+    """Counters for /metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.retried = 0
+        self.exhausted = 0
+        self.rejected = 0
+
+    def add(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def collect_metrics(self):
+        return [
+            ('fgs_write_conflicts_retried_total', 'counter', 'Writes retried after a concurrent update', self.retried),
+            ('fgs_write_conflicts_exhausted_total', 'counter', 'Writes answered 409 after every retry conflicted', self.exhausted),
+            ('fgs_write_conflicts_rejected_total', 'counter', 'Writes answered 409 because If-Match named an old version', self.rejected),
+        ]
+
+
+conflict_stats = ConflictStats()
+
+
+def init_optimistic_locking(app):
+    """Retry settings for writes that lose a version check.
+
+    Versioned models (Inventory, Product, Supplier, ProductSupplier) have a
+    version_id_col: every UPDATE or DELETE of a row matches the version it was
+    read at and bumps it, so a write based on a stale read fails with
+    StaleDataError instead of overwriting the newer row.
+    """
+    app.config.setdefault('CONFLICT_RETRY_ATTEMPTS', int(os.getenv('CONFLICT_RETRY_ATTEMPTS', '5')))
+    app.config.setdefault('CONFLICT_RETRY_BASE_DELAY', float(os.getenv('CONFLICT_RETRY_BASE_DELAY', '0.01')))
+    app.config.setdefault('CONFLICT_RETRY_MAX_DELAY', float(os.getenv('CONFLICT_RETRY_MAX_DELAY', '0.5')))
+    metrics.register(conflict_stats.collect_metrics)
+
+
+def _conflict_response(**details):
+    return make_response(jsonify({
+        'error': 'This record was changed by someone else. Reload it and try again.', **details}), 409)
+
+
+def is_unique_violation(error):
+    """Whether an IntegrityError is a duplicate key: another transaction
+    inserted the same unique row (e.g. a product's inventory row) first"""
+    orig = getattr(error, 'orig', None)
+    code = getattr(orig, 'pgcode', None) or getattr(orig, 'sqlstate', None)
+    if code:
+        return code == '23505'
+    args = getattr(orig, 'args', ())
+    if args and args[0] == 1062:  # MySQL ER_DUP_ENTRY
+        return True
+    return 'UNIQUE constraint failed' in str(orig)  # SQLite
+
+
+def retry_on_conflict(func):
+    """Service decorator: run the whole read-modify-write again when its commit
+    lost a version check, or lost the race to insert a unique row, with
+    jittered exponential backoff between attempts.
+
+    The service must let StaleDataError and unique violations (see
+    is_unique_violation) propagate and must not commit before its last write,
+    so that every attempt starts over from a fresh read, which then finds the
+    row the other transaction inserted. Once CONFLICT_RETRY_ATTEMPTS attempts
+    conflicted, answers 409.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        config = current_app.config
+        attempts = max(1, config['CONFLICT_RETRY_ATTEMPTS'])
+        for attempt in range(attempts):
+            try:
+                return func(*args, **kwargs)
+            except (StaleDataError, IntegrityError) as e:
+                db.session.rollback()
+                if isinstance(e, IntegrityError) and not is_unique_violation(e):
+                    raise
+                if attempt + 1 == attempts:
+                    break
+                conflict_stats.add('retried')
+                delay = min(config['CONFLICT_RETRY_MAX_DELAY'], config['CONFLICT_RETRY_BASE_DELAY'] * 2 ** attempt)
+                time.sleep(random.uniform(0, delay))
+        conflict_stats.add('exhausted')
+        log.warning("Write kept conflicting", extra={'service': func.__name__, 'attempts': attempts})
+        return _conflict_response()
+    return wrapper
+
+
+def if_match_conflict(obj):
+    """A 409 response when the request's If-Match names another version of obj, else None.
+
+    Clients send back the ETag (or the version field) they read, as received:
+    the encoding suffix compression adds ("3-gzip") is ignored. Without an
+    If-Match header, or with If-Match: *, the write goes ahead. Answers 409
+    rather than 412, the same as a write that kept losing the race.
+    """
+    header = request.headers.get('If-Match')
+    if not header:
+        return None
+    etags = parse_etags(header)
+    if etags.star_tag or str(obj.version) in {identity_etag(etag) for etag in etags.as_set(include_weak=True)}:
+        return None
+    conflict_stats.add('rejected')
+    response = _conflict_response(version=obj.version)
+    response.set_etag(str(obj.version))
+    return response
@@ -0,0 +1,168 @@
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+from utils.metrics import metrics
+
+
+class HasherBusy(Exception):
+    """Raised when the bcrypt pool is saturated or too slow to answer"""
+
+
+def _encode(password):
+    # bcrypt only uses the first 72 bytes; newer releases raise instead of truncating
+    return password.encode('utf-8')[:72]
+
+
+def _hash_password(password, rounds):
+    return bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+
+def _check_password(pw_hash, password):
+    pw_hash = pw_hash.encode('utf-8')
+    try:
+        return hmac.compare_digest(bcrypt.hashpw(_encode(password), pw_hash), pw_hash)
+    except ValueError:
+        # Malformed or non-bcrypt hash stored for this account
+        return False
+
+
+def _timed(fn, *args):
+    # Runs in the pool process; the caller learns how long one hash takes there
+    started = time.perf_counter()
+    return fn(*args), time.perf_counter() - started
+
+
+class PasswordHasher:
+    """Runs bcrypt in a bounded process pool so request threads are not pinned on CPU.
+
+    Callers queue for the pool with a deadline of ``timeout`` seconds. A call
+    is admitted while fewer than ``max_pending`` operations are queued or
+    running and, going by the recent time per hash, it can still finish
+    before its deadline; otherwise it fails fast with HasherBusy instead of
+    waiting only to time out. An operation holds its slot until the pool has
+    actually finished it, even after its caller gave up.
+    """
+
+    def __init__(self, workers=2, max_pending=64, timeout=15.0, rounds=12):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.rounds = rounds
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+        # Moving average of the seconds one operation takes in the pool
+        self.hash_seconds = None
+
+    def _get_executor(self):
+        # Executors do not survive fork, so each worker process builds its own
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _admit(self):
+        with self._lock:
+            if self.in_flight >= self.max_pending:
+                self.rejected += 1
+                raise HasherBusy('Password hashing queue is full')
+            if self.hash_seconds is not None:
+                # Rounds of work queued ahead of this call, plus its own
+                expected = (self.in_flight // self.workers + 1) * self.hash_seconds
+                if expected > self.timeout:
+                    self.rejected += 1
+                    raise HasherBusy('Password hashing queue would miss its deadline')
+            self.in_flight += 1
+
+    def _finished(self, future):
+        with self._lock:
+            self.in_flight -= 1
+            if not future.cancelled() and future.exception() is None:
+                seconds = future.result()[1]
+                self.hash_seconds = seconds if self.hash_seconds is None else 0.8 * self.hash_seconds + 0.2 * seconds
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+
+        self._admit()
+        try:
+            future = self._get_executor().submit(_timed, fn, *args)
+        except BrokenProcessPool:
+            with self._lock:
+                self.in_flight -= 1
+                self._executor = None
+            self.rejected += 1
+            raise HasherBusy('Password hashing pool restarted')
+        # The slot is released when the pool is done with the operation, not
+        # when this caller stops waiting: a hash already running cannot be
+        # cancelled and still occupies a pool process
+        future.add_done_callback(self._finished)
+        try:
+            return future.result(timeout=self.timeout)[0]
+        except FutureTimeout:
+            future.cancel()
+            self.rejected += 1
+            raise HasherBusy('Password hashing timed out')
+        except BrokenProcessPool:
+            # A pool worker died; start a fresh pool on the next call
+            with self._lock:
+                self._executor = None
+            self.rejected += 1
+            raise HasherBusy('Password hashing pool restarted')
+
+    def generate_password_hash(self, password):
+        return self._run(_hash_password, password, self.rounds)
+
+    def check_password_hash(self, pw_hash, password):
+        if not pw_hash or not password:
+            return False
+        return self._run(_check_password, pw_hash, password)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def collect_metrics(self):
+        return [
+            ('fgs_bcrypt_in_flight', 'gauge', 'Password hash operations queued or running', self.in_flight),
+            ('fgs_bcrypt_rejected_total', 'counter', 'Password hash operations rejected as busy', self.rejected),
+            ('fgs_bcrypt_hash_seconds', 'gauge', 'Recent seconds per password hash operation', round(self.hash_seconds or 0, 4)),
+        ]
+
+
+password_hasher = PasswordHasher()
+
+
+def init_password_hasher(app):
+    """Size the bcrypt pool from config (BCRYPT_POOL_WORKERS=0 hashes inline).
+
+    Every server process gets its own pool, so by default the host's cores
+    are shared out among the WEB_CONCURRENCY processes (at least one pool
+    process each, at most four). BCRYPT_MAX_PENDING is sized for a shift-change
+    burst of logins landing on one process; BCRYPT_TIMEOUT is how long a login
+    may queue and hash before it is answered with a 503.
+    """
+    cpu_count = os.cpu_count() or 1
+    processes = max(1, int(os.getenv('WEB_CONCURRENCY', '1')))
+    default_workers = min(4, max(1, cpu_count // processes))
+    app.config.setdefault('BCRYPT_POOL_WORKERS', int(os.getenv('BCRYPT_POOL_WORKERS', str(default_workers))))
+    app.config.setdefault('BCRYPT_MAX_PENDING', int(os.getenv('BCRYPT_MAX_PENDING', '64')))
+    app.config.setdefault('BCRYPT_TIMEOUT', float(os.getenv('BCRYPT_TIMEOUT', '15')))
+    app.config.setdefault('BCRYPT_LOG_ROUNDS', 12)
+
+    password_hasher.workers = app.config['BCRYPT_POOL_WORKERS']
+    password_hasher.max_pending = app.config['BCRYPT_MAX_PENDING']
+    password_hasher.timeout = app.config['BCRYPT_TIMEOUT']
+    password_hasher.rounds = app.config['BCRYPT_LOG_ROUNDS']
+    metrics.register(password_hasher.collect_metrics)
+    return password_hasher
@@ -0,0 +1,175 @@
+import threading
+from functools import cached_property
+import msgspec
+from flask import abort, jsonify, make_response, request
+from sqlalchemy import inspect, select
+from sqlalchemy.sql.util import find_tables
+from extensions import db
+
+# Narrowed projections kept per read model; the field whitelist bounds the
+# combinations, this bounds the memory
+MAX_NARROWED = 64
+
+
+def _tables(clause):
+    """Names of the tables and aliases a clause reads from"""
+    if hasattr(clause, '__clause_element__'):
+        clause = clause.__clause_element__()
+    return {getattr(table, 'fullname', table.name)
+            for table in find_tables(clause, check_columns=True, include_aliases=True)}
+
+
+def _layout(name, fields, prefix=''):
+    """Struct type, labeled columns and row builder for a (nested) field mapping"""
+    row_type = msgspec.defstruct(name, tuple(fields))
+    columns, getters = [], []
+    for key, value in fields.items():
+        if isinstance(value, dict):
+            _, nested_columns, nested_build = _layout(f'{name}_{key}', value, f'{prefix}{key}__')
+            start, end = len(columns), len(columns) + len(nested_columns)
+            getters.append(lambda row, start=start, end=end, build=nested_build: build(row[start:end]))
+            columns += nested_columns
+        else:
+            getters.append(len(columns))
+            columns.append(value.label(prefix + key))
+
+    if all(isinstance(getter, int) for getter in getters):
+        build = lambda row: row_type(*row)
+    else:
+        build = lambda row: row_type(*[getter(row) if callable(getter) else row[getter] for getter in getters])
+    return row_type, columns, build
+
+
+def _paths(fields, prefix=''):
+    for key, value in fields.items():
+        yield prefix + key
+        if isinstance(value, dict):
+            yield from _paths(value, f'{prefix}{key}.')
+
+
+def _subset(fields, selected, prefix=''):
+    """The part of ``fields`` named by the dotted paths in ``selected``"""
+    subset = {}
+    for key, value in fields.items():
+        path = prefix + key
+        if path in selected:
+            subset[key] = value
+        elif isinstance(value, dict):
+            nested = _subset(value, selected, path + '.')
+            if nested:
+                subset[key] = nested
+    return subset
+
+
+class Projection:
+    """A read model for one endpoint: just the columns it serializes.
+
+    ``fields`` maps output keys to column expressions, or to a nested mapping
+    for an embedded object; ``joins`` are to-one relationship attributes (or
+    (target, onclause) pairs) outer-joined to pull in related names. The
+    select() is built once, and each result row becomes a slotted msgspec
+    Struct that the JSON provider encodes natively, so no ORM instances,
+    identity map entries or to_dict() calls are involved.
+
+        PRODUCT_ROWS = Projection('ProductRow', Product, {
+            'product_id': Product.product_id,
+            'name': Product.name,
+        }, order_by=Product.product_id)
+        rows = PRODUCT_ROWS.all()
+
+    The declared fields are also the whitelist for sparse fieldsets:
+    ``narrow(['product_id', 'supplier.supplier_name'])`` (or ``from_request()``
+    for ``?fields=``) returns a projection selecting only those columns and
+    only the joins they need.
+    """
+
+    def __init__(self, name, source, fields, joins=(), order_by=()):
+        self.name = name
+        self.source = source
+        self.fields = fields
+        self.joins = tuple(joins)
+        self.order_by = tuple(order_by) if isinstance(order_by, (list, tuple)) else (order_by,)
+        self.keys = tuple(fields)
+        self.paths = frozenset(_paths(fields))
+        self.row_type, self._columns, self._build = _layout(name, fields)
+        self._narrowed = {}
+        self._lock = threading.Lock()
+
+    @cached_property
+    def statement(self):
+        # Built on first use: resolving the joins configures the mappers, which
+        # needs every model imported
+        statement = select(*self._columns).select_from(self.source)
+        for join in self._needed_joins(self._columns):
+            statement = statement.outerjoin(*join) if isinstance(join, tuple) else statement.outerjoin(join)
+        return statement.order_by(*self.order_by)
+
+    def _needed_joins(self, columns):
+        """The joins the columns (or a later kept join) read from; all of them are to-one,
+        so leaving the others out never changes the rows returned"""
+        needed = set()
+        for clause in (*columns, *self.order_by):
+            needed |= _tables(clause)
+        kept = []
+        for join in reversed(self.joins):
+            if isinstance(join, tuple):
+                target, onclause = join[0], join[1] if len(join) > 1 else None
+                target_tables = _tables(inspect(target).selectable)
+            else:
+                onclause = join.property.primaryjoin
+                target_tables = _tables(join.property.entity.selectable)
+            if target_tables & needed:
+                kept.append(join)
+                if onclause is not None:
+                    needed |= _tables(onclause)
+        return kept[::-1]
+
+    def narrow(self, paths):
+        """A projection of just the given dotted field paths, cached per selection"""
+        selected = frozenset(paths)
+        if not selected or selected >= {*self.keys}:
+            return self
+        with self._lock:
+            projection = self._narrowed.get(selected)
+        if projection is None:
+            projection = Projection(self.name, self.source, _subset(self.fields, selected), self.joins, self.order_by)
+            with self._lock:
+                if len(self._narrowed) < MAX_NARROWED:
+                    self._narrowed[selected] = projection
+        return projection
+
+    def from_request(self):
+        """The projection for this request's ``?fields=a,b,c``; 400 on unknown names"""
+        raw = request.args.get('fields')
+        if raw is None:
+            return self
+        paths = [path.strip() for path in raw.split(',') if path.strip()]
+        unknown = [path for path in paths if path not in self.paths]
+        if not paths or unknown:
+            abort(make_response(jsonify({
+                'error': f"Unknown field(s): {', '.join(unknown)}" if unknown else 'No fields requested',
+                'allowed_fields': sorted(self.paths),
+            }), 400))
+        return self.narrow(paths)
+
+    @property
+    def signature(self):
+        """Stable description of the selected fields, e.g. for cache keys"""
+        return ','.join(sorted(self.paths))
+
+    def query(self, *criteria, limit=None, order_by=None):
+        """The compiled select(), narrowed by optional WHERE criteria and row limit,
+        optionally in another order than the declared one"""
+        statement = self.statement.where(*criteria) if criteria else self.statement
+        if order_by is not None:
+            statement = statement.order_by(None).order_by(*order_by)
+        return statement.limit(limit) if limit is not None else statement
+
+    def all(self, *criteria, limit=None, order_by=None):
+        build = self._build
+        statement = self.query(*criteria, limit=limit, order_by=order_by)
+        return [build(row) for row in db.session.execute(statement).tuples()]
+
+    def first(self, *criteria):
+        row = db.session.execute(self.query(*criteria).limit(1)).first()
+        return self._build(row) if row is not None else None
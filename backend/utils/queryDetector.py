@@ -0,0 +1,147 @@
+import os
+import re
+import traceback
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from utils.logger import get_logger
+
+log = get_logger('queries')
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in raise mode when a request repeats lazy loads or runs too many queries"""
+
+
+def query_budget(limit):
+    """Override QUERY_BUDGET for one view; place it directly under the route decorator"""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+class NPlusOneDetector:
+    """Opt-in detector for N+1 lazy loads and per-request query budgets.
+
+    Counts every SQL statement a request runs, grouped by statement text, and
+    every relationship lazy load, grouped by attribute (``Inventory.product``).
+    After the request a report is produced when an attribute is lazy loaded or
+    a statement repeated at least N_PLUS_ONE_THRESHOLD times, or when the
+    request ran more than QUERY_BUDGET statements. N_PLUS_ONE_MODE chooses
+    between logging a warning with the offending stack and raising
+    QueryBudgetExceeded (for tests and CI).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.mode = 'warn'
+        self.threshold = 5
+        self.budget = 50
+
+    def init_app(self, app):
+        app.config.setdefault('N_PLUS_ONE_DETECT', os.getenv('N_PLUS_ONE_DETECT', 'False').lower() == 'true')
+        app.config.setdefault('N_PLUS_ONE_MODE', os.getenv('N_PLUS_ONE_MODE', 'warn'))
+        app.config.setdefault('N_PLUS_ONE_THRESHOLD', int(os.getenv('N_PLUS_ONE_THRESHOLD', '5')))
+        app.config.setdefault('QUERY_BUDGET', int(os.getenv('QUERY_BUDGET', '50')))
+
+        self.enabled = app.config['N_PLUS_ONE_DETECT']
+        self.mode = app.config['N_PLUS_ONE_MODE']
+        self.threshold = app.config['N_PLUS_ONE_THRESHOLD']
+        self.budget = app.config['QUERY_BUDGET']
+        if not self.enabled:
+            return
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        if not event.contains(Engine, 'before_cursor_execute', _count_statement):
+            event.listen(Engine, 'before_cursor_execute', _count_statement)
+            event.listen(Session, 'do_orm_execute', _count_lazy_load)
+
+    def _before_request(self):
+        g._query_tracker = _RequestTracker(self.threshold)
+
+    def _after_request(self, response):
+        tracker = g.pop('_query_tracker', None)
+        if tracker is None:
+            return response
+
+        view = current_app.view_functions.get(request.endpoint)
+        budget = getattr(view, 'query_budget', self.budget)
+        problems = tracker.problems(budget)
+        if not problems:
+            return response
+
+        report = f"{request.method} {request.path}: " + '; '.join(problems)
+        if self.mode == 'raise':
+            raise QueryBudgetExceeded(report + '\n' + tracker.first_stack())
+        log.warning(report, extra={'queries': tracker.total, 'stack': tracker.first_stack()})
+        return response
+
+
+class _RequestTracker:
+    __slots__ = ('threshold', 'total', 'statements', 'lazy_loads', 'stacks')
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.total = 0
+        self.statements = Counter()
+        self.lazy_loads = Counter()
+        self.stacks = {}
+
+    def record_statement(self, statement):
+        self.total += 1
+        key = _WHITESPACE.sub(' ', statement).strip()
+        self.statements[key] += 1
+
+    def record_lazy_load(self, attribute):
+        self.lazy_loads[attribute] += 1
+        # Only pay for a stack once the repetition is real, and only once per attribute
+        if self.lazy_loads[attribute] == self.threshold:
+            self.stacks[attribute] = ''.join(traceback.format_stack(limit=25)[:-3])
+
+    def problems(self, budget):
+        problems = [
+            f"{attribute} lazy loaded {count} times"
+            for attribute, count in self.lazy_loads.items() if count >= self.threshold
+        ]
+        # Repeated lazy loads already explain the repeated statements behind them
+        if not problems:
+            problems.extend(
+                f"statement repeated {count} times: {statement[:200]}"
+                for statement, count in self.statements.items() if count >= self.threshold
+            )
+        if budget is not None and self.total > budget:
+            problems.append(f"{self.total} queries (budget {budget})")
+        return problems
+
+    def first_stack(self):
+        return next(iter(self.stacks.values()), '')
+
+
+def _tracker():
+    if has_request_context():
+        return g.get('_query_tracker')
+    return None
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    tracker = _tracker()
+    if tracker is not None:
+        tracker.record_statement(statement)
+
+
+def _count_lazy_load(orm_execute_state):
+    if not orm_execute_state.is_relationship_load:
+        return
+    tracker = _tracker()
+    if tracker is not None:
+        path = orm_execute_state.loader_strategy_path
+        tracker.record_lazy_load(str(path[-1]) if path is not None else 'unknown')
+
+
+n_plus_one_detector = NPlusOneDetector()
@@ -0,0 +1,81 @@
+import math
+import threading
+import time
+from utils.metrics import metrics
+
+
+class TokenBucketLimiter:
+    """In-memory token buckets keyed by an arbitrary string (IP, account, ...)"""
+
+    def __init__(self, name, capacity, refill_per_second, max_keys=10000):
+        self.name = name
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.limited = 0
+
+    def consume(self, key, tokens=1):
+        """Take tokens from key's bucket, returning (allowed, retry_after_seconds)"""
+        now = time.monotonic()
+        with self._lock:
+            available, updated = self._buckets.get(key, (self.capacity, now))
+            available = min(self.capacity, available + (now - updated) * self.refill_per_second)
+
+            if available >= tokens:
+                self._buckets[key] = (available - tokens, now)
+                allowed, retry_after = True, 0
+            else:
+                self._buckets[key] = (available, now)
+                self.limited += 1
+                allowed = False
+                retry_after = math.ceil((tokens - available) / self.refill_per_second)
+
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+        return allowed, retry_after
+
+    def _prune(self, now):
+        # Buckets that have refilled completely carry no state worth keeping
+        full_after = self.capacity / self.refill_per_second
+        for key in [k for k, (_, updated) in self._buckets.items() if now - updated >= full_after]:
+            del self._buckets[key]
+
+    def refund(self, key, tokens=1):
+        """Give back tokens taken for a request that turned out to be legitimate"""
+        with self._lock:
+            if key in self._buckets:
+                available, updated = self._buckets[key]
+                self._buckets[key] = (min(self.capacity, available + tokens), updated)
+
+    def reset(self, key=None):
+        with self._lock:
+            if key is None:
+                self._buckets.clear()
+            else:
+                self._buckets.pop(key, None)
+
+    def collect_metrics(self):
+        return [
+            (f'fgs_rate_limited_{self.name}_total', 'counter', f'Requests rejected by the {self.name} limiter', self.limited),
+        ]
+
+
+# Login limits: short bursts are fine, sustained guessing is not. Guesses at
+# one account are capped twice: per (account, client IP), see login_client_key,
+# which stops one address early, and per account alone, which caps guesses
+# spread over many addresses. The account bucket is deep enough that one
+# address using up its own bucket leaves plenty for the owner elsewhere.
+login_ip_limiter = TokenBucketLimiter('login_ip', capacity=20, refill_per_second=20 / 60)
+login_client_limiter = TokenBucketLimiter('login_client', capacity=5, refill_per_second=5 / 300)
+login_account_limiter = TokenBucketLimiter('login_account', capacity=20, refill_per_second=20 / 900)
+
+
+def login_client_key(email, remote_addr):
+    return f'{email}|{remote_addr or "unknown"}'
+
+
+metrics.register(login_ip_limiter.collect_metrics)
+metrics.register(login_client_limiter.collect_metrics)
+metrics.register(login_account_limiter.collect_metrics)
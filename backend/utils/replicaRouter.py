@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+from flask import current_app, g, request, session
+from sqlalchemy import text
+from utils.dbPool import REPLICA_BIND
+from utils.metrics import metrics
+from utils.logger import get_logger
+
+log = get_logger('db')
+
+READ_METHODS = frozenset({'GET', 'HEAD'})
+
+# How far the replica's replay trails what it has received; 0 when caught up.
+# NULL on a server that is not in recovery, i.e. a primary standing in.
+POSTGRES_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def primary_only(view):
+    """Keep a GET view on the primary, e.g. when it must see writes from other users immediately"""
+    view.db_replica = False
+    return view
+
+
+class ReplicaRouter:
+    """Sends read-only requests to the replica bind and everything else to the primary.
+
+    A GET/HEAD request goes to the replica unless:
+
+    - its blueprint is listed in DB_PRIMARY_BLUEPRINTS, or its view is
+      decorated with @primary_only;
+    - the client asks for the primary with ``X-Read-From: primary``;
+    - the same session wrote something in the last DB_READ_YOUR_WRITES
+      seconds, so it sees its own changes;
+    - the replica is more than DB_REPLICA_MAX_LAG seconds behind, or the lag
+      check fails. The lag is measured at most every
+      DB_REPLICA_LAG_CHECK_INTERVAL seconds per process.
+
+    Writes always go to the primary, including any flush made while serving
+    a replica-routed request (see RoutingSession).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.max_lag = 5.0
+        self.read_your_writes = 5.0
+        self.check_interval = 2.0
+        self.primary_blueprints = frozenset()
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._lag = 0.0
+        self._healthy = True
+        self._routed = {'primary': 0, 'replica': 0}
+
+    def init_app(self, app):
+        app.config.setdefault('DB_REPLICA_MAX_LAG', float(os.getenv('DB_REPLICA_MAX_LAG', '5')))
+        app.config.setdefault('DB_READ_YOUR_WRITES', float(os.getenv('DB_READ_YOUR_WRITES', '5')))
+        app.config.setdefault('DB_REPLICA_LAG_CHECK_INTERVAL', float(os.getenv('DB_REPLICA_LAG_CHECK_INTERVAL', '2')))
+        app.config.setdefault('DB_PRIMARY_BLUEPRINTS', os.getenv('DB_PRIMARY_BLUEPRINTS', 'auth,admin,health'))
+
+        self.enabled = REPLICA_BIND in (app.config.get('SQLALCHEMY_BINDS') or {})
+        if not self.enabled:
+            return
+        self.max_lag = app.config['DB_REPLICA_MAX_LAG']
+        self.read_your_writes = app.config['DB_READ_YOUR_WRITES']
+        self.check_interval = app.config['DB_REPLICA_LAG_CHECK_INTERVAL']
+        self.primary_blueprints = frozenset(
+            name.strip() for name in app.config['DB_PRIMARY_BLUEPRINTS'].split(',') if name.strip()
+        )
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        metrics.register(self.collect_metrics)
+
+    def _before_request(self):
+        # An explicit pool (e.g. @analytics_pool) was already chosen for this view
+        if g.get('db_pool') is not None:
+            return
+        route = REPLICA_BIND if self._use_replica() else None
+        g.db_pool = route
+        with self._lock:
+            self._routed['replica' if route else 'primary'] += 1
+
+    def _use_replica(self):
+        if request.method not in READ_METHODS or request.blueprint in self.primary_blueprints:
+            return False
+        view = current_app.view_functions.get(request.endpoint)
+        if getattr(view, 'db_replica', True) is False:
+            return False
+        if request.headers.get('X-Read-From', '').lower() == 'primary':
+            return False
+        written_at = session.get('_db_written_at')
+        if written_at and time.time() - written_at < self.read_your_writes:
+            return False
+        return self.replica_ok()
+
+    def _after_request(self, response):
+        # Pin this session's reads to the primary for a while after it writes
+        if request.method not in READ_METHODS and request.method != 'OPTIONS' and response.status_code < 400:
+            session['_db_written_at'] = time.time()
+        return response
+
+    def replica_ok(self):
+        """Whether the replica is reachable and within DB_REPLICA_MAX_LAG"""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._healthy
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return self._healthy
+            self._checked_at = now
+        lag = self.measure_lag()
+        healthy = lag is not None and lag <= self.max_lag
+        if healthy != self._healthy:
+            log.warning("Replica routing %s", 'resumed' if healthy else 'suspended', extra={'lag_seconds': lag, 'max_lag': self.max_lag})
+        self._lag = lag
+        self._healthy = healthy
+        return healthy
+
+    def measure_lag(self):
+        """Replica lag in seconds, or None when it cannot be measured"""
+        engine = current_app.extensions['sqlalchemy'].engines[REPLICA_BIND]
+        if engine.dialect.name != 'postgresql':
+            # No replication to measure (e.g. SQLite files standing in for both)
+            return 0.0
+        try:
+            with engine.connect() as connection:
+                lag = connection.execute(POSTGRES_LAG_SQL).scalar()
+            return float(lag or 0)
+        except Exception:
+            log.warning("Replica lag check failed", exc_info=True)
+            return None
+
+    def collect_metrics(self):
+        with self._lock:
+            routed = dict(self._routed)
+        samples = [
+            ('fgs_db_replica_lag_seconds', 'gauge', 'Last measured replica lag', self._lag if self._lag is not None else -1),
+            ('fgs_db_replica_healthy', 'gauge', 'Whether reads are currently sent to the replica', int(self._healthy)),
+        ]
+        for target, count in routed.items():
+            samples.append(('fgs_db_routed_requests_total', 'counter', 'Requests by database they were routed to',
+                            count, {'target': target}))
+        return samples
+
+
+replica_router = ReplicaRouter()
@@ -0,0 +1,110 @@
+import threading
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from utils.metrics import metrics, Histogram, DEFAULT_BUCKETS
+
+# Response sizes in bytes and statements per request
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+class RequestMetrics:
+    """Per-endpoint latency, status, response size and SQL usage.
+
+    Every series is labelled with the blueprint (``inventory``, ``purchase``,
+    ... or ``app`` for routes on the app itself), the URL rule and the method.
+    SQL statements are counted through engine events, so the numbers cover
+    every engine the app creates.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._statuses = {}
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        metrics.register(self.collect_metrics)
+        metrics.init_app(app)
+
+    def _before_request(self):
+        g._metrics_start = time.perf_counter()
+        g._metrics_queries = 0
+        g._metrics_query_time = 0.0
+
+    def _after_request(self, response):
+        start = g.pop('_metrics_start', None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+
+        rule = request.url_rule.rule if request.url_rule else 'unmatched'
+        labels = (request.blueprint or 'app', rule, request.method)
+        # Measuring a streamed body would buffer it; those sizes are not recorded
+        size = None if response.is_streamed else response.calculate_content_length()
+
+        with self._lock:
+            stats = self._endpoints.get(labels)
+            if stats is None:
+                stats = self._endpoints[labels] = _EndpointStats()
+            stats.latency.observe(elapsed)
+            if size is not None:
+                stats.size.observe(size)
+            stats.queries.observe(g.get('_metrics_queries', 0))
+            stats.query_time += g.get('_metrics_query_time', 0.0)
+
+            status_key = labels + (response.status_code,)
+            self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+        return response
+
+    def collect_metrics(self):
+        samples = []
+        with self._lock:
+            for (blueprint, rule, method), stats in self._endpoints.items():
+                labels = {'blueprint': blueprint, 'endpoint': rule, 'method': method}
+                samples.extend([
+                    ('fgs_http_request_duration_seconds', 'histogram', 'Request latency', stats.latency.value(), labels),
+                    ('fgs_http_response_size_bytes', 'histogram', 'Response body size', stats.size.value(), labels),
+                    ('fgs_db_queries_per_request', 'histogram', 'SQL statements executed per request', stats.queries.value(), labels),
+                    ('fgs_db_query_seconds_total', 'counter', 'Time spent in SQL statements', stats.query_time, labels),
+                ])
+            for (blueprint, rule, method, status), count in self._statuses.items():
+                labels = {'blueprint': blueprint, 'endpoint': rule, 'method': method, 'status': status}
+                samples.append(('fgs_http_requests_total', 'counter', 'Requests by response status', count, labels))
+        return samples
+
+
+class _EndpointStats:
+    __slots__ = ('latency', 'size', 'queries', 'query_time')
+
+    def __init__(self):
+        self.latency = Histogram(DEFAULT_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.query_time = 0.0
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # A connection runs one statement at a time, and a failed statement's
+    # start (after_cursor_execute never fires for it) is simply overwritten
+    conn.info['_metrics_query_start'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info.pop('_metrics_query_start', None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    # Background threads (email outbox, ...) run queries outside any request
+    if has_request_context() and '_metrics_start' in g:
+        g._metrics_queries += 1
+        g._metrics_query_time += elapsed
+
+
+request_metrics = RequestMetrics()
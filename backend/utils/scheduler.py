@@ -0,0 +1,364 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import pytz
+from flask import g
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models.joblease import JobLease
+from utils.logger import get_logger
+from utils.metrics import Histogram, metrics
+
+log = get_logger('scheduler')
+
+# Jobs take seconds to minutes, not the milliseconds of a request
+RUN_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+
+# Where a job runs: once across every process sharing the database, once per
+# machine (for local files), or in every process (for in-process caches)
+SCOPES = ('fleet', 'host', 'process')
+
+
+class Clock:
+    """The scheduler's only source of time, in naive UTC like the other timestamp columns"""
+
+    def now(self):
+        return datetime.utcnow()
+
+
+class ManualClock(Clock):
+    """A clock that only moves when told to; drive the scheduler with tick()"""
+
+    def __init__(self, start=None):
+        self._now = start or datetime.utcnow().replace(microsecond=0)
+
+    def now(self):
+        return self._now
+
+    def advance(self, **delta):
+        """Move forward by timedelta(**delta); returns the new time"""
+        self._now += timedelta(**delta)
+        return self._now
+
+    def set(self, when):
+        self._now = when
+
+
+class Interval:
+    """Every N seconds/minutes/hours/days, counted from the start of the previous run"""
+
+    def __init__(self, seconds=0, minutes=0, hours=0, days=0):
+        self.delta = timedelta(seconds=seconds, minutes=minutes, hours=hours, days=days)
+        if self.delta <= timedelta(0):
+            raise ValueError("Interval must be positive")
+
+    def next_after(self, when):
+        return when + self.delta
+
+    def __repr__(self):
+        return f"<Interval {self.delta}>"
+
+
+class Cron:
+    """A five-field cron expression (minute hour day-of-month month day-of-week)
+    evaluated in a time zone.
+
+    Fields take *, numbers, a-b ranges, /steps and comma lists; day-of-week 0
+    and 7 are Sunday. As in cron, when both day fields are restricted a day
+    matching either one fires.
+    """
+
+    BOUNDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression, timezone='Asia/Manila'):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.tz = pytz.timezone(timezone) if isinstance(timezone, str) else timezone
+        minutes, hours, days, months, weekdays = (
+            self._parse(field, low, high) for field, (low, high) in zip(fields, self.BOUNDS)
+        )
+        self.minutes, self.hours = sorted(minutes), sorted(hours)
+        self.days, self.months = days, months
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = fields[2].startswith('*') or fields[4].startswith('*')
+
+    @staticmethod
+    def _parse(field, low, high):
+        values = set()
+        for part in field.split(','):
+            spec, slash, step = part.partition('/')
+            step = int(step) if slash else 1
+            if spec == '*':
+                start, end = low, high
+            elif '-' in spec:
+                start, end = (int(value) for value in spec.split('-', 1))
+            else:
+                start = int(spec)
+                end = high if slash else start
+            if step < 1 or not low <= start <= end <= high:
+                raise ValueError(f"Invalid cron field: {field!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, day):
+        in_month = day.day in self.days
+        in_week = (day.weekday() + 1) % 7 in self.weekdays
+        return in_month and in_week if self.any_day else in_month or in_week
+
+    def next_after(self, when):
+        local = pytz.utc.localize(when).astimezone(self.tz).replace(tzinfo=None)
+        start = local.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.date()
+        # Five years covers every combination, down to the 29th of February
+        for _ in range(366 * 5):
+            if day.month in self.months and self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = datetime(day.year, day.month, day.day, hour, minute)
+                        if candidate >= start:
+                            return self.tz.localize(candidate).astimezone(pytz.utc).replace(tzinfo=None)
+            day += timedelta(days=1)
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+    def __repr__(self):
+        return f"<Cron {self.expression!r} {self.tz.zone}>"
+
+
+class Job:
+    """A function called with the scheduled time (naive UTC) on a schedule"""
+
+    def __init__(self, name, func, schedule, scope='fleet', pool=None, lease_seconds=None):
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown job scope: {scope!r}")
+        self.name = name
+        self.func = func
+        self.schedule = schedule
+        self.scope = scope
+        self.pool = pool
+        self.lease_seconds = lease_seconds
+
+    def __repr__(self):
+        return f"<Job {self.name} {self.schedule!r} ({self.scope})>"
+
+
+class Scheduler:
+    """Runs registered jobs on intervals or cron expressions in a small thread pool.
+
+    Every serving process runs the scheduler (init_app only configures it;
+    app.start_background_workers starts it), but a fleet or host job only
+    runs where its row in scheduler_leases could be claimed: the claim is one
+    conditional UPDATE (due, and no live lease), so exactly one process wins
+    each run whatever the database. The lease lasts SCHEDULER_LEASE_SECONDS;
+    if its holder dies the job runs again once it expires, so jobs must be
+    safe to repeat. The next run time is stored with the lease, which keeps a
+    job on schedule across restarts and deploys.
+
+    Time only comes from ``clock``: with a ManualClock and tick() instead of
+    start(), a test decides exactly when each job is due.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock or Clock()
+        self.jobs = {}
+        self.app = None
+        self.owner = None
+        self.poll_interval = 30
+        self.lease_seconds = 900
+        self.threads = 2
+        self._thread = None
+        self._executor = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._running = set()
+        self._local_next = {}
+        self.runs = {}
+        self.durations = {}
+
+    def init_app(self, app):
+        app.config.setdefault('SCHEDULER_ENABLED', os.getenv('SCHEDULER_ENABLED', 'True').lower() == 'true')
+        app.config.setdefault('SCHEDULER_POLL_INTERVAL', float(os.getenv('SCHEDULER_POLL_INTERVAL', '30')))
+        app.config.setdefault('SCHEDULER_THREADS', int(os.getenv('SCHEDULER_THREADS', '2')))
+        app.config.setdefault('SCHEDULER_LEASE_SECONDS', int(os.getenv('SCHEDULER_LEASE_SECONDS', '900')))
+        app.config.setdefault('SCHEDULER_TIMEZONE', os.getenv('SCHEDULER_TIMEZONE', 'Asia/Manila'))
+
+        self.app = app
+        self.poll_interval = app.config['SCHEDULER_POLL_INTERVAL']
+        self.threads = app.config['SCHEDULER_THREADS']
+        self.lease_seconds = app.config['SCHEDULER_LEASE_SECONDS']
+        metrics.register(self.collect_metrics)
+
+    def add(self, name, func, schedule, scope='fleet', pool=None, lease_seconds=None):
+        """Register (or replace) a job; ``pool`` names the db bind its queries use"""
+        job = self.jobs[name] = Job(name, func, schedule, scope, pool, lease_seconds)
+        return job
+
+    @property
+    def running(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.tick()
+            except Exception:
+                log.exception("Scheduler tick failed")
+
+    def _identity(self):
+        # A forked worker is a new owner with its own threads
+        pid = os.getpid()
+        if self.owner is None or not self.owner.startswith(f'{socket.gethostname()}:{pid}:'):
+            self.owner = f'{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:8]}'
+            self._executor = None
+            self._running.clear()
+        return self.owner
+
+    def _lease_name(self, job):
+        return f'{job.name}@{socket.gethostname()}' if job.scope == 'host' else job.name
+
+    def tick(self):
+        """Start every job that is due and could be claimed; returns their futures"""
+        owner = self._identity()
+        now = self.clock.now()
+        due = []
+        with self.app.app_context():
+            leases = {lease.job_name: lease for lease in db.session.execute(select(JobLease)).scalars()}
+            for job in list(self.jobs.values()):
+                with self._lock:
+                    if job.name in self._running:
+                        continue
+                if job.scope == 'process':
+                    if self._local_next.setdefault(job.name, job.schedule.next_after(now)) <= now:
+                        due.append((job, None))
+                    continue
+
+                lease_name = self._lease_name(job)
+                lease = leases.get(lease_name)
+                if lease is None:
+                    self._create_lease(lease_name, job.schedule.next_after(now))
+                elif (lease.next_run_at <= now and (lease.leased_until is None or lease.leased_until <= now)
+                      and self._claim(lease_name, job, owner, now)):
+                    due.append((job, lease_name))
+            db.session.commit()
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='scheduler-job')
+        futures = []
+        for job, lease_name in due:
+            with self._lock:
+                self._running.add(job.name)
+            futures.append(self._executor.submit(self._execute, job, lease_name, owner, now))
+        return futures
+
+    def _create_lease(self, lease_name, next_run_at):
+        try:
+            db.session.execute(insert(JobLease).values(job_name=lease_name, next_run_at=next_run_at))
+            db.session.commit()
+        except IntegrityError:
+            # Another process registered it first
+            db.session.rollback()
+
+    def _claim(self, lease_name, job, owner, now):
+        result = db.session.execute(
+            update(JobLease)
+            .where(JobLease.job_name == lease_name,
+                   JobLease.next_run_at <= now,
+                   or_(JobLease.leased_until.is_(None), JobLease.leased_until <= now))
+            .values(owner=owner, last_started_at=now,
+                    leased_until=now + timedelta(seconds=job.lease_seconds or self.lease_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    def _execute(self, job, lease_name, owner, started):
+        status, error = 'succeeded', None
+        try:
+            with self.app.app_context():
+                g.db_pool = job.pool
+                began = time.perf_counter()
+                try:
+                    job.func(started)
+                except Exception as e:
+                    db.session.rollback()
+                    status, error = 'failed', e
+                    log.exception("Scheduled job failed", extra={'job': job.name})
+                elapsed = time.perf_counter() - began
+                self._record(job.name, status, elapsed)
+                log.info("Scheduled job finished", extra={
+                    'job': job.name, 'status': status, 'duration_ms': round(elapsed * 1000, 1)})
+                self._finish(job, lease_name, owner, started, status, error)
+        except Exception:
+            log.exception("Could not record scheduled job run", extra={'job': job.name})
+        finally:
+            with self._lock:
+                self._running.discard(job.name)
+        return status
+
+    def _finish(self, job, lease_name, owner, started, status, error):
+        finished = self.clock.now()
+        next_run_at = job.schedule.next_after(started)
+        if next_run_at <= finished:
+            # Overran its next slot: skip the missed runs rather than catch up
+            next_run_at = job.schedule.next_after(finished)
+
+        if lease_name is None:
+            self._local_next[job.name] = next_run_at
+            return
+        # Only while still ours: once the lease expired another process may hold it
+        db.session.execute(
+            update(JobLease)
+            .where(JobLease.job_name == lease_name, JobLease.owner == owner)
+            .values(owner=None, leased_until=None, next_run_at=next_run_at, last_finished_at=finished,
+                    last_status=status, last_error=str(error)[:1000] if error else None)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+    def _record(self, name, status, elapsed):
+        with self._lock:
+            self.runs[name, status] = self.runs.get((name, status), 0) + 1
+            if name not in self.durations:
+                self.durations[name] = Histogram(RUN_BUCKETS)
+            self.durations[name].observe(elapsed)
+
+    def collect_metrics(self):
+        with self._lock:
+            runs = list(self.runs.items())
+            durations = [(name, histogram.value()) for name, histogram in self.durations.items()]
+            running = len(self._running)
+        samples = [
+            ('fgs_scheduler_runs_total', 'counter', 'Scheduled job runs by outcome', count,
+             {'job': name, 'status': status})
+            for (name, status), count in runs
+        ]
+        samples.extend(
+            ('fgs_scheduler_run_seconds', 'histogram', 'Scheduled job run duration', value, {'job': name})
+            for name, value in durations
+        )
+        samples.append(('fgs_scheduler_jobs_running', 'gauge', 'Scheduled jobs running in this process', running))
+        return samples
+
+
+scheduler = Scheduler()
@@ -0,0 +1,206 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from werkzeug.exceptions import MethodNotAllowed, NotFound
+from werkzeug.http import parse_accept_header, parse_etags
+from werkzeug.routing import RequestRedirect
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import wrap_file
+from utils.logger import get_logger
+
+try:
+    import brotli
+except ImportError:  # optional: without it only .gz variants are built
+    brotli = None
+
+log = get_logger('static')
+
+# Vite writes content-hashed bundles as assets/<name>-<8 char hash>.<ext>
+HASHED_ASSET = re.compile(r'^assets/.+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$')
+COMPRESSIBLE = {
+    'text/html', 'text/css', 'text/javascript', 'application/javascript', 'application/json',
+    'application/manifest+json', 'image/svg+xml', 'text/plain', 'application/xml',
+}
+ENCODING_SUFFIXES = (('br', '.br'), ('gzip', '.gz'))
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+
+class Variant:
+    """One encoding of an asset: bytes held in memory, or a path streamed from disk"""
+
+    __slots__ = ('encoding', 'body', 'path', 'size', 'etag')
+
+    def __init__(self, encoding, etag, body=None, path=None, size=None):
+        self.encoding = encoding
+        self.etag = etag
+        self.body = body
+        self.path = path
+        self.size = len(body) if body is not None else size
+
+
+class Asset:
+    __slots__ = ('mimetype', 'cache_control', 'variants')
+
+    def __init__(self, mimetype, cache_control, variants):
+        self.mimetype = mimetype
+        self.cache_control = cache_control
+        self.variants = variants
+
+
+def _file_hash(path):
+    digest = hashlib.blake2b(digest_size=10)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_manifest(folder, inline_max, compress_missing=True):
+    """Map every file under ``folder`` (as a URL path) to an Asset.
+
+    Files up to ``inline_max`` bytes are held in memory. Pre-built .br/.gz
+    siblings are used when present; otherwise small compressible files get
+    their variants compressed once here.
+    """
+    manifest = {}
+    if not os.path.isdir(folder):
+        return manifest
+
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if name.endswith(('.br', '.gz')):
+                continue
+            path = os.path.join(root, name)
+            url_path = os.path.relpath(path, folder).replace(os.sep, '/')
+            mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+            size = os.path.getsize(path)
+            etag = _file_hash(path)
+
+            body = None
+            if size <= inline_max:
+                with open(path, 'rb') as f:
+                    body = f.read()
+            variants = {None: Variant(None, etag, body=body, path=path, size=size)}
+
+            for encoding, suffix in ENCODING_SUFFIXES:
+                sibling = path + suffix
+                if os.path.exists(sibling):
+                    sibling_size = os.path.getsize(sibling)
+                    sibling_body = None
+                    if sibling_size <= inline_max:
+                        with open(sibling, 'rb') as f:
+                            sibling_body = f.read()
+                    variants[encoding] = Variant(encoding, f'{etag}-{encoding}', body=sibling_body, path=sibling, size=sibling_size)
+                elif compress_missing and body is not None and mimetype in COMPRESSIBLE and size >= 1024:
+                    if encoding == 'br' and brotli is not None:
+                        variants[encoding] = Variant(encoding, f'{etag}-br', body=brotli.compress(body, quality=9))
+                    elif encoding == 'gzip':
+                        variants[encoding] = Variant(encoding, f'{etag}-gzip', body=gzip.compress(body, 9, mtime=0))
+
+            # Drop variants that came out no smaller than the original
+            for encoding in [key for key in variants if key and variants[key].size >= size]:
+                del variants[encoding]
+
+            cache_control = IMMUTABLE if HASHED_ASSET.match(url_path) else REVALIDATE
+            manifest[url_path] = Asset(mimetype, cache_control, variants)
+    return manifest
+
+
+class StaticAssets:
+    """WSGI middleware serving the built frontend ahead of the Flask app.
+
+    Requests for files in the manifest never reach Flask (no session load,
+    request hooks or login), and neither does the SPA fallback: a GET for a
+    path no Flask route matches, outside /api/, gets index.html from memory.
+    Hashed bundles are sent with ``Cache-Control: immutable`` and everything
+    else with ``no-cache``; all with strong ETags honoured via If-None-Match.
+    """
+
+    def __init__(self, app, folder, inline_max=2 * 1024 * 1024, reload=False):
+        self.app = app
+        self.wsgi_app = app.wsgi_app
+        self.folder = folder
+        self.inline_max = inline_max
+        self.reload = reload
+        self._index_mtime = None
+        self.manifest = {}
+        self.load()
+
+    def load(self):
+        self.manifest = build_manifest(self.folder, self.inline_max)
+        self._index_mtime = self._mtime(os.path.join(self.folder, 'index.html'))
+        log.info("Static manifest built", extra={'folder': self.folder, 'files': len(self.manifest)})
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    def __call__(self, environ, start_response):
+        method = environ['REQUEST_METHOD']
+        if method not in ('GET', 'HEAD'):
+            return self.wsgi_app(environ, start_response)
+
+        if self.reload and self._mtime(os.path.join(self.folder, 'index.html')) != self._index_mtime:
+            # A new frontend build landed (development only)
+            self.load()
+
+        path = environ.get('PATH_INFO', '/').lstrip('/') or 'index.html'
+        asset = self.manifest.get(path)
+        if asset is None and self._spa_route(environ, path):
+            asset = self.manifest.get('index.html')
+        if asset is None:
+            return self.wsgi_app(environ, start_response)
+        return self._respond(environ, asset)(environ, start_response)
+
+    def _spa_route(self, environ, path):
+        """Client-side routes: not an API path, not a file, and not a Flask route"""
+        if path.startswith('api/') or '.' in path.rsplit('/', 1)[-1]:
+            return False
+        try:
+            self.app.url_map.bind_to_environ(environ).match()
+        except NotFound:
+            return True
+        except (MethodNotAllowed, RequestRedirect):
+            return False
+        return False
+
+    def _respond(self, environ, asset):
+        variant = asset.variants[None]
+        if len(asset.variants) > 1:
+            accepted = parse_accept_header(environ.get('HTTP_ACCEPT_ENCODING'))
+            for encoding, _ in ENCODING_SUFFIXES:
+                if encoding in asset.variants and accepted[encoding]:
+                    variant = asset.variants[encoding]
+                    break
+
+        headers = {'Cache-Control': asset.cache_control, 'ETag': f'"{variant.etag}"'}
+        if len(asset.variants) > 1:
+            headers['Vary'] = 'Accept-Encoding'
+        if variant.encoding:
+            headers['Content-Encoding'] = variant.encoding
+
+        if parse_etags(environ.get('HTTP_IF_NONE_MATCH')).contains(variant.etag):
+            return Response(status=304, headers=headers)
+
+        if variant.body is not None:
+            response = Response(variant.body, mimetype=asset.mimetype, headers=headers)
+        else:
+            response = Response(wrap_file(environ, open(variant.path, 'rb')), mimetype=asset.mimetype,
+                                headers=headers, direct_passthrough=True)
+            response.content_length = variant.size
+        return response
+
+
+def init_static_assets(app):
+    app.config.setdefault('FRONTEND_DIST', os.getenv('FRONTEND_DIST', os.path.join(os.getcwd(), "..", "frontend", "dist")))
+    app.config.setdefault('STATIC_INLINE_MAX', int(os.getenv('STATIC_INLINE_MAX', str(2 * 1024 * 1024))))
+
+    static_assets = StaticAssets(app, app.config['FRONTEND_DIST'], app.config['STATIC_INLINE_MAX'], reload=app.debug)
+    app.wsgi_app = static_assets
+    return static_assets
@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+from flask_login import UserMixin
+from utils.metrics import metrics
+
+
+class CachedUser(UserMixin):
+    """Lightweight identity object handed to Flask-Login instead of the ORM row"""
+
+    __slots__ = ('id', 'email', 'is_admin', '_active', 'auth_version')
+
+    def __init__(self, id, email, is_admin, is_active, auth_version):
+        self.id = id
+        self.email = email
+        self.is_admin = is_admin
+        self._active = is_active
+        self.auth_version = auth_version
+
+    @property
+    def is_active(self):
+        return self._active
+
+    def get_id(self):
+        return f"{self.id}:{self.auth_version}"
+
+    def get_record(self):
+        """Load the full User row for routes that need more than the identity"""
+        from models.users import User
+        return User.query.get(self.id)
+
+    def to_dict(self):
+        user = self.get_record()
+        return user.to_dict() if user else None
+
+    def __repr__(self):
+        return f'<CachedUser {self.email}>'
+
+
+class UserCache:
+    """Per-process TTL cache of CachedUser entries keyed by user id"""
+
+    def __init__(self, ttl=60, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id, loader):
+        """Return the cached identity for user_id, calling loader(user_id) on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        identity = loader(user_id)
+        if identity is None:
+            self.invalidate(user_id)
+            return None
+
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Drop already expired entries first, then the oldest one
+                for key in [k for k, v in self._entries.items() if v[0] <= now]:
+                    del self._entries[key]
+                if len(self._entries) >= self.max_entries:
+                    del self._entries[min(self._entries, key=lambda k: self._entries[k][0])]
+            self._entries[user_id] = (now + self.ttl, identity)
+        return identity
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def collect_metrics(self):
+        return [
+            ('fgs_user_cache_hits_total', 'counter', 'User loader cache hits', self.hits),
+            ('fgs_user_cache_misses_total', 'counter', 'User loader cache misses', self.misses),
+            ('fgs_user_cache_hit_ratio', 'gauge', 'User loader cache hit ratio', round(self.hit_rate(), 4)),
+            ('fgs_user_cache_entries', 'gauge', 'Identities currently cached', len(self._entries)),
+        ]
+
+
+user_cache = UserCache()
+
+
+def load_identity(user_id):
+    """Read just the identity columns for a user, or None if the user does not exist"""
+    from extensions import db
+    from models.users import User
+
+    row = db.session.query(
+        User.id, User.email, User.is_admin, User.is_active, User.auth_version
+    ).filter(User.id == user_id).first()
+    if not row:
+        return None
+    return CachedUser(row.id, row.email, row.is_admin, row.is_active, row.auth_version)
+
+
+def invalidate_user(user):
+    """Bump the user's auth_version and drop it from this process's cache.
+
+    Other workers pick the change up once their entry expires (USER_CACHE_TTL),
+    and sessions issued before the bump are rejected by the user loader.
+    """
+    user.auth_version = (user.auth_version or 0) + 1
+    user_cache.invalidate(user.id)
+
+
+def init_user_cache(app):
+    """Configure the user cache TTL and expose its counters on /metrics"""
+    app.config.setdefault('USER_CACHE_TTL', int(os.getenv('USER_CACHE_TTL', '30')))
+    user_cache.ttl = app.config['USER_CACHE_TTL']
+    metrics.register(user_cache.collect_metrics)
+    return user_cache
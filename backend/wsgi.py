@@ -1,10 +1,9 @@
-import os  # Add this line to import the os module
-from app import app  # Import the Flask app from your app.py file
+import os
+from app import create_app, start_background_workers
 
-# Set the SQLAlchemy database URI
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
+# WSGI entry point: gunicorn -c gunicorn.conf.py wsgi:app
+app = create_app(os.getenv('APP_ENV', 'production'))
 
 if __name__ == "__main__":
+    start_background_workers(app)
     app.run()
-
-
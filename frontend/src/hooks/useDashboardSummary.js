@@ -0,0 +1,40 @@
+import { useState, useEffect } from 'react';
+
+// Custom hook to fetch every dashboard widget in a single request
+export function useDashboardSummary() {
+  const [summary, setSummary] = useState(null);
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState(null);
+
+  useEffect(() => {
+    async function fetchSummary() {
+      try {
+        const response = await fetch('/api/dashboard/summary');
+        if (!response.ok) {
+          throw new Error('Failed to fetch dashboard summary');
+        }
+        const data = await response.json();
+        setSummary(data);
+      } catch (err) {
+        setError(err.message);
+      } finally {
+        setLoading(false);
+      }
+    }
+
+    fetchSummary();
+  }, []);
+
+  return {
+    summary,
+    totalQuantity: summary?.inventory.total_quantity ?? 0,
+    totalSuppliers: summary?.total_suppliers ?? 0,
+    totalMaintenance: summary?.maintenance.total_maintenance ?? 0,
+    totalCondemned: summary?.maintenance.total_condemned ?? 0,
+    topPurchases: summary?.top_products ?? [],
+    topPurchasesDepartment: summary?.top_purchases_per_department ?? [],
+    recentRequests: summary?.recent_department_requests ?? [],
+    loading,
+    error
+  };
+}
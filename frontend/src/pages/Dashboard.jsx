@@ -3,12 +3,7 @@ import { FontAwesomeIcon } from '@fortawesome/react-fontawesome';
 import { faBox, faUserAlt, faTools, faTrash } from '@fortawesome/free-solid-svg-icons';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
 import { PieChart, Pie, Cell } from 'recharts';
-import { useInventory } from '../hooks/useInventory';
-import { useSuppliers } from '../hooks/useSupplier';
-import { useMaintenance } from '../hooks/useMaintenance';
-import { useGetTopPurchase } from '../hooks/useGetTopPurchase';
-import { useTopPurchasesPerDepartment } from '../hooks/useTopPurchasesPerDepartment';
-import { useDepartmentRequest } from '../hooks/useDepartmentRequest';
+import { useDashboardSummary } from '../hooks/useDashboardSummary';
 
 // Custom Tooltip for the Bar Chart
 const CustomTooltip = ({ active, payload }) => {
@@ -28,15 +23,20 @@ const CustomTooltip = ({ active, payload }) => {
 const colors = ['#8884d8', '#82ca9d', '#ffc658', '#ff6f61', '#8dd1e1', '#a4de6c', '#d0ed57', '#ffa07a', '#ff69b4', '#ffb6c1'];
 
 export default function Dashboard() {
-  const { totalQuantity } = useInventory();
-  const { departmentRequests, loading, error } = useDepartmentRequest();
-  const { totalSuppliers } = useSuppliers();
-  const { totalMaintenance, totalCondemned } = useMaintenance();
-  const { topPurchases, loading: loadingTopPurchases, error: errorTopPurchases } = useGetTopPurchase();
-  const { topPurchasesDepartment } = useTopPurchasesPerDepartment();
-
-  // Get the last 5 department requests
-  const recentRequests = departmentRequests.slice(-5).reverse();
+  // All widgets come from one summary request
+  const {
+    totalQuantity,
+    totalSuppliers,
+    totalMaintenance,
+    totalCondemned,
+    topPurchases,
+    topPurchasesDepartment,
+    recentRequests,
+    loading,
+    error
+  } = useDashboardSummary();
+  const loadingTopPurchases = loading;
+  const errorTopPurchases = error || (!loading && topPurchases.length === 0 ? 'No Purhchases Made Yet' : null);
 
   return (
     <div className="p-6">
@@ -388,7 +388,7 @@ const UserManagement = () => {
                   <span className="font-medium">
                     {Math.min(pagination.page * pagination.per_page, pagination.total)}
                   </span> of{' '}
-                  <span className="font-medium">{pagination.total}</span> results
+                  <span className="font-medium">{pagination.total_is_estimate ? 'about ' : ''}{pagination.total}</span> results
                 </p>
               </div>
               <div>